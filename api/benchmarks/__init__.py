@@ -0,0 +1 @@
+"""Micro-benchmarks for the API Lambda hot paths (run with ``python -m api.benchmarks.<name>``)."""
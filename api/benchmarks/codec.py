@@ -0,0 +1,70 @@
+"""Time request parsing and response encoding with each installed JSON backend.
+
+Usage:
+    python -m api.benchmarks.codec [--iterations 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import importlib.util
+import json
+import time
+from typing import List, Optional
+
+from ..lambdas import codec
+from ..lambdas.responses import json_response, parse_json_body
+
+REQUEST = {
+  'streamId': 'launch-day',
+  'title': 'Launch Day Broadcast',
+  'startTime': '2025-03-01T18:00:00Z',
+  'ingestEndpoints': [
+    {'protocol': 'rtmps', 'url': 'rtmps://ingest.example.com/app', 'backupUrl': 'rtmps://backup.example.com/app'},
+  ],
+  'metadata': {'region': 'us-east-1', 'tier': 'premium'},
+}
+
+RESPONSE = {
+  'streamId': 'launch-day',
+  'detailType': 'StreamProvisionRequested',
+  'stateMachineArn': 'arn:aws:states:us-east-1:000000000000:stateMachine:StreamLifecycleOrchestrator',
+  'acceptedAt': '2025-03-01T18:00:00+00:00',
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--iterations', type=int, default=100_000, help='Requests parsed and responses encoded per backend.')
+  args = parser.parse_args(argv)
+
+  text = json.dumps(REQUEST)
+  events = {
+    'text': {'body': text},
+    'base64': {'body': base64.b64encode(text.encode('utf-8')).decode('ascii'), 'isBase64Encoded': True},
+  }
+  previous = codec.get_codec()
+  try:
+    for name in codec.BACKENDS:
+      if name != 'json' and importlib.util.find_spec(name) is None:
+        print(f'{name:<8} not installed')
+        continue
+      codec.set_codec(name)
+      timings = []
+      for label, event in events.items():
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+          parse_json_body(event)
+        timings.append(f'parse {label} {(time.perf_counter() - started) / args.iterations * 1e6:5.2f}us')
+      started = time.perf_counter()
+      for _ in range(args.iterations):
+        json_response(202, RESPONSE)
+      timings.append(f'respond {(time.perf_counter() - started) / args.iterations * 1e6:5.2f}us')
+      print(f'{name:<8} ' + '  '.join(timings))
+  finally:
+    codec.set_codec(previous)
+
+
+if __name__ == '__main__':
+  main()
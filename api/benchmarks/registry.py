@@ -0,0 +1,66 @@
+"""Time indexed stream listings against a scan of every registered stream.
+
+Usage:
+    python -m api.benchmarks.registry [--streams 100000] [--iterations 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable, List, Optional
+
+from ..contracts.spec import STREAM_STATUSES
+from ..lambdas.registry import InMemoryStreamRepository, StreamRecord
+
+LIMIT = 100
+
+
+def _records(count: int) -> List[StreamRecord]:
+  rng = random.Random(42)
+  # Most streams are long finished; only a handful are live at any time.
+  weights = [1 if status in ('LIVE', 'READY') else 50 for status in STREAM_STATUSES]
+  records = []
+  for n in range(count):
+    day = rng.randrange(3 * 365)
+    records.append(StreamRecord(
+      stream_id=f'stream-{n:06d}',
+      status=rng.choices(STREAM_STATUSES, weights)[0],
+      updated_at='2025-01-01T00:00:00Z',
+      title=f'Stream {n}',
+      start_time=f'{2023 + day // 365}-{1 + day % 365 // 31:02d}-{1 + day % 28:02d}T{rng.randrange(24):02d}:00:00Z',
+    ))
+  return records
+
+
+def _time(label: str, iterations: int, query: Callable[[], object]) -> None:
+  started = time.perf_counter()
+  for _ in range(iterations):
+    query()
+  print(f'{label:<28} {(time.perf_counter() - started) / iterations * 1e6:10.1f}us')
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--streams', type=int, default=100_000, help='Streams registered before querying.')
+  parser.add_argument('--iterations', type=int, default=200, help='Queries timed per case.')
+  args = parser.parse_args(argv)
+
+  records = _records(args.streams)
+  repository = InMemoryStreamRepository(records)
+  window = ('2024-06-01T00:00:00Z', '2024-06-07T23:59:59Z')
+  print(f'{args.streams} streams, {repository.count("LIVE")} LIVE')
+
+  _time('status=LIVE (index)', args.iterations, lambda: repository.list(status='LIVE', limit=LIMIT))
+  _time('status=LIVE (scan)', args.iterations, lambda: sorted(
+    (r for r in records if r.status == 'LIVE'), key=lambda r: (r.start_time or '', r.stream_id),
+  )[:LIMIT])
+  _time('one-week window (index)', args.iterations, lambda: repository.list(start_from=window[0], start_to=window[1], limit=LIMIT))
+  _time('one-week window (scan)', args.iterations, lambda: sorted(
+    (r for r in records if window[0] <= r.start_time <= window[1]), key=lambda r: (r.start_time, r.stream_id),
+  )[:LIMIT])
+
+
+if __name__ == '__main__':
+  main()
@@ -1,10 +1,15 @@
 """API contract definitions used across infrastructure and documentation."""
 
+from .lifecycle import STATUS_TRANSITIONS
 from .spec import EVENT_CONTRACTS, REST_OPERATIONS, STATE_MACHINES, build_openapi_document
+from .validation import REQUEST_VALIDATORS, compile_schema
 
 __all__ = [
   'EVENT_CONTRACTS',
+  'REQUEST_VALIDATORS',
   'REST_OPERATIONS',
   'STATE_MACHINES',
+  'STATUS_TRANSITIONS',
   'build_openapi_document',
+  'compile_schema',
 ]
@@ -0,0 +1,131 @@
+"""Memoized, read-only builds of the documents generated from the contracts.
+
+``build_openapi_document()`` and ``build_cloudformation_template()`` return
+fresh mutable dicts, which is what callers that tweak the result want. Tools
+that only read them (the docs server, tests, deploy scripts) should use the
+artifact accessors instead: each returns a :class:`BuiltDocument` holding a
+deeply read-only view, the canonical JSON bytes ready to write or serve, and
+the SHA-256 of those bytes. Deploy tooling compares that hash with the last
+deployed one to skip unchanged stack updates.
+
+Artifacts are cached per :func:`contracts_digest`, a hash of every contract
+object computed once per process. Contracts are module constants, so that is
+only stale if something edits them in place; call
+:func:`clear_artifact_cache` afterwards.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from .spec import EVENT_CONTRACTS, REST_OPERATIONS, STATE_MACHINES, build_openapi_document
+
+_lock = threading.Lock()
+_digest: Optional[str] = None
+_cache: Dict[Tuple[str, str, Tuple[Any, ...]], 'BuiltDocument'] = {}
+
+
+@dataclass(frozen=True)
+class BuiltDocument:
+  """A generated document, its canonical JSON encoding, and that encoding's hash."""
+
+  name: str
+  document: Mapping[str, Any]
+  body: bytes
+  sha256: str
+  contracts_digest: str
+
+
+def canonical_json(value: Any) -> bytes:
+  """Encode value as sorted, compact UTF-8 JSON so equal documents hash equally."""
+
+  return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def freeze(value: Any) -> Any:
+  """Return a deep read-only copy: dicts become mapping proxies and lists tuples."""
+
+  if isinstance(value, dict):
+    return MappingProxyType({key: freeze(item) for key, item in value.items()})
+  if isinstance(value, (list, tuple)):
+    return tuple(freeze(item) for item in value)
+  return value
+
+
+def contracts_digest() -> str:
+  """Return the SHA-256 of every REST, event, and state machine contract."""
+
+  global _digest
+  if _digest is None:
+    contracts = {
+      'rest': [dataclasses.asdict(operation) for operation in REST_OPERATIONS],
+      'events': [dataclasses.asdict(event) for event in EVENT_CONTRACTS],
+      'stateMachines': [dataclasses.asdict(machine) for machine in STATE_MACHINES],
+    }
+    _digest = hashlib.sha256(canonical_json(contracts)).hexdigest()
+  return _digest
+
+
+def clear_artifact_cache() -> None:
+  """Forget the contract digest and every cached artifact."""
+
+  global _digest
+  with _lock:
+    _digest = None
+    _cache.clear()
+
+
+def cached_artifact(name: str, builder: Callable[..., Dict[str, Any]], *args: Any) -> BuiltDocument:
+  """Return the artifact builder(*args) produces, building it once per contract digest."""
+
+  digest = contracts_digest()
+  key = (name, digest, args)
+  artifact = _cache.get(key)
+  if artifact is None:
+    with _lock:
+      artifact = _cache.get(key)
+      if artifact is None:
+        document = builder(*args)
+        body = canonical_json(document)
+        artifact = BuiltDocument(name, freeze(document), body, hashlib.sha256(body).hexdigest(), digest)
+        _cache[key] = artifact
+  return artifact
+
+
+def openapi_artifact() -> BuiltDocument:
+  """Return the cached OpenAPI document built by ``build_openapi_document()``."""
+
+  return cached_artifact('openapi', build_openapi_document)
+
+
+def write_if_changed(artifact: BuiltDocument, path: Path) -> bool:
+  """Write artifact.body to path unless it already holds those bytes; return whether it was written."""
+
+  path = Path(path)
+  if path.is_file() and hashlib.sha256(path.read_bytes()).hexdigest() == artifact.sha256:
+    return False
+  path.parent.mkdir(parents=True, exist_ok=True)
+  tmp = path.with_name(f'.{path.name}.tmp')
+  tmp.write_bytes(artifact.body)
+  os.replace(tmp, path)
+  return True
+
+
+__all__ = [
+  'BuiltDocument',
+  'cached_artifact',
+  'canonical_json',
+  'clear_artifact_cache',
+  'contracts_digest',
+  'freeze',
+  'openapi_artifact',
+  'write_if_changed',
+]
@@ -0,0 +1,148 @@
+"""Stream status transition table compiled from the orchestrator contract.
+
+Each ``StreamLifecycleOrchestrator`` state declares the ``stream_status`` a
+stream is in while the state runs, so every state transition implies a status
+transition (``AwaitLifecycleConfirmation`` → ``PublishReadyNotification`` is
+PROVISIONING → READY). Those edges, plus ``STREAM_BROADCAST_TRANSITIONS`` for
+what happens after the workflow ends, are compiled once at import time into
+matrices indexed by position in ``STREAM_STATUSES``:
+
+- ``allowed[i][j]``: status ``i`` may be followed directly by status ``j``;
+- ``reachable[i][j]``: ``j`` can eventually follow ``i`` (transitive closure).
+
+A status may always be reported again (retries, updated reasons), so the
+diagonal of ``allowed`` is set. ``STATUS_TRANSITIONS`` is the table the
+streams Lambda checks ``UpdateStreamStatus`` requests against; the contract
+README renders it with :meth:`TransitionTable.to_markdown`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Sequence, Tuple
+
+from .spec import (
+  STREAM_BROADCAST_TRANSITIONS,
+  STREAM_LIFECYCLE_ORCHESTRATOR_STATES,
+  STREAM_STATUSES,
+  StateMachineState,
+)
+
+Matrix = Tuple[Tuple[bool, ...], ...]
+
+
+@dataclass(frozen=True)
+class TransitionTable:
+  """Direct and transitive status transitions indexed by status position."""
+
+  statuses: Tuple[str, ...]
+  index: Mapping[str, int]
+  initial: str
+  allowed: Matrix
+  reachable: Matrix
+  predecessors: Tuple[FrozenSet[str], ...]
+
+  def allows(self, current: str, target: str) -> bool:
+    """Return whether a stream in current may report target next."""
+
+    return self.allowed[self.index[current]][self.index[target]]
+
+  def can_reach(self, current: str, target: str) -> bool:
+    """Return whether target can eventually follow current."""
+
+    return self.reachable[self.index[current]][self.index[target]]
+
+  def allowed_from(self, target: str) -> FrozenSet[str]:
+    """Return the statuses a stream may be in when target is reported."""
+
+    return self.predecessors[self.index[target]]
+
+  def successors(self, current: str) -> List[str]:
+    """Return the statuses that may directly follow current, in enum order."""
+
+    row = self.allowed[self.index[current]]
+    return [status for status, allowed in zip(self.statuses, row) if allowed and status != current]
+
+  def is_terminal(self, status: str) -> bool:
+    return not self.successors(status)
+
+  def to_markdown(self) -> str:
+    """Render the table as the Markdown used in ``api/contracts/README.md``."""
+
+    rows = [
+      (f'`{status}`', ', '.join(f'`{target}`' for target in self.successors(status)) or 'terminal')
+      for status in self.statuses
+    ]
+    header = ('Status', 'May change to')
+    widths = [max(len(row[column]) for row in [header, *rows]) for column in range(2)]
+    lines = [
+      '| ' + ' | '.join(cell.ljust(width) for cell, width in zip(header, widths)) + ' |',
+      '| ' + ' | '.join('-' * width for width in widths) + ' |',
+    ]
+    lines.extend('| ' + ' | '.join(cell.ljust(width) for cell, width in zip(row, widths)) + ' |' for row in rows)
+    return '\n'.join(lines)
+
+
+def _closure(allowed: Matrix) -> Matrix:
+  reachable = [list(row) for row in allowed]
+  size = len(reachable)
+  for via in range(size):
+    for source in range(size):
+      if reachable[source][via]:
+        row = reachable[via]
+        reachable[source] = [known or row[target] for target, known in enumerate(reachable[source])]
+  return tuple(tuple(row) for row in reachable)
+
+
+def build_transition_table(
+  states: Sequence[StateMachineState] = STREAM_LIFECYCLE_ORCHESTRATOR_STATES,
+  extra_transitions: Mapping[str, Iterable[str]] = STREAM_BROADCAST_TRANSITIONS,
+  statuses: Sequence[str] = STREAM_STATUSES,
+) -> TransitionTable:
+  """Compile the transition table; raise ValueError if the contract is inconsistent.
+
+  Every state needs a ``stream_status``, every transition must target a
+  declared state, and every status must be reachable from the first state's.
+  """
+
+  index: Dict[str, int] = {status: position for position, status in enumerate(statuses)}
+  by_name = {state.name: state for state in states}
+  allowed = [[source == target for target in range(len(statuses))] for source in range(len(statuses))]
+
+  def position(status: str, where: str) -> int:
+    if status not in index:
+      raise ValueError(f'{where} uses unknown stream status {status!r}.')
+    return index[status]
+
+  for state in states:
+    if state.stream_status is None:
+      raise ValueError(f'State {state.name} does not declare a stream_status.')
+    source = position(state.stream_status, state.name)
+    for outcome, target_name in state.transitions.items():
+      target = by_name.get(target_name)
+      if target is None:
+        raise ValueError(f'State {state.name} transitions on {outcome!r} to unknown state {target_name}.')
+      allowed[source][position(target.stream_status, target_name)] = True
+  for source_status, targets in extra_transitions.items():
+    source = position(source_status, 'STREAM_BROADCAST_TRANSITIONS')
+    for target_status in targets:
+      allowed[source][position(target_status, 'STREAM_BROADCAST_TRANSITIONS')] = True
+
+  matrix = tuple(tuple(row) for row in allowed)
+  reachable = _closure(matrix)
+  initial = states[0].stream_status
+  unreachable = [status for status in statuses if not reachable[index[initial]][index[status]]]
+  if unreachable:
+    raise ValueError(f'Stream statuses unreachable from {initial}: {", ".join(unreachable)}.')
+
+  predecessors = tuple(
+    frozenset(status for status in statuses if matrix[index[status]][target])
+    for target in range(len(statuses))
+  )
+  return TransitionTable(tuple(statuses), index, initial, matrix, reachable, predecessors)
+
+
+STATUS_TRANSITIONS = build_transition_table()
+
+
+__all__ = ['STATUS_TRANSITIONS', 'TransitionTable', 'build_transition_table']
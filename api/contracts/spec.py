@@ -30,6 +30,7 @@ class RestOperation:
   lambda_handler: str
   request_schema: Optional[JsonSchema] = None
   responses: Dict[int, RestResponse] = field(default_factory=dict)
+  query_parameters: Dict[str, JsonSchema] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -55,6 +56,7 @@ class StateMachineState:
   transitions: Dict[str, str] = field(default_factory=dict)
   emits_events: List[str] = field(default_factory=list)
   timeout_seconds: Optional[int] = None
+  stream_status: Optional[str] = None
 
 
 @dataclass(frozen=True)
@@ -149,6 +151,25 @@ UPDATE_STREAM_REQUEST_SCHEMA: JsonSchema = {
 }
 
 
+MAX_BATCH_STREAMS = 25
+
+
+BATCH_CREATE_STREAMS_REQUEST_SCHEMA: JsonSchema = {
+  'type': 'object',
+  'required': ['streams'],
+  'additionalProperties': False,
+  'properties': {
+    'streams': {
+      'type': 'array',
+      'minItems': 1,
+      'maxItems': MAX_BATCH_STREAMS,
+      'items': CREATE_STREAM_REQUEST_SCHEMA,
+      'description': 'Stream definitions validated and accepted independently of each other.',
+    },
+  },
+}
+
+
 ACCEPTED_RESPONSE_SCHEMA: JsonSchema = {
   'type': 'object',
   'required': ['streamId', 'detailType', 'stateMachineArn'],
@@ -190,6 +211,78 @@ ERROR_RESPONSE_SCHEMA: JsonSchema = {
 }
 
 
+BATCH_RESULTS_RESPONSE_SCHEMA: JsonSchema = {
+  'type': 'object',
+  'required': ['accepted', 'rejected', 'results'],
+  'properties': {
+    'accepted': {'type': 'integer', 'description': 'Number of streams handed to the orchestrator.'},
+    'rejected': {'type': 'integer', 'description': 'Number of streams that failed validation.'},
+    'results': {
+      'type': 'array',
+      'description': 'One entry per submitted stream, in request order.',
+      'items': {
+        'type': 'object',
+        'required': ['index', 'statusCode', 'body'],
+        'properties': {
+          'index': {'type': 'integer'},
+          'statusCode': {'type': 'integer', 'enum': [202, 400]},
+          'body': {'oneOf': [ACCEPTED_RESPONSE_SCHEMA, ERROR_RESPONSE_SCHEMA]},
+        },
+      },
+    },
+  },
+}
+
+
+STREAM_STATUSES: List[str] = UPDATE_STREAM_REQUEST_SCHEMA['properties']['status']['enum']
+
+
+LIST_STREAMS_QUERY_PARAMETERS: Dict[str, JsonSchema] = {
+  'status': {
+    'type': 'string',
+    'enum': STREAM_STATUSES,
+    'description': 'Only return streams currently in this lifecycle status.',
+  },
+  'from': {
+    'type': 'string',
+    'format': 'date-time',
+    'description': 'Only return streams scheduled to start at or after this time. Requires `to` unless `status` is set.',
+  },
+  'to': {
+    'type': 'string',
+    'format': 'date-time',
+    'description': 'Only return streams scheduled to start at or before this time. Requires `from` unless `status` is set.',
+  },
+  'limit': {
+    'type': 'integer',
+    'minimum': 1,
+    'maximum': 1000,
+    'description': 'Maximum number of streams to return (default 100).',
+  },
+}
+
+
+STREAM_RECORD_SCHEMA: JsonSchema = {
+  'type': 'object',
+  'required': ['streamId', 'status', 'updatedAt'],
+  'properties': {
+    'streamId': {'type': 'string'},
+    'status': {'type': 'string', 'enum': STREAM_STATUSES},
+    'title': {'type': 'string'},
+    'startTime': {'type': 'string', 'format': 'date-time'},
+    'updatedAt': {'type': 'string', 'format': 'date-time'},
+    'reason': {'type': 'string'},
+  },
+}
+
+
+IDEMPOTENCY_CONFLICT_RESPONSE = RestResponse(
+  status_code=422,
+  description='The Idempotency-Key header was already used with a different request body.',
+  body_schema=ERROR_RESPONSE_SCHEMA,
+)
+
+
 REST_OPERATIONS: List[RestOperation] = [
   RestOperation(
     name='GetHealthStatus',
@@ -228,6 +321,44 @@ REST_OPERATIONS: List[RestOperation] = [
       )
     },
   ),
+  RestOperation(
+    name='ListStreams',
+    path='/streams',
+    method='GET',
+    summary='List registered streams by lifecycle status or start time.',
+    description=(
+      'Reads the stream registry through its status and start-time indexes, so '
+      'listings cost the number of matching streams rather than a scan. A `status` '
+      'or a `from`/`to` window of at most 36 months is required. '
+      'Results are ordered by start time, then stream id.'
+    ),
+    lambda_module='streams',
+    lambda_handler='streams.lambda_handler',
+    query_parameters=LIST_STREAMS_QUERY_PARAMETERS,
+    responses={
+      200: RestResponse(
+        status_code=200,
+        description='Streams matching the filters.',
+        body_schema={
+          'type': 'object',
+          'required': ['streams', 'count', 'truncated'],
+          'properties': {
+            'streams': {'type': 'array', 'items': STREAM_RECORD_SCHEMA},
+            'count': {'type': 'integer'},
+            'truncated': {
+              'type': 'boolean',
+              'description': 'True when more streams matched than limit allowed.',
+            },
+          },
+        },
+      ),
+      400: RestResponse(
+        status_code=400,
+        description='A query parameter was invalid, or neither a status nor a bounded window was given.',
+        body_schema=ERROR_RESPONSE_SCHEMA,
+      ),
+    },
+  ),
   RestOperation(
     name='CreateStreamWorkflow',
     path='/streams',
@@ -236,7 +367,8 @@ REST_OPERATIONS: List[RestOperation] = [
     description=(
       'Validates broadcaster supplied ingest targets and forwards the payload to '
       'the StreamLifecycleOrchestrator Step Function. Emitted events allow '
-      'operations dashboards to track provisioning progress.'
+      'operations dashboards to track provisioning progress. Requests carrying an '
+      'Idempotency-Key header are answered once; retries replay the first response.'
     ),
     lambda_module='streams',
     lambda_handler='streams.lambda_handler',
@@ -252,6 +384,40 @@ REST_OPERATIONS: List[RestOperation] = [
         description='Validation failed for the provided stream definition.',
         body_schema=ERROR_RESPONSE_SCHEMA,
       ),
+      422: IDEMPOTENCY_CONFLICT_RESPONSE,
+    },
+  ),
+  RestOperation(
+    name='BatchCreateStreamWorkflows',
+    path='/streams/batch',
+    method='POST',
+    summary='Request orchestration for several broadcasts at once.',
+    description=(
+      f'Validates up to {MAX_BATCH_STREAMS} stream definitions in one call, as a broadcaster portal '
+      'scheduling a season of events would submit them. Each valid stream is '
+      'handed to the StreamLifecycleOrchestrator exactly like CreateStreamWorkflow; '
+      'invalid ones are reported individually without failing the batch.'
+    ),
+    lambda_module='streams',
+    lambda_handler='streams.lambda_handler',
+    request_schema=BATCH_CREATE_STREAMS_REQUEST_SCHEMA,
+    responses={
+      202: RestResponse(
+        status_code=202,
+        description='Every stream in the batch was accepted.',
+        body_schema=BATCH_RESULTS_RESPONSE_SCHEMA,
+      ),
+      207: RestResponse(
+        status_code=207,
+        description='Some streams were rejected; see the per-item results.',
+        body_schema=BATCH_RESULTS_RESPONSE_SCHEMA,
+      ),
+      400: RestResponse(
+        status_code=400,
+        description='The batch envelope was malformed, empty, or too large.',
+        body_schema=ERROR_RESPONSE_SCHEMA,
+      ),
+      422: IDEMPOTENCY_CONFLICT_RESPONSE,
     },
   ),
   RestOperation(
@@ -261,7 +427,8 @@ REST_OPERATIONS: List[RestOperation] = [
     summary='Update lifecycle status emitted by the orchestrator.',
     description=(
       'Allows orchestration tasks to publish status updates once provisioning '
-      'completes, transitions to the live encoder, or encounters an error.'
+      'completes, transitions to the live encoder, or encounters an error. '
+      'Updates that skip or reverse the lifecycle are rejected with 409.'
     ),
     lambda_module='streams',
     lambda_handler='streams.lambda_handler',
@@ -286,6 +453,11 @@ REST_OPERATIONS: List[RestOperation] = [
         description='Status transitions were invalid or missing.',
         body_schema=ERROR_RESPONSE_SCHEMA,
       ),
+      409: RestResponse(
+        status_code=409,
+        description='The stream cannot move from its current status to the requested one.',
+        body_schema=ERROR_RESPONSE_SCHEMA,
+      ),
     },
   ),
 ]
@@ -331,7 +503,7 @@ EVENT_CONTRACTS: List[EventContract] = [
       'required': ['streamId', 'status'],
       'properties': {
         'streamId': {'type': 'string'},
-        'status': {'type': 'string', 'enum': UPDATE_STREAM_REQUEST_SCHEMA['properties']['status']['enum']},
+        'status': {'type': 'string', 'enum': STREAM_STATUSES},
         'reason': {'type': 'string'},
         'occurredAt': {'type': 'string', 'format': 'date-time'},
       },
@@ -359,6 +531,7 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
     ),
     integration='arn:aws:states:::lambda:invoke',
     transitions={'success': 'PersistProvisionRequest', 'failure': 'HandleProvisionFailure'},
+    stream_status='PROVISIONING',
   ),
   StateMachineState(
     name='PersistProvisionRequest',
@@ -366,6 +539,7 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
     description='Store the normalized request so operations can audit provisioning attempts.',
     integration='arn:aws:states:::dynamodb:putItem',
     transitions={'success': 'EmitProvisionRequestedEvent', 'failure': 'HandleProvisionFailure'},
+    stream_status='PROVISIONING',
   ),
   StateMachineState(
     name='EmitProvisionRequestedEvent',
@@ -374,6 +548,7 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
     integration='arn:aws:states:::events:putEvents',
     transitions={'success': 'ProvisionEncoderInfrastructure', 'failure': 'HandleProvisionFailure'},
     emits_events=['StreamProvisionRequested'],
+    stream_status='PROVISIONING',
   ),
   StateMachineState(
     name='ProvisionEncoderInfrastructure',
@@ -381,6 +556,7 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
     description='Call the media control Lambda to allocate encoder inputs and media flows.',
     integration='arn:aws:states:::aws-sdk:medialive:startChannel',
     transitions={'success': 'ConfigurePlaybackEndpoints', 'failure': 'HandleProvisionFailure'},
+    stream_status='PROVISIONING',
   ),
   StateMachineState(
     name='ConfigurePlaybackEndpoints',
@@ -388,6 +564,7 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
     description='Update playback origins, CloudFront distributions, and entitlement metadata.',
     integration='arn:aws:states:::aws-sdk:cloudfront:updateDistribution',
     transitions={'success': 'AwaitLifecycleConfirmation', 'failure': 'HandleProvisionFailure'},
+    stream_status='PROVISIONING',
   ),
   StateMachineState(
     name='AwaitLifecycleConfirmation',
@@ -403,6 +580,7 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
       'timeout': 'HandleProvisionFailure',
     },
     timeout_seconds=900,
+    stream_status='PROVISIONING',
   ),
   StateMachineState(
     name='PublishReadyNotification',
@@ -411,6 +589,7 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
     integration='arn:aws:states:::events:putEvents',
     transitions={'success': 'RecordCompletion', 'failure': 'HandleProvisionFailure'},
     emits_events=['StreamLifecycleProgressed'],
+    stream_status='READY',
   ),
   StateMachineState(
     name='RecordCompletion',
@@ -418,6 +597,7 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
     description='Mark the workflow as complete and persist the READY timestamp in DynamoDB.',
     integration='arn:aws:states:::dynamodb:updateItem',
     transitions={'success': 'WorkflowSucceeded', 'failure': 'HandleProvisionFailure'},
+    stream_status='READY',
   ),
   StateMachineState(
     name='HandleProvisionFailure',
@@ -426,20 +606,31 @@ STREAM_LIFECYCLE_ORCHESTRATOR_STATES: List[StateMachineState] = [
     integration='arn:aws:states:::lambda:invoke',
     transitions={'success': 'WorkflowFailed', 'failure': 'WorkflowFailed'},
     emits_events=['StreamLifecycleProgressed'],
+    stream_status='FAILED',
   ),
   StateMachineState(
     name='WorkflowSucceeded',
     state_type='Succeed',
     description='Terminal state representing a successful provisioning run.',
+    stream_status='READY',
   ),
   StateMachineState(
     name='WorkflowFailed',
     state_type='Fail',
     description='Terminal state reached whenever provisioning encounters unrecoverable errors.',
+    stream_status='FAILED',
   ),
 ]
 
 
+# Status changes reported after the orchestrator has finished (go-live and wrap-up).
+# Transitions within the workflow are derived from the states' stream_status.
+STREAM_BROADCAST_TRANSITIONS: Dict[str, List[str]] = {
+  'READY': ['LIVE'],
+  'LIVE': ['COMPLETE', 'FAILED'],
+}
+
+
 STATE_MACHINES: List[StateMachineContract] = [
   StateMachineContract(
     name='StreamLifecycleOrchestrator',
@@ -494,6 +685,12 @@ def build_openapi_document() -> Dict[str, object]:
       'tags': [operation.path.strip('/').split('/')[0] or 'root'],
     }
 
+    if operation.query_parameters:
+      operation_entry['parameters'] = [
+        {'name': name, 'in': 'query', 'required': False, 'schema': schema}
+        for name, schema in operation.query_parameters.items()
+      ]
+
     if operation.request_schema is not None:
       operation_entry['requestBody'] = {
         'required': True,
@@ -542,6 +739,8 @@ def build_openapi_document() -> Dict[str, object]:
           state_entry['emits'] = state.emits_events
         if state.timeout_seconds is not None:
           state_entry['timeoutSeconds'] = state.timeout_seconds
+        if state.stream_status is not None:
+          state_entry['streamStatus'] = state.stream_status
 
         states_payload.append(state_entry)
 
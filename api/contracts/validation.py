@@ -0,0 +1,395 @@
+"""Request validators compiled from the contract JSON schemas.
+
+``compile_schema()`` turns a schema into the source of a specialised Python
+function once, at import time: every keyword becomes straight-line checks,
+regular expressions and enums are precompiled into constants, and no schema
+tree is walked per request. ``validate()`` is the equivalent generic walker,
+kept as the reference implementation the compiled validators are tested and
+benchmarked against.
+
+Only the keywords the contracts use are supported (``type``, ``required``,
+``properties``, ``additionalProperties``, ``items``, ``minItems``,
+``maxItems``, ``minLength``, ``maxLength``, ``pattern``, ``enum``,
+``minimum``, ``maximum`` and the ``date-time`` / ``uri`` formats); anything else raises ``ValueError`` at
+compile time rather than being silently ignored. Validators return a list of
+human readable issues, empty when the value is valid.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .spec import REST_OPERATIONS, JsonSchema
+
+Validator = Callable[[Any], List[str]]
+
+ROOT_LABEL = 'body'
+
+SUPPORTED_KEYWORDS = frozenset({
+  'type', 'required', 'properties', 'additionalProperties', 'items', 'minItems', 'maxItems',
+  'minLength', 'maxLength', 'pattern', 'enum', 'format', 'minimum', 'maximum', 'description',
+})
+
+TYPE_CHECKS: Dict[str, str] = {
+  'object': 'isinstance({v}, dict)',
+  'array': 'isinstance({v}, list)',
+  'string': 'isinstance({v}, str)',
+  'boolean': 'isinstance({v}, bool)',
+  'integer': '(isinstance({v}, int) and not isinstance({v}, bool))',
+  'number': '(isinstance({v}, (int, float)) and not isinstance({v}, bool))',
+}
+
+TYPE_NAMES: Dict[str, str] = {
+  'object': 'an object',
+  'array': 'a list',
+  'string': 'a string',
+  'boolean': 'a boolean',
+  'integer': 'an integer',
+  'number': 'a number',
+}
+
+_DATE_TIME = re.compile(r'^\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}(\.\d+)?([Zz]|[+-]\d{2}:\d{2})\Z')
+_URI = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:\S+\Z')
+_TRAILING_DOLLAR = re.compile(r'(?<!\\)((?:\\\\)*)\$$')
+
+
+def _pattern(pattern: str) -> str:
+  # JSON Schema patterns are ECMA-262, where ``$`` is the end of the string; in Python it also
+  # matches just before a final newline, so an unescaped trailing ``$`` becomes ``\Z``.
+  return _TRAILING_DOLLAR.sub(r'\1\\Z', pattern)
+
+
+def _is_date_time(value: str) -> bool:
+  if _DATE_TIME.search(value) is None:
+    return False
+  try:
+    # The pattern accepts impossible dates such as 2025-02-30; the parser does not.
+    datetime.fromisoformat(value[:-1] + '+00:00' if value[-1] in 'Zz' else value)
+  except ValueError:
+    return False
+  return True
+
+
+def _is_uri(value: str) -> bool:
+  return _URI.search(value) is not None
+
+
+FORMATS: Dict[str, Tuple[Callable[[str], bool], str]] = {
+  'date-time': (_is_date_time, 'an RFC 3339 date-time'),
+  'uri': (_is_uri, 'a URI'),
+}
+
+
+def _is_type(value: Any, expected: str) -> bool:
+  if expected in ('integer', 'number') and isinstance(value, bool):
+    return False
+  return isinstance(value, {
+    'object': dict, 'array': list, 'string': str, 'boolean': bool, 'integer': int, 'number': (int, float),
+  }[expected])
+
+
+def _label(path: str) -> str:
+  return path or ROOT_LABEL
+
+
+def _child(path: str, key: str) -> str:
+  return f'{path}.{key}' if path else key
+
+
+def _characters(count: int) -> str:
+  return '1 character' if count == 1 else f'{count} characters'
+
+
+def _min_items_issue(path: str, count: int) -> str:
+  if count == 1:
+    return f'{_label(path)} must be a non-empty list.'
+  return f'{_label(path)} must contain at least {count} items.'
+
+
+def validate(schema: JsonSchema, value: Any, path: str = '') -> List[str]:
+  """Validate value against schema by walking the schema on every call."""
+
+  issues: List[str] = []
+  expected = schema.get('type')
+  if expected is not None and not _is_type(value, expected):
+    issues.append(f'{_label(path)} must be {TYPE_NAMES[expected]}.')
+    return issues
+
+  if 'enum' in schema and value not in schema['enum']:
+    issues.append(f'{_label(path)} must be one of {", ".join(map(str, schema["enum"]))}.')
+
+  if isinstance(value, str):
+    if 'minLength' in schema and len(value) < schema['minLength']:
+      issues.append(f'{_label(path)} must be at least {_characters(schema["minLength"])}.')
+    if 'maxLength' in schema and len(value) > schema['maxLength']:
+      issues.append(f'{_label(path)} must be at most {_characters(schema["maxLength"])}.')
+    if 'pattern' in schema and re.search(_pattern(schema['pattern']), value) is None:
+      issues.append(f'{_label(path)} must match {schema["pattern"]}.')
+    if 'format' in schema and not FORMATS[schema['format']][0](value):
+      issues.append(f'{_label(path)} must be {FORMATS[schema["format"]][1]}.')
+
+  if isinstance(value, (int, float)) and not isinstance(value, bool):
+    if 'minimum' in schema and value < schema['minimum']:
+      issues.append(f'{_label(path)} must be at least {schema["minimum"]}.')
+    if 'maximum' in schema and value > schema['maximum']:
+      issues.append(f'{_label(path)} must be at most {schema["maximum"]}.')
+
+  if isinstance(value, list):
+    if 'minItems' in schema and len(value) < schema['minItems']:
+      issues.append(_min_items_issue(path, schema['minItems']))
+    if 'maxItems' in schema and len(value) > schema['maxItems']:
+      issues.append(f'{_label(path)} must contain at most {schema["maxItems"]} items.')
+    if 'items' in schema:
+      for index, item in enumerate(value):
+        issues.extend(validate(schema['items'], item, f'{_label(path)}[{index}]'))
+
+  if isinstance(value, dict):
+    properties: Dict[str, JsonSchema] = schema.get('properties', {})
+    required = schema.get('required', [])
+    for key in required:
+      if value.get(key) is None:
+        issues.append(f'{_child(path, key)} is required.')
+      elif key in properties:
+        issues.extend(validate(properties[key], value[key], _child(path, key)))
+    for key, subschema in properties.items():
+      if key not in required and key in value:
+        issues.extend(validate(subschema, value[key], _child(path, key)))
+    extra = schema.get('additionalProperties', True)
+    if extra is not True:
+      for key, item in value.items():
+        if key in properties:
+          continue
+        if extra is False:
+          issues.append(f'{_child(path, key)} is not allowed.')
+        else:
+          issues.extend(validate(extra, item, _child(path, key)))
+
+  return issues
+
+
+class _Compiler:
+  """Emit the source of a validator function for one schema."""
+
+  def __init__(self) -> None:
+    self.lines: List[str] = []
+    self.constants: Dict[str, object] = {}
+    self._counter = 0
+
+  def _name(self, prefix: str) -> str:
+    self._counter += 1
+    return f'{prefix}{self._counter}'
+
+  def _constant(self, prefix: str, value: object) -> str:
+    name = self._name(prefix)
+    self.constants[name] = value
+    return name
+
+  def _emit(self, depth: int, line: str) -> None:
+    self.lines.append('  ' * depth + line)
+
+  def build(self, schema: JsonSchema, name: str) -> str:
+    self._emit(0, f'def {name}(value):')
+    self._emit(1, 'issues = []')
+    self._emit(1, 'append = issues.append')
+    self._node(schema, 'value', '', 1)
+    self._emit(1, 'return issues')
+    return '\n'.join(self.lines) + '\n'
+
+  def _issue(self, depth: int, path: str, text: str) -> None:
+    # path is f-string source (static parts escaped, loop variables in braces).
+    self._emit(depth, f'append(f{_quote(path + text)})')
+
+  def _node(self, schema: JsonSchema, var: str, path: str, depth: int) -> None:
+    unknown = set(schema) - SUPPORTED_KEYWORDS
+    if unknown:
+      raise ValueError(f'Unsupported schema keywords at {_label(path)}: {", ".join(sorted(unknown))}')
+    if 'format' in schema and schema['format'] not in FORMATS:
+      raise ValueError(f'Unsupported format at {_label(path)}: {schema["format"]}')
+
+    label = path or ROOT_LABEL
+    expected = schema.get('type')
+    if expected is not None:
+      self._emit(depth, f'if not {TYPE_CHECKS[expected].format(v=var)}:')
+      self._issue(depth + 1, label, f' must be {TYPE_NAMES[expected]}.')
+      self._emit(depth, 'else:')
+      depth += 1
+    start = len(self.lines)
+
+    if 'enum' in schema:
+      values = schema['enum']
+      try:
+        choices: object = frozenset(values)
+      except TypeError:
+        choices = tuple(values)
+      constant = self._constant('ENUM', choices)
+      self._emit(depth, f'if {var} not in {constant}:')
+      self._issue(depth + 1, label, _escape(f' must be one of {", ".join(map(str, values))}.'))
+
+    strings = [k for k in ('minLength', 'maxLength', 'pattern', 'format') if k in schema]
+    if strings:
+      inner = depth
+      if expected != 'string':
+        self._emit(depth, f'if isinstance({var}, str):')
+        inner += 1
+      if 'minLength' in schema:
+        self._emit(inner, f'if len({var}) < {int(schema["minLength"])}:')
+        self._issue(inner + 1, label, f' must be at least {_characters(int(schema["minLength"]))}.')
+      if 'maxLength' in schema:
+        self._emit(inner, f'if len({var}) > {int(schema["maxLength"])}:')
+        self._issue(inner + 1, label, f' must be at most {_characters(int(schema["maxLength"]))}.')
+      if 'pattern' in schema:
+        constant = self._constant('PATTERN', re.compile(_pattern(schema['pattern'])))
+        self._emit(inner, f'if {constant}.search({var}) is None:')
+        self._issue(inner + 1, label, _escape(f' must match {schema["pattern"]}.'))
+      if 'format' in schema:
+        check, description = FORMATS[schema['format']]
+        constant = self._constant('FORMAT', check)
+        self._emit(inner, f'if not {constant}({var}):')
+        self._issue(inner + 1, label, f' must be {description}.')
+
+    bounds = [k for k in ('minimum', 'maximum') if k in schema]
+    if bounds:
+      inner = depth
+      if expected not in ('integer', 'number'):
+        self._emit(depth, f'if {TYPE_CHECKS["number"].format(v=var)}:')
+        inner += 1
+      for keyword, operator, word in (('minimum', '<', 'least'), ('maximum', '>', 'most')):
+        if keyword in schema:
+          bound = schema[keyword]
+          if not isinstance(bound, (int, float)) or isinstance(bound, bool):
+            raise ValueError(f'{keyword} at {_label(path)} must be a number')
+          self._emit(inner, f'if {var} {operator} {bound!r}:')
+          self._issue(inner + 1, label, f' must be at {word} {bound}.')
+
+    if expected == 'array' or any(k in schema for k in ('minItems', 'maxItems', 'items')):
+      self._array(schema, var, path, label, depth, guarded=expected == 'array')
+
+    if expected == 'object' or any(k in schema for k in ('required', 'properties', 'additionalProperties')):
+      self._object(schema, var, path, depth, guarded=expected == 'object')
+
+    if len(self.lines) == start:
+      self._emit(depth, 'pass')
+
+  def _array(self, schema: JsonSchema, var: str, path: str, label: str, depth: int, guarded: bool) -> None:
+    if not guarded:
+      self._emit(depth, f'if isinstance({var}, list):')
+      depth += 1
+    start = len(self.lines)
+    if 'minItems' in schema:
+      count = int(schema['minItems'])
+      self._emit(depth, f'if len({var}) < {count}:')
+      if count == 1:
+        self._issue(depth + 1, label, ' must be a non-empty list.')
+      else:
+        self._issue(depth + 1, label, f' must contain at least {count} items.')
+    if 'maxItems' in schema:
+      self._emit(depth, f'if len({var}) > {int(schema["maxItems"])}:')
+      self._issue(depth + 1, label, f' must contain at most {int(schema["maxItems"])} items.')
+    if 'items' in schema:
+      index, item = self._name('i'), self._name('item')
+      self._emit(depth, f'for {index}, {item} in enumerate({var}):')
+      self._node(schema['items'], item, f'{label}[{{{index}}}]', depth + 1)
+    if len(self.lines) == start:
+      self._emit(depth, 'pass')
+
+  def _object(self, schema: JsonSchema, var: str, path: str, depth: int, guarded: bool) -> None:
+    if not guarded:
+      self._emit(depth, f'if isinstance({var}, dict):')
+      depth += 1
+    start = len(self.lines)
+    properties: Dict[str, JsonSchema] = schema.get('properties', {})
+    required = schema.get('required', [])
+
+    for key in required:
+      child = self._name('v')
+      child_path = _join(path, _escape(key))
+      self._emit(depth, f'{child} = {var}.get({key!r})')
+      self._emit(depth, f'if {child} is None:')
+      self._issue(depth + 1, child_path, ' is required.')
+      if key in properties:
+        self._emit(depth, 'else:')
+        self._node(properties[key], child, child_path, depth + 1)
+
+    for key, subschema in properties.items():
+      if key in required:
+        continue
+      child = self._name('v')
+      self._emit(depth, f'if {key!r} in {var}:')
+      self._emit(depth + 1, f'{child} = {var}[{key!r}]')
+      self._node(subschema, child, _join(path, _escape(key)), depth + 1)
+
+    extra = schema.get('additionalProperties', True)
+    if extra is not True:
+      known = self._constant('KNOWN', frozenset(properties))
+      key_var, item = self._name('key'), self._name('v')
+      self._emit(depth, f'for {key_var}, {item} in {var}.items():')
+      self._emit(depth + 1, f'if {key_var} in {known}:')
+      self._emit(depth + 2, 'continue')
+      key_path = _join(path, f'{{{key_var}}}')
+      if extra is False:
+        self._issue(depth + 1, key_path, ' is not allowed.')
+      else:
+        self._node(extra, item, key_path, depth + 1)
+
+    if len(self.lines) == start:
+      self._emit(depth, 'pass')
+
+
+def _escape(text: str) -> str:
+  return text.replace('{', '{{').replace('}', '}}')
+
+
+def _join(path: str, key: str) -> str:
+  return f'{path}.{key}' if path else key
+
+
+def _quote(text: str) -> str:
+  return "'" + text.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n') + "'"
+
+
+def compile_schema(schema: JsonSchema, name: str = 'validate') -> Validator:
+  """Compile schema into a validator function returning a list of issues.
+
+  The generated source is kept on the function as ``__source__`` for
+  debugging.
+  """
+
+  compiler = _Compiler()
+  source = compiler.build(schema, name)
+  namespace: Dict[str, object] = dict(compiler.constants)
+  exec(compile(source, f'<schema validator {name}>', 'exec'), namespace)
+  validator = namespace[name]
+  validator.__source__ = source
+  return validator
+
+
+def _request_validator_name(operation_name: str) -> str:
+  return 'validate_' + re.sub(r'(?<!^)(?=[A-Z])', '_', operation_name).lower()
+
+
+REQUEST_VALIDATORS: Dict[str, Validator] = {
+  operation.name: compile_schema(operation.request_schema, _request_validator_name(operation.name))
+  for operation in REST_OPERATIONS
+  if operation.request_schema is not None
+}
+
+
+QUERY_VALIDATORS: Dict[str, Validator] = {
+  operation.name: compile_schema(
+    {'type': 'object', 'properties': operation.query_parameters},
+    _request_validator_name(operation.name) + '_query',
+  )
+  for operation in REST_OPERATIONS
+  if operation.query_parameters
+}
+
+
+def request_validator(operation_name: str) -> Optional[Validator]:
+  """Return the compiled request validator for a REST operation, if it has a request schema."""
+
+  return REQUEST_VALIDATORS.get(operation_name)
+
+
+__all__ = ['QUERY_VALIDATORS', 'REQUEST_VALIDATORS', 'Validator', 'compile_schema', 'request_validator', 'validate']
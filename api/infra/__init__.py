@@ -1,5 +1,5 @@
 """Infrastructure helpers for packaging the GuidoGerb API."""
 
-from .template import build_cloudformation_template
+from .template import build_cloudformation_template, template_artifact
 
-__all__ = ['build_cloudformation_template']
+__all__ = ['build_cloudformation_template', 'template_artifact']
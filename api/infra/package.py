@@ -0,0 +1,237 @@
+"""Per-handler Lambda bundles containing only the modules each handler imports.
+
+``build_lambda_bundle('streams', out)`` follows the static imports of
+``api.lambdas.streams`` through the ``api`` package and zips just those
+modules (plus the package ``__init__`` files they sit in) into
+``out/streams.zip``, next to a top-level ``streams.py`` shim so the
+``streams.lambda_handler`` handler string used by the CloudFormation template
+resolves. Third-party packages (``orjson``, ``msgspec``) are not bundled; they
+come from a layer when wanted, and the codec falls back to ``json`` otherwise.
+
+Archives are deterministic (sorted entries, fixed timestamps) so unchanged
+code produces an identical zip. When the local interpreter matches the Lambda
+runtime, unchecked-hash ``.pyc`` files are included so cold starts skip
+compiling (``/var/task`` is read-only, so Lambda can never cache them itself).
+
+Usage:
+    python -m api.infra.package [--output dist/lambdas] [--check-budget]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import importlib.util
+import os
+import py_compile
+import re
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from ..contracts import REST_OPERATIONS
+from .template import LAMBDA_RUNTIME
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+TOP_LEVEL_PACKAGE = PACKAGE_ROOT.name
+
+# Cold-start import budget per handler, measured with ``python -X importtime``.
+# Includes the stdlib modules the handler pulls in beyond interpreter startup.
+# Slow CI hosts can scale every budget with API_IMPORT_BUDGET_SCALE.
+IMPORT_TIME_BUDGET_MS: Dict[str, float] = {
+  'health': 80.0,
+  'streams': 150.0,
+}
+BUDGET_SCALE_ENV = 'API_IMPORT_BUDGET_SCALE'
+
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+_IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$')
+
+
+def _module_path(name: str) -> Optional[Path]:
+  """Return the source file of a first-party module or package, if it exists."""
+
+  parts = name.split('.')
+  if parts[0] != TOP_LEVEL_PACKAGE:
+    return None
+  base = PACKAGE_ROOT.joinpath(*parts[1:])
+  if (base / '__init__.py').is_file():
+    return base / '__init__.py'
+  if base.with_suffix('.py').is_file():
+    return base.with_suffix('.py')
+  return None
+
+
+def _imports(name: str, path: Path) -> Set[str]:
+  """Return the absolute names of every module path imports (at any scope)."""
+
+  package = name if path.name == '__init__.py' else name.rpartition('.')[0]
+  found: Set[str] = set()
+  for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'), str(path))):
+    if isinstance(node, ast.Import):
+      found.update(alias.name for alias in node.names)
+    elif isinstance(node, ast.ImportFrom):
+      base = importlib.util.resolve_name('.' * node.level + (node.module or ''), package) if node.level else node.module
+      if not base:
+        continue
+      found.add(base)
+      # ``from package import submodule`` imports the submodule too.
+      found.update(f'{base}.{alias.name}' for alias in node.names if alias.name != '*')
+  return found
+
+
+def handler_modules(module: str) -> List[str]:
+  """Return the first-party modules reachable from ``api.lambdas.<module>``, sorted."""
+
+  pending = [f'{TOP_LEVEL_PACKAGE}.lambdas.{module}']
+  seen: Set[str] = set()
+  while pending:
+    name = pending.pop()
+    if name in seen:
+      continue
+    path = _module_path(name)
+    if path is None:
+      continue
+    seen.add(name)
+    # Importing a module runs every enclosing package's __init__ first.
+    parent = name.rpartition('.')[0]
+    while parent:
+      pending.append(parent)
+      parent = parent.rpartition('.')[0]
+    pending.extend(_imports(name, path))
+  return sorted(seen)
+
+
+def _runtime_matches_interpreter() -> bool:
+  return LAMBDA_RUNTIME == f'python{sys.version_info.major}.{sys.version_info.minor}'
+
+
+def _write_entry(archive: zipfile.ZipFile, arcname: str, data: bytes) -> None:
+  info = zipfile.ZipInfo(arcname, ZIP_TIMESTAMP)
+  info.compress_type = zipfile.ZIP_DEFLATED
+  info.external_attr = 0o644 << 16
+  archive.writestr(info, data)
+
+
+def build_lambda_bundle(module: str, output_dir: Path, bytecode: Optional[bool] = None) -> Path:
+  """Write ``output_dir/<module>.zip`` for one handler and return its path.
+
+  ``bytecode`` defaults to including ``.pyc`` files only when this
+  interpreter matches ``LAMBDA_RUNTIME``.
+  """
+
+  if bytecode is None:
+    bytecode = _runtime_matches_interpreter()
+  output_dir.mkdir(parents=True, exist_ok=True)
+  entries: Dict[str, bytes] = {
+    f'{module}.py': (
+      f'"""Lambda entry point for the {module} handler."""\n\n'
+      f'from {TOP_LEVEL_PACKAGE}.lambdas.{module} import lambda_handler\n\n'
+      "__all__ = ['lambda_handler']\n"
+    ).encode('utf-8'),
+  }
+  for name in handler_modules(module):
+    path = _module_path(name)
+    arcname = path.relative_to(PACKAGE_ROOT.parent).as_posix()
+    entries[arcname] = path.read_bytes()
+
+  if bytecode:
+    with tempfile.TemporaryDirectory(prefix='api-bundle-') as tmp:
+      for arcname, data in list(entries.items()):
+        source = Path(tmp, arcname)
+        source.parent.mkdir(parents=True, exist_ok=True)
+        source.write_bytes(data)
+        cached = importlib.util.cache_from_source(arcname)
+        target = Path(tmp, cached)
+        py_compile.compile(
+          str(source), cfile=str(target), dfile=arcname, doraise=True,
+          invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+        entries[Path(cached).as_posix()] = target.read_bytes()
+
+  bundle = output_dir / f'{module}.zip'
+  tmp_bundle = bundle.with_name(f'.{bundle.name}.tmp')
+  with zipfile.ZipFile(tmp_bundle, 'w') as archive:
+    for arcname in sorted(entries):
+      _write_entry(archive, arcname, entries[arcname])
+  os.replace(tmp_bundle, bundle)
+  return bundle
+
+
+def lambda_modules() -> List[str]:
+  return sorted({operation.lambda_module for operation in REST_OPERATIONS})
+
+
+def build_all(output_dir: Path, bytecode: Optional[bool] = None) -> Dict[str, Path]:
+  """Build a bundle for every Lambda module referenced by the REST contracts."""
+
+  return {module: build_lambda_bundle(module, output_dir, bytecode) for module in lambda_modules()}
+
+
+def import_budget_ms(module: str) -> Optional[float]:
+  """Return the import budget for a handler, scaled by API_IMPORT_BUDGET_SCALE."""
+
+  budget = IMPORT_TIME_BUDGET_MS.get(module)
+  if budget is None:
+    return None
+  return budget * float(os.environ.get(BUDGET_SCALE_ENV) or 1)
+
+
+def measure_import_ms(bundle: Path, module: str, runs: int = 3) -> float:
+  """Return the fastest of ``runs`` cold imports of the bundled handler, in milliseconds.
+
+  Each run is a fresh interpreter with only the extracted bundle (and the
+  interpreter's own site-packages) on ``sys.path``.
+  """
+
+  best: Optional[float] = None
+  with tempfile.TemporaryDirectory(prefix='api-importtime-') as tmp:
+    with zipfile.ZipFile(bundle) as archive:
+      archive.extractall(tmp)
+    code = f'import sys; sys.path.insert(0, {tmp!r}); import {module}'
+    for _ in range(max(1, runs)):
+      result = subprocess.run(
+        [sys.executable, '-E', '-X', 'importtime', '-c', code],
+        cwd=tmp, capture_output=True, text=True, check=True,
+      )
+      total_us = 0
+      for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        # Only top-level entries: their cumulative time already covers nested imports.
+        if match and match.group(3) == ' ' and match.group(4) == module:
+          total_us = int(match.group(2))
+      elapsed = total_us / 1000
+      best = elapsed if best is None else min(best, elapsed)
+  return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description='Build minimal per-handler Lambda bundles.')
+  parser.add_argument('--output', type=Path, default=Path('dist/lambdas'), help='Directory for <module>.zip files.')
+  parser.add_argument('--check-budget', action='store_true', help='Fail when a handler exceeds its import budget.')
+  args = parser.parse_args(argv)
+
+  status = 0
+  for module, bundle in build_all(args.output).items():
+    with zipfile.ZipFile(bundle) as archive:
+      files = len(archive.namelist())
+    line = f'{bundle} ({files} files, {bundle.stat().st_size} bytes)'
+    if args.check_budget:
+      elapsed = measure_import_ms(bundle, module)
+      budget = import_budget_ms(module)
+      line += f', import {elapsed:.1f}ms'
+      if budget is not None:
+        line += f' / budget {budget:.0f}ms'
+        if elapsed > budget:
+          line += ' OVER BUDGET'
+          status = 1
+    print(line)
+  return status
+
+
+if __name__ == '__main__':
+  sys.exit(main())
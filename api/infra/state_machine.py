@@ -0,0 +1,348 @@
+"""Amazon States Language definitions generated from the orchestrator contract.
+
+``build_state_machine_definition()`` turns a :class:`StateMachineContract`
+into ASL, one state per contract state:
+
+- ``success`` becomes ``Next``; ``failure`` and ``timeout`` become ``Catch``
+  clauses (``States.ALL`` / ``States.Timeout``) that keep the execution state
+  and add the error under ``$.error``;
+- any other outcomes (``ready`` / ``failed``) become a ``<State>Outcome``
+  Choice state comparing the task result's ``status`` with the upper-cased
+  outcome; its default, the last such outcome, also catches task errors;
+- ``timeout_seconds`` becomes ``TimeoutSeconds``, and every retryable
+  integration gets a ``Retry`` policy with exponential backoff and jitter.
+
+The execution state is the provisioning request. Lambda tasks run the
+orchestration function (``${OrchestrationFunctionArn}``) with the task name
+and the state, and their result becomes the new state; the validation task
+returns the normalized request with ``startMonth`` and the ``encoder`` /
+``playback`` identifiers the SDK tasks read. ``events:waitForEvent`` is not a
+Step Functions integration: it is generated as
+``events:putEvents.waitForTaskToken``, publishing the task token that
+operations answer with ``SendTaskSuccess({"status": "READY" | "FAILED"})``.
+
+Express workflows cap executions at five minutes and cannot wait for task
+tokens, so ``split_express_workflow()`` cuts the contract at the first state
+that needs a Standard workflow: the short synchronous path (validate,
+persist, announce) runs as Express and hands the rest to the Standard
+machine with ``states:startExecution``. ``${...}`` placeholders are resolved
+by the template's ``DefinitionSubstitutions``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..contracts.spec import StateMachineContract, StateMachineState
+
+WORKFLOW_TYPES = ('STANDARD', 'EXPRESS')
+EXPRESS_MAX_SECONDS = 300
+
+LAMBDA_INVOKE = 'arn:aws:states:::lambda:invoke'
+WAIT_FOR_EVENT = 'arn:aws:states:::events:waitForEvent'
+START_EXECUTION = 'arn:aws:states:::states:startExecution'
+
+# Integrations that finish in well under the Express limit.
+EXPRESS_INTEGRATIONS = frozenset({
+  LAMBDA_INVOKE,
+  'arn:aws:states:::dynamodb:putItem',
+  'arn:aws:states:::dynamodb:updateItem',
+  'arn:aws:states:::events:putEvents',
+})
+
+EVENT_SOURCE = 'com.guidogerb.streams'
+HANDOFF_STATE = 'StartLifecycleWorkflow'
+
+_BACKOFF = {'IntervalSeconds': 1, 'MaxAttempts': 3, 'BackoffRate': 2.0, 'MaxDelaySeconds': 20, 'JitterStrategy': 'FULL'}
+
+# SDK integration errors are prefixed with the service (e.g. MediaLive.ThrottlingException) and
+# ErrorEquals has no wildcard short of States.ALL, so each service the workflows call is listed.
+_AWS_SDK_SERVICES = ('MediaLive', 'CloudFront')
+_AWS_SDK_TRANSIENT_ERRORS = [
+  f'{service}.{error}'
+  for service in _AWS_SDK_SERVICES
+  for error in (
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'InternalServerErrorException',
+  )
+]
+
+# Only transient errors are retried: a Lambda that rejects the request must not run again.
+RETRY_POLICIES: Dict[str, List[Dict[str, Any]]] = {
+  'lambda': [{
+    'ErrorEquals': [
+      'Lambda.ServiceException',
+      'Lambda.AWSLambdaException',
+      'Lambda.SdkClientException',
+      'Lambda.TooManyRequestsException',
+    ],
+    **_BACKOFF,
+  }],
+  'dynamodb': [{
+    'ErrorEquals': [
+      'DynamoDB.ProvisionedThroughputExceededException',
+      'DynamoDB.RequestLimitExceeded',
+      'DynamoDB.ThrottlingException',
+      'DynamoDB.InternalServerErrorException',
+    ],
+    **_BACKOFF,
+  }],
+  'events': [{'ErrorEquals': ['EventBridge.InternalException', 'EventBridge.ThrottlingException'], **_BACKOFF}],
+  'aws-sdk': [{'ErrorEquals': [*_AWS_SDK_TRANSIENT_ERRORS, 'States.Timeout'], **_BACKOFF, 'IntervalSeconds': 5, 'MaxDelaySeconds': 60}],
+  'states': [{'ErrorEquals': ['StepFunctions.SdkClientException', 'StepFunctions.ThrottlingException'], **_BACKOFF}],
+}
+
+
+def _service(integration: str) -> str:
+  return integration.split(':::', 1)[1].split(':', 1)[0]
+
+
+def _event_entry(detail_type: str, detail: Dict[str, Any]) -> Dict[str, Any]:
+  return {
+    'Entries': [{
+      'EventBusName': '${EventBusName}',
+      'Source': EVENT_SOURCE,
+      'DetailType': detail_type,
+      'Detail': detail,
+    }],
+  }
+
+
+def _progress_detail(state: StateMachineState) -> Dict[str, Any]:
+  return {'streamId.$': '$.streamId', 'status': state.stream_status, 'occurredAt.$': '$$.State.EnteredTime'}
+
+
+def _task_fields(state: StateMachineState) -> Dict[str, Any]:
+  """Return Resource, Parameters, and result handling for one contract task."""
+
+  integration = state.integration
+  if integration == LAMBDA_INVOKE:
+    return {
+      'Resource': LAMBDA_INVOKE,
+      'Parameters': {
+        'FunctionName': '${OrchestrationFunctionArn}',
+        'Payload': {'task': state.name, 'executionId.$': '$$.Execution.Id', 'state.$': '$'},
+      },
+      'OutputPath': '$.Payload',
+    }
+  if integration == 'arn:aws:states:::dynamodb:putItem':
+    return {
+      'Resource': integration,
+      'Parameters': {
+        'TableName': '${StreamsTableName}',
+        'Item': {
+          'streamId': {'S.$': '$.streamId'},
+          'status': {'S': state.stream_status},
+          'title': {'S.$': '$.title'},
+          'startTime': {'S.$': '$.startTime'},
+          'startMonth': {'S.$': '$.startMonth'},
+          'updatedAt': {'S.$': '$$.State.EnteredTime'},
+        },
+      },
+      'ResultPath': None,
+    }
+  if integration == 'arn:aws:states:::dynamodb:updateItem':
+    return {
+      'Resource': integration,
+      'Parameters': {
+        'TableName': '${StreamsTableName}',
+        'Key': {'streamId': {'S.$': '$.streamId'}},
+        'UpdateExpression': 'SET #status = :status, updatedAt = :updatedAt',
+        'ExpressionAttributeNames': {'#status': 'status'},
+        'ExpressionAttributeValues': {
+          ':status': {'S': state.stream_status},
+          ':updatedAt': {'S.$': '$$.State.EnteredTime'},
+        },
+      },
+      'ResultPath': None,
+    }
+  if integration == 'arn:aws:states:::events:putEvents':
+    if state.emits_events == ['StreamProvisionRequested']:
+      detail = {f'{key}.$': f'$.{key}' for key in ('streamId', 'title', 'startTime', 'ingestEndpoints')}
+    else:
+      detail = _progress_detail(state)
+    return {
+      'Resource': integration,
+      'Parameters': _event_entry(state.emits_events[0] if state.emits_events else 'StreamLifecycleProgressed', detail),
+      'ResultPath': None,
+    }
+  if integration == WAIT_FOR_EVENT:
+    return {
+      'Resource': 'arn:aws:states:::events:putEvents.waitForTaskToken',
+      'Parameters': _event_entry('StreamLifecycleProgressed', {**_progress_detail(state), 'taskToken.$': '$$.Task.Token'}),
+      'ResultPath': '$.confirmation',
+    }
+  if integration == 'arn:aws:states:::aws-sdk:medialive:startChannel':
+    return {'Resource': integration, 'Parameters': {'ChannelId.$': '$.encoder.channelId'}, 'ResultPath': None}
+  if integration == 'arn:aws:states:::aws-sdk:cloudfront:updateDistribution':
+    return {
+      'Resource': integration,
+      'Parameters': {
+        'Id.$': '$.playback.distributionId',
+        'IfMatch.$': '$.playback.etag',
+        'DistributionConfig.$': '$.playback.distributionConfig',
+      },
+      'ResultPath': None,
+    }
+  raise ValueError(f'No ASL mapping for integration {integration} ({state.name}).')
+
+
+def _result_field(fields: Dict[str, Any]) -> str:
+  path = fields.get('ResultPath')
+  return f'{path}.status' if path else '$.status'
+
+
+def _state_definition(state: StateMachineState, states: Dict[str, Any]) -> None:
+  """Add state (and its Outcome choice, if any) to states."""
+
+  if state.state_type == 'Succeed':
+    states[state.name] = {'Type': 'Succeed', 'Comment': state.description}
+    return
+  if state.state_type == 'Fail':
+    states[state.name] = {'Type': 'Fail', 'Comment': state.description, 'Error': 'StreamProvisioningFailed', 'Cause': state.description}
+    return
+  if state.state_type != 'Task':
+    raise ValueError(f'Unsupported state type {state.state_type} ({state.name}).')
+
+  fields = _task_fields(state)
+  definition: Dict[str, Any] = {'Type': 'Task', 'Comment': state.description, **fields}
+  if state.timeout_seconds is not None:
+    definition['TimeoutSeconds'] = state.timeout_seconds
+  if not fields['Resource'].endswith('.waitForTaskToken'):
+    definition['Retry'] = RETRY_POLICIES[_service(state.integration)]
+
+  choices = [(outcome, target) for outcome, target in state.transitions.items() if outcome not in ('success', 'failure', 'timeout')]
+  # Errors on a task that only declares outcomes (e.g. SendTaskFailure) go where an unknown outcome would.
+  fallback = state.transitions.get('failure') or (choices[-1][1] if choices else None)
+  catches = []
+  if 'timeout' in state.transitions:
+    catches.append({'ErrorEquals': ['States.Timeout'], 'ResultPath': '$.error', 'Next': state.transitions['timeout']})
+  if fallback is not None:
+    catches.append({'ErrorEquals': ['States.ALL'], 'ResultPath': '$.error', 'Next': fallback})
+  if catches:
+    definition['Catch'] = catches
+
+  if 'success' in state.transitions:
+    definition['Next'] = state.transitions['success']
+  elif choices:
+    choice_name = f'{state.name}Outcome'
+    definition['Next'] = choice_name
+    states[choice_name] = {
+      'Type': 'Choice',
+      'Choices': [
+        {'Variable': _result_field(fields), 'StringEquals': outcome.upper(), 'Next': target}
+        for outcome, target in choices
+      ],
+      'Default': fallback,
+    }
+  else:
+    definition['End'] = True
+  states[state.name] = definition
+
+
+def _reachable(by_name: Dict[str, StateMachineState], start: str, stop: Optional[Any] = None) -> List[str]:
+  """Return state names reachable from start in discovery order, not expanding states where stop() is true."""
+
+  order: List[str] = []
+  pending = [start]
+  while pending:
+    name = pending.pop(0)
+    if name in order:
+      continue
+    order.append(name)
+    state = by_name[name]
+    if stop is None or not stop(state):
+      pending.extend(state.transitions.values())
+  return order
+
+
+def build_state_machine_definition(
+  contract: StateMachineContract,
+  start_at: Optional[str] = None,
+  workflow_type: str = 'STANDARD',
+) -> Dict[str, Any]:
+  """Generate the ASL definition for contract, starting at start_at (default: its first state)."""
+
+  if workflow_type not in WORKFLOW_TYPES:
+    raise ValueError(f'workflow_type must be one of {", ".join(WORKFLOW_TYPES)}.')
+  by_name = {state.name: state for state in contract.states}
+  start_at = start_at or contract.states[0].name
+  states: Dict[str, Any] = {}
+  for name in _reachable(by_name, start_at):
+    _state_definition(by_name[name], states)
+  definition: Dict[str, Any] = {'Comment': contract.description, 'StartAt': start_at, 'States': states}
+  if workflow_type == 'EXPRESS':
+    _check_express(definition)
+  return definition
+
+
+def _express_compatible(state: StateMachineState) -> bool:
+  if state.state_type != 'Task':
+    return True
+  return state.integration in EXPRESS_INTEGRATIONS and (state.timeout_seconds or 0) <= EXPRESS_MAX_SECONDS
+
+
+def _check_express(definition: Dict[str, Any]) -> None:
+  for name, state in definition['States'].items():
+    if state.get('Resource', '').endswith('.waitForTaskToken') or state.get('TimeoutSeconds', 0) > EXPRESS_MAX_SECONDS:
+      raise ValueError(f'{name} cannot run in an Express workflow.')
+
+
+def split_express_workflow(contract: StateMachineContract) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+  """Return ``(express, standard)`` definitions for the synchronous prefix and the rest.
+
+  The Express definition covers every state reachable from the start without
+  passing a state that needs a Standard workflow; that boundary state (there
+  must be exactly one) is replaced by a ``states:startExecution`` hand-off to
+  the Standard definition, which starts there.
+  """
+
+  by_name = {state.name: state for state in contract.states}
+  reachable = _reachable(by_name, contract.states[0].name, stop=lambda state: not _express_compatible(state))
+  boundary = [name for name in reachable if not _express_compatible(by_name[name])]
+  if len(boundary) != 1:
+    raise ValueError(f'Expected one Express/Standard boundary in {contract.name}, found {boundary or "none"}.')
+
+  express_states: Dict[str, Any] = {}
+  for name in reachable:
+    if name not in boundary:
+      _state_definition(by_name[name], express_states)
+  for state in express_states.values():
+    for reference in [state, *state.get('Catch', []), *state.get('Choices', [])]:
+      if reference.get('Next') == boundary[0]:
+        reference['Next'] = HANDOFF_STATE
+    if state.get('Default') == boundary[0]:
+      state['Default'] = HANDOFF_STATE
+
+  failure = by_name[boundary[0]].transitions.get('failure')
+  handoff: Dict[str, Any] = {
+    'Type': 'Task',
+    'Comment': f'Hand the stream to the Standard lifecycle workflow at {boundary[0]}.',
+    'Resource': START_EXECUTION,
+    'Parameters': {'StateMachineArn': '${LifecycleStateMachineArn}', 'Input.$': '$'},
+    'ResultPath': None,
+    'Retry': RETRY_POLICIES['states'],
+    'End': True,
+  }
+  if failure in express_states:
+    handoff['Catch'] = [{'ErrorEquals': ['States.ALL'], 'ResultPath': '$.error', 'Next': failure}]
+  express_states[HANDOFF_STATE] = handoff
+
+  express = {
+    'Comment': f'{contract.description} (synchronous provisioning path)',
+    'StartAt': contract.states[0].name,
+    'TimeoutSeconds': EXPRESS_MAX_SECONDS,
+    'States': express_states,
+  }
+  _check_express(express)
+  return express, build_state_machine_definition(contract, start_at=boundary[0])
+
+
+__all__ = [
+  'RETRY_POLICIES',
+  'WORKFLOW_TYPES',
+  'build_state_machine_definition',
+  'split_express_workflow',
+]
@@ -0,0 +1,40 @@
+"""Write the CloudFormation template and OpenAPI document for deployment.
+
+Files are only rewritten when their content changed, and each line of output
+reports the artifact's SHA-256, so a deploy script can skip the stack update
+when ``template.json`` is reported unchanged (or its hash matches the one
+recorded for the deployed stack).
+
+Usage:
+    python -m api.infra.synth [--output dist] [--workflow-type STANDARD|EXPRESS]
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from ..contracts.artifacts import openapi_artifact, write_if_changed
+from .state_machine import WORKFLOW_TYPES
+from .template import template_artifact
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  parser = argparse.ArgumentParser(description='Write template.json and openapi.json when they change.')
+  parser.add_argument('--output', type=Path, default=Path('dist'), help='Directory for the generated documents.')
+  parser.add_argument('--workflow-type', choices=WORKFLOW_TYPES, default='STANDARD', help='Orchestrator workflow type.')
+  args = parser.parse_args(argv)
+
+  for filename, artifact in (
+    ('template.json', template_artifact(args.workflow_type)),
+    ('openapi.json', openapi_artifact()),
+  ):
+    path = args.output / filename
+    state = 'updated' if write_if_changed(artifact, path) else 'unchanged'
+    print(f'{path} {artifact.sha256} {state}')
+  return 0
+
+
+if __name__ == '__main__':
+  raise SystemExit(main())
@@ -5,11 +5,23 @@ from __future__ import annotations
 import re
 from typing import Dict, List, Optional, Set, Tuple
 
-from ..contracts import REST_OPERATIONS
+from ..contracts import REST_OPERATIONS, STATE_MACHINES
+from ..contracts.artifacts import BuiltDocument, cached_artifact
+from ..lambdas.registry import START_TIME_INDEX, STATUS_INDEX, TABLE_ENV
+from .state_machine import WORKFLOW_TYPES, build_state_machine_definition, split_express_workflow
 
+LAMBDA_RUNTIME = 'python3.12'
 
-def build_cloudformation_template() -> Dict[str, object]:
-  """Create a CloudFormation template describing the API infrastructure."""
+
+def build_cloudformation_template(workflow_type: str = 'STANDARD') -> Dict[str, object]:
+  """Create a CloudFormation template describing the API infrastructure.
+
+  With ``workflow_type='EXPRESS'`` the synchronous start of the orchestrator
+  runs as an Express state machine that hands off to the Standard one.
+  """
+
+  if workflow_type not in WORKFLOW_TYPES:
+    raise ValueError(f'workflow_type must be one of {", ".join(WORKFLOW_TYPES)}.')
 
   template: Dict[str, object] = {
     'AWSTemplateFormatVersion': '2010-09-09',
@@ -32,6 +44,10 @@ def build_cloudformation_template() -> Dict[str, object]:
         'Type': 'String',
         'Description': 'IAM role assumed by the Step Functions state machine.',
       },
+      'OrchestrationFunctionArn': {
+        'Type': 'String',
+        'Description': 'Lambda function running the orchestrator\'s validation and failure-handling tasks.',
+      },
     },
     'Resources': {},
     'Outputs': {},
@@ -54,7 +70,41 @@ def build_cloudformation_template() -> Dict[str, object]:
     },
   }
 
+  resources['StreamsTable'] = {
+    'Type': 'AWS::DynamoDB::Table',
+    'Properties': {
+      'TableName': {'Fn::Sub': '${AWS::StackName}-streams'},
+      'BillingMode': 'PAY_PER_REQUEST',
+      'AttributeDefinitions': [
+        {'AttributeName': 'streamId', 'AttributeType': 'S'},
+        {'AttributeName': 'status', 'AttributeType': 'S'},
+        {'AttributeName': 'startMonth', 'AttributeType': 'S'},
+        {'AttributeName': 'startTime', 'AttributeType': 'S'},
+      ],
+      'KeySchema': [{'AttributeName': 'streamId', 'KeyType': 'HASH'}],
+      'GlobalSecondaryIndexes': [
+        {
+          'IndexName': STATUS_INDEX,
+          'KeySchema': [
+            {'AttributeName': 'status', 'KeyType': 'HASH'},
+            {'AttributeName': 'streamId', 'KeyType': 'RANGE'},
+          ],
+          'Projection': {'ProjectionType': 'ALL'},
+        },
+        {
+          'IndexName': START_TIME_INDEX,
+          'KeySchema': [
+            {'AttributeName': 'startMonth', 'KeyType': 'HASH'},
+            {'AttributeName': 'startTime', 'KeyType': 'RANGE'},
+          ],
+          'Projection': {'ProjectionType': 'ALL'},
+        },
+      ],
+    },
+  }
+
   lambda_modules: Set[str] = {operation.lambda_module for operation in REST_OPERATIONS}
+  entry_state_machine = 'StreamProvisioningStateMachine' if workflow_type == 'EXPRESS' else 'StreamLifecycleStateMachine'
   method_logical_ids: List[str] = []
 
   for module in sorted(lambda_modules):
@@ -66,7 +116,7 @@ def build_cloudformation_template() -> Dict[str, object]:
           'Fn::Sub': f'${{AWS::StackName}}-{module.replace("_", "-")}',
         },
         'Handler': f'{module}.lambda_handler',
-        'Runtime': 'python3.12',
+        'Runtime': LAMBDA_RUNTIME,
         'Timeout': 30,
         'MemorySize': 256,
         'Role': {'Ref': 'LambdaExecutionRoleArn'},
@@ -80,7 +130,8 @@ def build_cloudformation_template() -> Dict[str, object]:
     if module == 'streams':
       resources[function_id]['Properties']['Environment'] = {
         'Variables': {
-          'STATE_MACHINE_ARN': {'Ref': 'StreamLifecycleStateMachine'},
+          'STATE_MACHINE_ARN': {'Ref': entry_state_machine},
+          TABLE_ENV: {'Ref': 'StreamsTable'},
         },
       }
 
@@ -129,34 +180,38 @@ def build_cloudformation_template() -> Dict[str, object]:
     if target_resource:
       resources[target_resource] = resources[target_resource]
 
+  orchestrator = STATE_MACHINES[0]
+  substitutions = {
+    'OrchestrationFunctionArn': {'Ref': 'OrchestrationFunctionArn'},
+    'StreamsTableName': {'Ref': 'StreamsTable'},
+    'EventBusName': {'Ref': 'StreamLifecycleEventBus'},
+  }
+  if workflow_type == 'EXPRESS':
+    express_definition, lifecycle_definition = split_express_workflow(orchestrator)
+    resources['StreamProvisioningStateMachine'] = {
+      'Type': 'AWS::StepFunctions::StateMachine',
+      'Properties': {
+        'RoleArn': {'Ref': 'StateMachineRoleArn'},
+        'StateMachineName': {'Fn::Sub': '${AWS::StackName}-stream-provisioning'},
+        'StateMachineType': 'EXPRESS',
+        'Definition': express_definition,
+        'DefinitionSubstitutions': {
+          **substitutions,
+          'LifecycleStateMachineArn': {'Ref': 'StreamLifecycleStateMachine'},
+        },
+      },
+    }
+  else:
+    lifecycle_definition = build_state_machine_definition(orchestrator)
+
   resources['StreamLifecycleStateMachine'] = {
     'Type': 'AWS::StepFunctions::StateMachine',
     'Properties': {
       'RoleArn': {'Ref': 'StateMachineRoleArn'},
       'StateMachineName': {'Fn::Sub': '${AWS::StackName}-stream-lifecycle'},
-      'Definition': {
-        'Comment': 'Initial stream lifecycle orchestrator scaffold.',
-        'StartAt': 'InitializeRequest',
-        'States': {
-          'InitializeRequest': {
-            'Type': 'Pass',
-            'Parameters': {
-              'stream.$': '$.streamId',
-              'startTime.$': '$.startTime',
-            },
-            'ResultPath': '$.context',
-            'Next': 'PublishRequestedEvent',
-          },
-          'PublishRequestedEvent': {
-            'Type': 'Pass',
-            'Result': {
-              'detailType': 'StreamLifecycleProgressed',
-              'status': 'PROVISIONING',
-            },
-            'End': True,
-          },
-        },
-      },
+      'StateMachineType': 'STANDARD',
+      'Definition': lifecycle_definition,
+      'DefinitionSubstitutions': substitutions,
     },
   }
 
@@ -191,11 +246,20 @@ def build_cloudformation_template() -> Dict[str, object]:
     },
     'StateMachineArn': {'Value': {'Ref': 'StreamLifecycleStateMachine'}},
     'EventBusName': {'Value': {'Ref': 'StreamLifecycleEventBus'}},
+    'StreamsTableName': {'Value': {'Ref': 'StreamsTable'}},
   }
+  if workflow_type == 'EXPRESS':
+    template['Outputs']['ProvisioningStateMachineArn'] = {'Value': {'Ref': 'StreamProvisioningStateMachine'}}
 
   return template
 
 
+def template_artifact(workflow_type: str = 'STANDARD') -> BuiltDocument:
+  """Return the cached, read-only template with its canonical JSON and hash."""
+
+  return cached_artifact('template', build_cloudformation_template, workflow_type)
+
+
 def _ensure_resource_for_path(resources: Dict[str, object], path: str) -> Tuple[Optional[str], object]:
   """Create intermediate API Gateway resources for a path."""
 
@@ -244,4 +308,4 @@ def _method_logical_id(name: str) -> str:
   return f'{_to_camel_case(name)}Method'
 
 
-__all__ = ['build_cloudformation_template']
+__all__ = ['LAMBDA_RUNTIME', 'build_cloudformation_template', 'template_artifact']
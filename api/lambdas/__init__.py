@@ -1,5 +1,25 @@
-"""Lambda handlers powering the GuidoGerb API Gateway deployment."""
+"""Lambda handlers powering the GuidoGerb API Gateway deployment.
 
-from . import health, streams
+Handler modules are imported on first attribute access so that each function
+only pays for the modules it uses on a cold start (``health`` never loads the
+contracts or the schema validators that ``streams`` needs).
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any
 
 __all__ = ['health', 'streams']
+
+
+def __getattr__(name: str) -> Any:
+  if name in __all__:
+    module = importlib.import_module(f'.{name}', __name__)
+    globals()[name] = module
+    return module
+  raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> list:
+  return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,136 @@
+"""JSON codec used for Lambda request and response bodies.
+
+The fastest installed backend is selected at import time: ``orjson``, then
+``msgspec``, then the standard library. Set ``API_JSON_CODEC`` to ``orjson``,
+``msgspec`` or ``json`` to pin one, or call ``set_codec()`` (tests do).
+
+Every backend emits compact UTF-8 JSON (no spaces after separators, non-ASCII
+characters left unescaped), so response bodies are byte-identical whichever
+backend is active. The one known difference is floats that Python prints in
+exponent form (``1e-05`` vs ``0.00001``); the handlers never emit them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+CODEC_ENV = 'API_JSON_CODEC'
+
+JsonInput = Union[str, bytes, bytearray]
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+  """A JSON backend: ``dumps`` returns text, ``loads`` accepts text or UTF-8 bytes."""
+
+  name: str
+  dumps: Callable[[Any], str]
+  loads: Callable[[JsonInput], Any]
+  decode_errors: Tuple[type, ...]
+
+
+def _stdlib_codec() -> JsonCodec:
+  return JsonCodec(
+    name='json',
+    dumps=partial(json.dumps, separators=(',', ':'), ensure_ascii=False),
+    loads=json.loads,
+    decode_errors=(ValueError,),
+  )
+
+
+def _orjson_codec() -> JsonCodec:
+  import orjson
+
+  dumps = orjson.dumps
+  return JsonCodec(
+    name='orjson',
+    dumps=lambda value: dumps(value).decode('utf-8'),
+    loads=orjson.loads,
+    decode_errors=(ValueError,),
+  )
+
+
+def _msgspec_codec() -> JsonCodec:
+  import msgspec
+
+  encode = msgspec.json.Encoder().encode
+  return JsonCodec(
+    name='msgspec',
+    dumps=lambda value: encode(value).decode('utf-8'),
+    loads=msgspec.json.Decoder().decode,
+    decode_errors=(msgspec.DecodeError, ValueError),
+  )
+
+
+BACKENDS: Dict[str, Callable[[], JsonCodec]] = {
+  'orjson': _orjson_codec,
+  'msgspec': _msgspec_codec,
+  'json': _stdlib_codec,
+}
+
+
+def load_codec(name: Optional[str] = None) -> JsonCodec:
+  """Return the named backend, or the first importable one when name is empty.
+
+  Raises ``ValueError`` for an unknown name and ``ImportError`` when the named
+  backend is not installed.
+  """
+
+  if name:
+    if name not in BACKENDS:
+      raise ValueError(f'Unknown JSON codec {name!r}; expected one of {", ".join(BACKENDS)}.')
+    return BACKENDS[name]()
+
+  for factory in BACKENDS.values():
+    try:
+      return factory()
+    except ImportError:
+      continue
+  return _stdlib_codec()
+
+
+_codec = load_codec(os.environ.get(CODEC_ENV))
+
+
+def get_codec() -> JsonCodec:
+  return _codec
+
+
+def set_codec(codec: Union[JsonCodec, str, None]) -> JsonCodec:
+  """Switch the active backend (by codec or name; None picks the fastest) and return the previous one."""
+
+  global _codec
+  previous = _codec
+  _codec = codec if isinstance(codec, JsonCodec) else load_codec(codec)
+  return previous
+
+
+def dumps(value: Any) -> str:
+  return _codec.dumps(value)
+
+
+def loads(data: JsonInput) -> Any:
+  return _codec.loads(data)
+
+
+def decode_error_message(exc: Exception) -> str:
+  """Return a short description of a decode failure, whichever backend raised it."""
+
+  return getattr(exc, 'msg', None) or str(exc)
+
+
+__all__ = [
+  'BACKENDS',
+  'CODEC_ENV',
+  'JsonCodec',
+  'decode_error_message',
+  'dumps',
+  'get_codec',
+  'load_codec',
+  'loads',
+  'set_codec',
+]
@@ -0,0 +1,257 @@
+"""Idempotency-Key support for the POST handlers.
+
+Clients (the broadcaster portal, or API Gateway retrying on their behalf)
+send an ``Idempotency-Key`` header. The first successful response for a key
+is remembered and replayed verbatim for repeats, without parsing, validating,
+or starting another orchestration. Keys are scoped per operation and bound to
+a fingerprint of the raw body; reusing a key with a different body is
+rejected with 422.
+
+Lookups go to an in-process LRU with a TTL first (warm containers), then to
+an optional persistent :class:`IdempotencyStore` shared by every container.
+:class:`SqliteStore` is the local stand-in for that backend; a DynamoDB table
+with ``expires_at`` as its TTL attribute implements the same two methods.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from . import codec
+from .responses import json_response
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+TTL_ENV = 'IDEMPOTENCY_TTL_SECONDS'
+STORE_PATH_ENV = 'IDEMPOTENCY_STORE_PATH'
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1024
+
+Clock = Callable[[], float]
+Handler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+  """A remembered response and the body fingerprint it was produced for."""
+
+  fingerprint: str
+  response: Dict[str, Any]
+  expires_at: float
+
+
+class IdempotencyStore(ABC):
+  """Persistent backend shared across Lambda containers."""
+
+  @abstractmethod
+  def get(self, key: str) -> Optional[StoredResponse]:
+    """Return the unexpired entry for key, if any."""
+
+  @abstractmethod
+  def put(self, key: str, entry: StoredResponse) -> None:
+    """Store entry under key, replacing an existing one."""
+
+
+class MemoryStore(IdempotencyStore):
+  """Bounded LRU of entries held by one warm container."""
+
+  def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, clock: Clock = time.time) -> None:
+    self.max_entries = max_entries
+    self._clock = clock
+    self._entries: 'OrderedDict[str, StoredResponse]' = OrderedDict()
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def get(self, key: str) -> Optional[StoredResponse]:
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        return None
+      if entry.expires_at <= self._clock():
+        del self._entries[key]
+        return None
+      self._entries.move_to_end(key)
+      return entry
+
+  def put(self, key: str, entry: StoredResponse) -> None:
+    with self._lock:
+      self._entries[key] = entry
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+
+class SqliteStore(IdempotencyStore):
+  """File-backed store used locally in place of the shared DynamoDB table."""
+
+  def __init__(self, path: str, clock: Clock = time.time) -> None:
+    # Imported here: containers without a store path never need sqlite3.
+    import sqlite3
+
+    self.path = path
+    self._clock = clock
+    self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    self._connection.execute(
+      'CREATE TABLE IF NOT EXISTS idempotency ('
+      'key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, response TEXT NOT NULL, expires_at REAL NOT NULL)'
+    )
+    self._lock = threading.Lock()
+
+  def get(self, key: str) -> Optional[StoredResponse]:
+    with self._lock:
+      row = self._connection.execute(
+        'SELECT fingerprint, response, expires_at FROM idempotency WHERE key = ? AND expires_at > ?',
+        (key, self._clock()),
+      ).fetchone()
+    if row is None:
+      return None
+    return StoredResponse(row[0], codec.loads(row[1]), row[2])
+
+  def put(self, key: str, entry: StoredResponse) -> None:
+    with self._lock:
+      self._connection.execute(
+        'INSERT OR REPLACE INTO idempotency (key, fingerprint, response, expires_at) VALUES (?, ?, ?, ?)',
+        (key, entry.fingerprint, codec.dumps(entry.response), entry.expires_at),
+      )
+
+  def purge_expired(self) -> int:
+    """Delete expired rows (DynamoDB does this itself through its TTL attribute)."""
+
+    with self._lock:
+      return self._connection.execute('DELETE FROM idempotency WHERE expires_at <= ?', (self._clock(),)).rowcount
+
+  def close(self) -> None:
+    self._connection.close()
+
+
+class IdempotencyCache:
+  """Replay remembered responses for repeated Idempotency-Key requests."""
+
+  def __init__(
+    self,
+    memory: Optional[MemoryStore] = None,
+    store: Optional[IdempotencyStore] = None,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    clock: Clock = time.time,
+  ) -> None:
+    self.memory = memory if memory is not None else MemoryStore(clock=clock)
+    self.store = store
+    self.ttl_seconds = ttl_seconds
+    self._clock = clock
+    self.hits = 0
+    self.store_hits = 0
+    self.misses = 0
+    self.conflicts = 0
+
+  @classmethod
+  def from_env(cls) -> 'IdempotencyCache':
+    """Build the cache from IDEMPOTENCY_TTL_SECONDS and IDEMPOTENCY_STORE_PATH."""
+
+    ttl = float(os.environ.get(TTL_ENV) or DEFAULT_TTL_SECONDS)
+    path = os.environ.get(STORE_PATH_ENV)
+    return cls(store=SqliteStore(path) if path else None, ttl_seconds=ttl)
+
+  def stats(self) -> Dict[str, int]:
+    """Counters since the container started; ``hits`` includes ``store_hits``."""
+
+    return {
+      'hits': self.hits,
+      'storeHits': self.store_hits,
+      'misses': self.misses,
+      'conflicts': self.conflicts,
+      'entries': len(self.memory),
+    }
+
+  def _get(self, key: str) -> Optional[StoredResponse]:
+    entry = self.memory.get(key)
+    if entry is None and self.store is not None:
+      entry = self.store.get(key)
+      if entry is not None:
+        self.store_hits += 1
+        self.memory.put(key, entry)
+    return entry
+
+  def handle(self, event: Dict[str, Any], scope: str, handler: Handler) -> Dict[str, Any]:
+    """Run handler for event unless its Idempotency-Key was already answered."""
+
+    key = idempotency_key(event)
+    if key is None:
+      return handler(event)
+    if not key or len(key) > MAX_KEY_LENGTH:
+      return json_response(400, {
+        'message': 'Invalid request headers.',
+        'issues': [f'{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters.'],
+      })
+
+    cache_key = f'{scope}:{key}'
+    fingerprint = body_fingerprint(event)
+    entry = self._get(cache_key)
+    if entry is not None:
+      if entry.fingerprint != fingerprint:
+        self.conflicts += 1
+        return json_response(422, {
+          'message': 'Idempotency key reused.',
+          'issues': [f'{IDEMPOTENCY_HEADER} was already used with a different request body.'],
+        })
+      self.hits += 1
+      return {**entry.response, 'headers': {**entry.response.get('headers', {}), REPLAYED_HEADER: 'true'}}
+
+    self.misses += 1
+    response = handler(event)
+    if 200 <= response.get('statusCode', 500) < 300:
+      entry = StoredResponse(fingerprint, response, self._clock() + self.ttl_seconds)
+      self.memory.put(cache_key, entry)
+      if self.store is not None:
+        self.store.put(cache_key, entry)
+    return response
+
+
+def idempotency_key(event: Dict[str, Any]) -> Optional[str]:
+  """Return the Idempotency-Key header (matched case-insensitively), or None."""
+
+  headers = event.get('headers') or {}
+  value = headers.get(IDEMPOTENCY_HEADER)
+  if value is None:
+    wanted = IDEMPOTENCY_HEADER.lower()
+    value = next((v for name, v in headers.items() if name.lower() == wanted), None)
+  return value.strip() if isinstance(value, str) else None
+
+
+def body_fingerprint(event: Dict[str, Any]) -> str:
+  """Hash the raw body as received; cheaper than parsing it and exact for retries."""
+
+  body = event.get('body')
+  if body is None:
+    data = b''
+  elif isinstance(body, (bytes, bytearray)):
+    data = bytes(body)
+  elif isinstance(body, str):
+    data = body.encode('utf-8')
+  else:
+    data = codec.dumps(body).encode('utf-8')
+  digest = hashlib.sha256(b'b64:' if event.get('isBase64Encoded') else b'raw:')
+  digest.update(data)
+  return digest.hexdigest()
+
+
+__all__ = [
+  'IDEMPOTENCY_HEADER',
+  'IdempotencyCache',
+  'IdempotencyStore',
+  'MemoryStore',
+  'SqliteStore',
+  'StoredResponse',
+  'body_fingerprint',
+  'idempotency_key',
+]
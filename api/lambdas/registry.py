@@ -0,0 +1,474 @@
+"""Stream state repository behind the streams Lambda.
+
+Records are keyed by ``streamId`` with two secondary indexes, so neither
+lookups nor listings scan the whole registry:
+
+- by status: an insertion-ordered set of stream ids per status, so
+  ``GET /streams?status=LIVE`` touches only the k LIVE streams;
+- by start time: a sorted list of ``(startTime, streamId)`` pairs, so a
+  ``from``/``to`` window costs a binary search plus the k matches.
+
+:class:`InMemoryStreamRepository` keeps both in the container (local
+development, tests, and the default when no table is configured).
+:class:`DynamoDbStreamRepository` issues the equivalent DynamoDB calls
+against a table with a ``status-index`` GSI and a sparse
+``startMonth-startTime-index`` GSI; :class:`LocalDynamoTable` is a stand-in
+for that table.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional, Tuple
+
+TABLE_ENV = 'STREAMS_TABLE_NAME'
+STATUS_INDEX = 'status-index'
+START_TIME_INDEX = 'startMonth-startTime-index'
+
+DEFAULT_LIST_LIMIT = 100
+MAX_LIST_LIMIT = 1000
+# Without a status a window costs one index query per month it spans.
+MAX_WINDOW_MONTHS = 36
+
+
+@dataclass(frozen=True)
+class StreamRecord:
+  """Current lifecycle state of one stream."""
+
+  stream_id: str
+  status: str
+  updated_at: str
+  title: Optional[str] = None
+  start_time: Optional[str] = None  # normalized with normalize_timestamp()
+  reason: Optional[str] = None
+
+  def to_item(self) -> Dict[str, Any]:
+    """Return the API / DynamoDB item shape, omitting unset attributes."""
+
+    item: Dict[str, Any] = {'streamId': self.stream_id, 'status': self.status, 'updatedAt': self.updated_at}
+    if self.title is not None:
+      item['title'] = self.title
+    if self.start_time is not None:
+      item['startTime'] = self.start_time
+    if self.reason is not None:
+      item['reason'] = self.reason
+    return item
+
+  @classmethod
+  def from_item(cls, item: Dict[str, Any]) -> 'StreamRecord':
+    return cls(
+      stream_id=item['streamId'],
+      status=item['status'],
+      updated_at=item['updatedAt'],
+      title=item.get('title'),
+      start_time=item.get('startTime'),
+      reason=item.get('reason'),
+    )
+
+
+def normalize_timestamp(value: str) -> str:
+  """Return an RFC 3339 timestamp as UTC ``YYYY-MM-DDTHH:MM:SSZ`` so strings sort chronologically.
+
+  Raises ``ValueError`` when value is not a timestamp.
+  """
+
+  moment = datetime.fromisoformat(value.replace('z', 'Z').replace('Z', '+00:00'))
+  if moment.tzinfo is None:
+    moment = moment.replace(tzinfo=timezone.utc)
+  return moment.astimezone(timezone.utc).replace(microsecond=0).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+CONDITIONAL_CHECK_FAILED = 'ConditionalCheckFailedException'
+
+# Conditional writes retried when another writer changes the stream in between.
+MAX_UPDATE_ATTEMPTS = 3
+
+
+class InvalidTransition(ValueError):
+  """A status update that the stream's current status does not allow."""
+
+  def __init__(self, record: 'StreamRecord', status: str) -> None:
+    super().__init__(f'status cannot change from {record.status} to {status}.')
+    self.record = record
+    self.status = status
+
+
+def _sort_key(record: StreamRecord) -> Tuple[str, str]:
+  return record.start_time or '', record.stream_id
+
+
+def check_window(status: Optional[str], start_from: Optional[str], start_to: Optional[str]) -> None:
+  """Reject listings that no index can answer.
+
+  Every repository applies the same rule so listings do not depend on the
+  backend: without a status the DynamoDB start-time index is queried month by
+  month, which needs both ends and at most ``MAX_WINDOW_MONTHS`` months, and
+  with neither filter only a full table scan would do. Raises ``ValueError``.
+  """
+
+  if status is not None:
+    return
+  if start_from is None and start_to is None:
+    raise ValueError('Listing streams needs a status or a from/to window.')
+  if start_from is None or start_to is None:
+    raise ValueError('Listing by start time without a status needs both from and to.')
+  if _month_count(start_from, start_to) > MAX_WINDOW_MONTHS:
+    raise ValueError(f'A from/to window without a status may span at most {MAX_WINDOW_MONTHS} months.')
+
+
+class StreamRepository(ABC):
+  """Storage for stream lifecycle records."""
+
+  @abstractmethod
+  def get(self, stream_id: str) -> Optional[StreamRecord]:
+    """Return the record for stream_id, if registered."""
+
+  @abstractmethod
+  def put(self, record: StreamRecord) -> Optional[StreamRecord]:
+    """Store record, replacing and returning any previous record for the stream."""
+
+  @abstractmethod
+  def list(
+    self,
+    status: Optional[str] = None,
+    start_from: Optional[str] = None,
+    start_to: Optional[str] = None,
+    limit: int = DEFAULT_LIST_LIMIT,
+  ) -> List[StreamRecord]:
+    """Return records matching the filters, ordered by start time then id.
+
+    ``start_from``/``start_to`` are inclusive normalized timestamps; records
+    without a start time never match a time window. Without a status a
+    bounded window is required (see :func:`check_window`).
+    """
+
+  def add(self, record: StreamRecord) -> Optional[StreamRecord]:
+    """Store record unless the stream is already registered; return the existing record if so."""
+
+    existing = self.get(record.stream_id)
+    if existing is None:
+      self.put(record)
+    return existing
+
+  def update_status(
+    self,
+    stream_id: str,
+    status: str,
+    updated_at: str,
+    reason: Optional[str] = None,
+    allowed_from: Optional[AbstractSet[str]] = None,
+  ) -> Tuple[Optional[StreamRecord], StreamRecord]:
+    """Record a status change and return ``(previous, current)``.
+
+    Unregistered streams are created with just their id and status. When
+    ``allowed_from`` is given, a registered stream whose current status is
+    not in it is left unchanged and :class:`InvalidTransition` is raised.
+    """
+
+    previous = self.get(stream_id)
+    if previous is not None and allowed_from is not None and previous.status not in allowed_from:
+      raise InvalidTransition(previous, status)
+    if previous is None:
+      current = StreamRecord(stream_id, status, updated_at, reason=reason)
+    else:
+      current = replace(previous, status=status, updated_at=updated_at, reason=reason)
+    self.put(current)
+    return previous, current
+
+
+def _in_window(record: StreamRecord, start_from: Optional[str], start_to: Optional[str]) -> bool:
+  if start_from is None and start_to is None:
+    return True
+  if record.start_time is None:
+    return False
+  return (start_from is None or record.start_time >= start_from) and (start_to is None or record.start_time <= start_to)
+
+
+class InMemoryStreamRepository(StreamRepository):
+  """Dictionary-backed repository with status and start-time indexes."""
+
+  def __init__(self, records: Iterable[StreamRecord] = ()) -> None:
+    self._records: Dict[str, StreamRecord] = {}
+    self._by_status: Dict[str, Dict[str, None]] = {}
+    self._by_start: List[Tuple[str, str]] = []
+    self._lock = threading.Lock()
+    for record in records:
+      self.put(record)
+
+  def __len__(self) -> int:
+    return len(self._records)
+
+  def get(self, stream_id: str) -> Optional[StreamRecord]:
+    return self._records.get(stream_id)
+
+  def put(self, record: StreamRecord) -> Optional[StreamRecord]:
+    with self._lock:
+      previous = self._records.get(record.stream_id)
+      if previous is not None:
+        if previous.status != record.status:
+          del self._by_status[previous.status][previous.stream_id]
+        if previous.start_time != record.start_time and previous.start_time is not None:
+          key = (previous.start_time, previous.stream_id)
+          del self._by_start[bisect.bisect_left(self._by_start, key)]
+      if previous is None or previous.status != record.status:
+        self._by_status.setdefault(record.status, {})[record.stream_id] = None
+      if record.start_time is not None and (previous is None or previous.start_time != record.start_time):
+        bisect.insort(self._by_start, (record.start_time, record.stream_id))
+      self._records[record.stream_id] = record
+      return previous
+
+  def count(self, status: str) -> int:
+    return len(self._by_status.get(status, ()))
+
+  def list(
+    self,
+    status: Optional[str] = None,
+    start_from: Optional[str] = None,
+    start_to: Optional[str] = None,
+    limit: int = DEFAULT_LIST_LIMIT,
+  ) -> List[StreamRecord]:
+    check_window(status, start_from, start_to)
+    records = self._records
+    if status is not None:
+      matches = [records[stream_id] for stream_id in list(self._by_status.get(status, ()))]
+      matches = [record for record in matches if _in_window(record, start_from, start_to)]
+      matches.sort(key=_sort_key)
+      return matches[:limit]
+
+    index = self._by_start
+    low = bisect.bisect_left(index, (start_from, ''))
+    found: List[StreamRecord] = []
+    for start_time, stream_id in index[low:low + limit]:
+      if start_time > start_to:
+        break
+      found.append(records[stream_id])
+    return found
+
+
+def _is_conditional_check_failure(exc: Exception) -> bool:
+  error = getattr(exc, 'response', None) or {}
+  return error.get('Error', {}).get('Code') == CONDITIONAL_CHECK_FAILED
+
+
+def _month_count(start_from: str, start_to: str) -> int:
+  return (int(start_to[:4]) - int(start_from[:4])) * 12 + int(start_to[5:7]) - int(start_from[5:7]) + 1
+
+
+def _months(start_from: str, start_to: str) -> List[str]:
+  year, month = int(start_from[:4]), int(start_from[5:7])
+  last = (int(start_to[:4]), int(start_to[5:7]))
+  months = []
+  while (year, month) <= last:
+    months.append(f'{year:04d}-{month:02d}')
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+  return months
+
+
+class DynamoDbStreamRepository(StreamRepository):
+  """Repository backed by a DynamoDB table (a boto3 ``Table`` or :class:`LocalDynamoTable`).
+
+  Table layout: partition key ``streamId``; GSI ``status-index``
+  (``status`` / ``streamId``); sparse GSI ``startMonth-startTime-index``
+  (``startMonth`` / ``startTime``) holding only streams with a start time.
+  Time windows without a status need both ends so the month partitions to
+  query are known. Status updates are conditional writes on the status that
+  was checked, so the transition rules hold across concurrent containers.
+  """
+
+  def __init__(self, table: Any) -> None:
+    self.table = table
+
+  @classmethod
+  def from_env(cls) -> Optional['DynamoDbStreamRepository']:
+    name = os.environ.get(TABLE_ENV)
+    if not name:
+      return None
+    import boto3  # available in the Lambda runtime; only needed when a table is configured
+
+    return cls(boto3.resource('dynamodb').Table(name))
+
+  def get(self, stream_id: str) -> Optional[StreamRecord]:
+    item = self.table.get_item(Key={'streamId': stream_id}).get('Item')
+    return StreamRecord.from_item(item) if item else None
+
+  def put(self, record: StreamRecord, **condition: Any) -> Optional[StreamRecord]:
+    item = record.to_item()
+    if record.start_time is not None:
+      item['startMonth'] = record.start_time[:7]
+    previous = self.table.put_item(Item=item, ReturnValues='ALL_OLD', **condition).get('Attributes')
+    return StreamRecord.from_item(previous) if previous else None
+
+  def update_status(
+    self,
+    stream_id: str,
+    status: str,
+    updated_at: str,
+    reason: Optional[str] = None,
+    allowed_from: Optional[AbstractSet[str]] = None,
+  ) -> Tuple[Optional[StreamRecord], StreamRecord]:
+    for attempt in range(MAX_UPDATE_ATTEMPTS):
+      previous = self.get(stream_id)
+      if previous is not None and allowed_from is not None and previous.status not in allowed_from:
+        raise InvalidTransition(previous, status)
+      if previous is None:
+        current = StreamRecord(stream_id, status, updated_at, reason=reason)
+        condition = {'ConditionExpression': 'attribute_not_exists(streamId)'}
+      else:
+        current = replace(previous, status=status, updated_at=updated_at, reason=reason)
+        condition = {
+          'ConditionExpression': '#status = :expected',
+          'ExpressionAttributeNames': {'#status': 'status'},
+          'ExpressionAttributeValues': {':expected': previous.status},
+        }
+      try:
+        self.put(current, **condition)
+      except Exception as exc:  # noqa: BLE001 - botocore's ClientError, matched by code below
+        if not _is_conditional_check_failure(exc):
+          raise
+        # Another writer got in first: re-read and check the transition again.
+        continue
+      return previous, current
+    # Still contended after every attempt: report the status that keeps winning.
+    raise InvalidTransition(self.get(stream_id) or current, status)
+
+  def _paginate(self, operation: Any, **kwargs: Any) -> List[StreamRecord]:
+    records: List[StreamRecord] = []
+    while True:
+      page = operation(**kwargs)
+      records.extend(StreamRecord.from_item(item) for item in page.get('Items', []))
+      if 'LastEvaluatedKey' not in page:
+        return records
+      kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+  def _query(self, **kwargs: Any) -> List[StreamRecord]:
+    return self._paginate(self.table.query, **kwargs)
+
+  def list(
+    self,
+    status: Optional[str] = None,
+    start_from: Optional[str] = None,
+    start_to: Optional[str] = None,
+    limit: int = DEFAULT_LIST_LIMIT,
+  ) -> List[StreamRecord]:
+    check_window(status, start_from, start_to)
+    if status is not None:
+      records = self._query(
+        IndexName=STATUS_INDEX,
+        KeyConditionExpression='#status = :status',
+        ExpressionAttributeNames={'#status': 'status'},
+        ExpressionAttributeValues={':status': status},
+      )
+      records = [record for record in records if _in_window(record, start_from, start_to)]
+    else:
+      records = []
+      for month in _months(start_from, start_to):
+        records.extend(self._query(
+          IndexName=START_TIME_INDEX,
+          KeyConditionExpression='startMonth = :month AND startTime BETWEEN :from AND :to',
+          ExpressionAttributeValues={':month': month, ':from': start_from, ':to': start_to},
+        ))
+    records.sort(key=_sort_key)
+    return records[:limit]
+
+
+class ConditionalCheckFailed(Exception):
+  """Raised by :class:`LocalDynamoTable`; shaped like botocore's ``ClientError`` for that code."""
+
+  def __init__(self) -> None:
+    super().__init__('The conditional request failed')
+    self.response = {'Error': {'Code': CONDITIONAL_CHECK_FAILED, 'Message': str(self)}}
+
+
+class LocalDynamoTable:
+  """In-process stand-in for the streams table.
+
+  Implements the subset of the boto3 ``Table`` API that
+  :class:`DynamoDbStreamRepository` uses, and understands exactly the key
+  and condition expressions it issues; it is not a general DynamoDB emulator.
+  With ``page_size``, queries return at most that many items per
+  page plus a ``LastEvaluatedKey``, like DynamoDB's 1 MB page limit.
+  """
+
+  def __init__(self, page_size: Optional[int] = None) -> None:
+    self.items: Dict[str, Dict[str, Any]] = {}
+    self.page_size = page_size
+
+  def get_item(self, Key: Dict[str, Any]) -> Dict[str, Any]:
+    item = self.items.get(Key['streamId'])
+    return {'Item': dict(item)} if item is not None else {}
+
+  def put_item(
+    self,
+    Item: Dict[str, Any],
+    ReturnValues: str = 'NONE',
+    ConditionExpression: Optional[str] = None,
+    ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+    **_: Any,
+  ) -> Dict[str, Any]:
+    previous = self.items.get(Item['streamId'])
+    if ConditionExpression == 'attribute_not_exists(streamId)':
+      if previous is not None:
+        raise ConditionalCheckFailed()
+    elif ConditionExpression == '#status = :expected':
+      if previous is None or previous['status'] != ExpressionAttributeValues[':expected']:
+        raise ConditionalCheckFailed()
+    elif ConditionExpression is not None:
+      raise ValueError(f'Unsupported condition {ConditionExpression}')
+    self.items[Item['streamId']] = dict(Item)
+    return {'Attributes': previous} if previous is not None and ReturnValues == 'ALL_OLD' else {}
+
+  def _page(self, items: List[Dict[str, Any]], start_key: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    start = 0
+    if start_key is not None:
+      start = next(i for i, item in enumerate(items) if item['streamId'] == start_key['streamId']) + 1
+    end = len(items) if self.page_size is None else start + self.page_size
+    page: Dict[str, Any] = {'Items': [dict(item) for item in items[start:end]]}
+    if end < len(items):
+      page['LastEvaluatedKey'] = {'streamId': items[end - 1]['streamId']}
+    return page
+
+  def query(
+    self,
+    IndexName: str,
+    ExpressionAttributeValues: Dict[str, Any],
+    ExclusiveStartKey: Optional[Dict[str, Any]] = None,
+    **_: Any,
+  ) -> Dict[str, Any]:
+    values = ExpressionAttributeValues
+    if IndexName == STATUS_INDEX:
+      items = [item for item in self.items.values() if item['status'] == values[':status']]
+      items.sort(key=lambda item: item['streamId'])
+    elif IndexName == START_TIME_INDEX:
+      items = [
+        item for item in self.items.values()
+        if item.get('startMonth') == values[':month'] and values[':from'] <= item['startTime'] <= values[':to']
+      ]
+      items.sort(key=lambda item: item['startTime'])
+    else:
+      raise ValueError(f'Unknown index {IndexName}')
+    return self._page(items, ExclusiveStartKey)
+
+
+def repository_from_env() -> StreamRepository:
+  """Use the DynamoDB table named by STREAMS_TABLE_NAME, or an in-memory registry."""
+
+  return DynamoDbStreamRepository.from_env() or InMemoryStreamRepository()
+
+
+__all__ = [
+  'DynamoDbStreamRepository',
+  'InMemoryStreamRepository',
+  'ConditionalCheckFailed',
+  'InvalidTransition',
+  'LocalDynamoTable',
+  'StreamRecord',
+  'StreamRepository',
+  'check_window',
+  'normalize_timestamp',
+  'repository_from_env',
+]
@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import base64
-import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+from . import codec
+
 
 def json_response(status_code: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
   """Serialize a payload into the shape expected by API Gateway."""
@@ -19,7 +20,7 @@ def json_response(status_code: int, payload: Dict[str, Any], headers: Optional[D
   return {
     'statusCode': status_code,
     'headers': base_headers,
-    'body': json.dumps(payload),
+    'body': codec.dumps(payload),
   }
 
 
@@ -42,20 +43,17 @@ def parse_json_body(event: Dict[str, Any]) -> ParsedBody:
     except (ValueError, TypeError) as exc:
       return ParsedBody(value=None, error=f'bodyDecodeError:{exc}')
 
-  if isinstance(body, (bytes, bytearray)):
-    body = body.decode('utf-8')
+  if isinstance(body, dict):
+    return ParsedBody(value=body)
 
-  if isinstance(body, str):
-    body = body.strip()
-    if body == '':
+  if isinstance(body, (str, bytes, bytearray)):
+    # Decoded bytes go straight to the codec without a str round-trip.
+    if not body or body.isspace():
       return ParsedBody(value={})
     try:
-      return ParsedBody(value=json.loads(body))
-    except json.JSONDecodeError as exc:
-      return ParsedBody(value=None, error=f'invalidJson:{exc.msg}')
-
-  if isinstance(body, dict):
-    return ParsedBody(value=body)
+      return ParsedBody(value=codec.loads(body))
+    except codec.get_codec().decode_errors as exc:
+      return ParsedBody(value=None, error=f'invalidJson:{codec.decode_error_message(exc)}')
 
   return ParsedBody(value=None, error='unsupportedBodyType')
 
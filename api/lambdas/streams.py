@@ -3,15 +3,37 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, List
 
+from ..contracts.lifecycle import STATUS_TRANSITIONS
+from ..contracts.spec import BATCH_CREATE_STREAMS_REQUEST_SCHEMA
+from ..contracts.validation import QUERY_VALIDATORS, REQUEST_VALIDATORS, compile_schema
+from .idempotency import IdempotencyCache
+from .registry import DEFAULT_LIST_LIMIT, InvalidTransition, StreamRecord, normalize_timestamp, repository_from_env
 from .responses import ParsedBody, iso_timestamp, json_response, parse_json_body
 
 STATE_MACHINE_ENV = 'STATE_MACHINE_ARN'
 DEFAULT_STATE_MACHINE_ARN = (
   'arn:aws:states:us-east-1:000000000000:stateMachine:StreamLifecycleOrchestrator'
 )
-VALID_STATUSES = {'PROVISIONING', 'READY', 'LIVE', 'FAILED', 'COMPLETE'}
+
+validate_create_stream = REQUEST_VALIDATORS['CreateStreamWorkflow']
+validate_update_stream = REQUEST_VALIDATORS['UpdateStreamStatus']
+validate_list_query = QUERY_VALIDATORS['ListStreams']
+
+# Batch items are validated one at a time with validate_create_stream, so each
+# gets its own result; the envelope validator only checks the list itself.
+_BATCH_STREAMS_SCHEMA = BATCH_CREATE_STREAMS_REQUEST_SCHEMA['properties']['streams']
+validate_batch_envelope = compile_schema({
+  **BATCH_CREATE_STREAMS_REQUEST_SCHEMA,
+  'properties': {'streams': {key: value for key, value in _BATCH_STREAMS_SCHEMA.items() if key != 'items'}},
+}, 'validate_batch_envelope')
+
+# Remembered responses for Idempotency-Key retries; lives as long as the container.
+idempotency = IdempotencyCache.from_env()
+
+# Lifecycle state of every stream this API has seen (DynamoDB when STREAMS_TABLE_NAME is set).
+repository = repository_from_env()
 
 
 def lambda_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
@@ -21,12 +43,19 @@ def lambda_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
   if not method and isinstance(event.get('requestContext'), dict):
     method = (event['requestContext'].get('http', {}) or {}).get('method', '').upper()
 
-  if method == 'POST':
-    return _handle_create_stream(event)
-  if method == 'PUT':
+  if _is_batch_path(event):
+    if method == 'POST':
+      return idempotency.handle(event, 'BatchCreateStreamWorkflows', _handle_batch_create_streams)
+    allowed = 'POST'
+  elif method == 'POST':
+    return idempotency.handle(event, 'CreateStreamWorkflow', _handle_create_stream)
+  elif method == 'PUT':
     return _handle_update_stream(event)
+  elif method == 'GET':
+    return _handle_list_streams(event)
+  else:
+    allowed = 'POST, PUT, GET'
 
-  allowed = 'POST, PUT'
   return json_response(405, {'message': f'{method or "Unknown"} not allowed. Expected {allowed}.'}, {
     'Allow': allowed,
   })
@@ -38,36 +67,75 @@ def _handle_create_stream(event: Dict[str, Any]) -> Dict[str, Any]:
     return json_response(400, {'message': 'Invalid request body.', 'issues': [parsed.error]})
 
   payload = parsed.value or {}
-  issues: List[str] = []
+  issues = validate_create_stream(payload)
+  if issues:
+    return json_response(400, {'message': 'Validation failed.', 'issues': issues})
 
-  required_fields = ['streamId', 'title', 'startTime', 'ingestEndpoints']
-  issues.extend(_missing_fields(payload, required_fields))
+  state_machine_arn = os.environ.get(STATE_MACHINE_ENV, DEFAULT_STATE_MACHINE_ARN)
+  accepted_at = iso_timestamp()
+  _register(payload, accepted_at)
+  return json_response(202, _accepted(payload, state_machine_arn, accepted_at))
 
-  ingest_endpoints = payload.get('ingestEndpoints')
-  if not isinstance(ingest_endpoints, list) or not ingest_endpoints:
-    issues.append('ingestEndpoints must be a non-empty list.')
-  else:
-    for index, endpoint in enumerate(ingest_endpoints):
-      if not isinstance(endpoint, dict):
-        issues.append(f'ingestEndpoints[{index}] must be an object.')
-        continue
-      for key in ('protocol', 'url'):
-        if not endpoint.get(key):
-          issues.append(f'ingestEndpoints[{index}].{key} is required.')
 
+def _handle_batch_create_streams(event: Dict[str, Any]) -> Dict[str, Any]:
+  parsed = parse_json_body(event)
+  if parsed.error:
+    return json_response(400, {'message': 'Invalid request body.', 'issues': [parsed.error]})
+
+  payload = parsed.value or {}
+  issues = validate_batch_envelope(payload)
   if issues:
     return json_response(400, {'message': 'Validation failed.', 'issues': issues})
 
   state_machine_arn = os.environ.get(STATE_MACHINE_ENV, DEFAULT_STATE_MACHINE_ARN)
-  response_payload: Dict[str, Any] = {
+  accepted_at = iso_timestamp()
+  first_index: Dict[str, int] = {}
+  results: List[Dict[str, Any]] = []
+  for index, stream in enumerate(payload['streams']):
+    issues = validate_create_stream(stream)
+    if not issues:
+      stream_id = stream['streamId']
+      if stream_id in first_index:
+        issues = [f'streamId duplicates streams[{first_index[stream_id]}].']
+      else:
+        first_index[stream_id] = index
+    if issues:
+      results.append({
+        'index': index,
+        'statusCode': 400,
+        'body': {'message': 'Validation failed.', 'issues': issues},
+      })
+    else:
+      _register(stream, accepted_at)
+      results.append({'index': index, 'statusCode': 202, 'body': _accepted(stream, state_machine_arn, accepted_at)})
+
+  rejected = len(results) - len(first_index)
+  return json_response(207 if rejected else 202, {
+    'accepted': len(first_index),
+    'rejected': rejected,
+    'results': results,
+  })
+
+
+def _register(payload: Dict[str, Any], accepted_at: str) -> None:
+  # A stream that is already registered keeps its current lifecycle state.
+  repository.add(StreamRecord(
+    stream_id=payload['streamId'],
+    status='PROVISIONING',
+    updated_at=accepted_at,
+    title=payload['title'],
+    start_time=normalize_timestamp(payload['startTime']),
+  ))
+
+
+def _accepted(payload: Dict[str, Any], state_machine_arn: str, accepted_at: str) -> Dict[str, Any]:
+  return {
     'streamId': payload['streamId'],
     'detailType': 'StreamProvisionRequested',
     'stateMachineArn': state_machine_arn,
-    'acceptedAt': iso_timestamp(),
+    'acceptedAt': accepted_at,
   }
 
-  return json_response(202, response_payload)
-
 
 def _handle_update_stream(event: Dict[str, Any]) -> Dict[str, Any]:
   parsed: ParsedBody = parse_json_body(event)
@@ -75,31 +143,60 @@ def _handle_update_stream(event: Dict[str, Any]) -> Dict[str, Any]:
     return json_response(400, {'message': 'Invalid request body.', 'issues': [parsed.error]})
 
   payload = parsed.value or {}
-  issues = _missing_fields(payload, ['streamId', 'status'])
-
-  status = payload.get('status')
-  if status and status not in VALID_STATUSES:
-    issues.append(
-      'status must be one of PROVISIONING, READY, LIVE, FAILED, COMPLETE.',
-    )
-
+  issues = validate_update_stream(payload)
   if issues:
     return json_response(400, {'message': 'Validation failed.', 'issues': issues})
 
+  # Streams this registry has not seen yet (e.g. created before it existed) accept any status.
+  try:
+    previous, current = repository.update_status(
+      payload['streamId'], payload['status'], iso_timestamp(), payload.get('reason') or None,
+      allowed_from=STATUS_TRANSITIONS.allowed_from(payload['status']),
+    )
+  except InvalidTransition as exc:
+    allowed = STATUS_TRANSITIONS.successors(exc.record.status)
+    hint = f'{exc.record.status} may change to {", ".join(allowed)}.' if allowed else f'{exc.record.status} is terminal.'
+    return json_response(409, {'message': 'Invalid status transition.', 'issues': [str(exc), hint]})
   response_payload: Dict[str, Any] = {
-    'streamId': payload['streamId'],
-    'status': status,
+    'streamId': current.stream_id,
+    'status': current.status,
     'detailType': 'StreamLifecycleProgressed',
-    'updatedAt': iso_timestamp(),
+    'updatedAt': current.updated_at,
   }
-  if payload.get('reason'):
-    response_payload['reason'] = payload['reason']
+  if previous is not None:
+    response_payload['previousStatus'] = previous.status
+  if current.reason:
+    response_payload['reason'] = current.reason
 
   return json_response(200, response_payload)
 
 
-def _missing_fields(payload: Dict[str, Any], required_fields: Iterable[str]) -> List[str]:
-  return [f'{field} is required.' for field in required_fields if not payload.get(field)]
+def _handle_list_streams(event: Dict[str, Any]) -> Dict[str, Any]:
+  query: Dict[str, Any] = dict(event.get('queryStringParameters') or {})
+  limit = query.get('limit')
+  if isinstance(limit, str) and limit.isdigit():
+    query['limit'] = int(limit)
+  issues = validate_list_query(query)
+  if issues:
+    return json_response(400, {'message': 'Invalid query parameters.', 'issues': issues})
+
+  bounds = {key: normalize_timestamp(query[key]) if query.get(key) else None for key in ('from', 'to')}
+  limit = query.get('limit', DEFAULT_LIST_LIMIT)
+  # One extra record tells us whether the listing was truncated.
+  try:
+    records = repository.list(query.get('status'), bounds['from'], bounds['to'], limit + 1)
+  except ValueError as exc:
+    return json_response(400, {'message': 'Invalid query parameters.', 'issues': [str(exc)]})
+  return json_response(200, {
+    'streams': [record.to_item() for record in records[:limit]],
+    'count': min(len(records), limit),
+    'truncated': len(records) > limit,
+  })
+
+
+def _is_batch_path(event: Dict[str, Any]) -> bool:
+  path = event.get('resource') or event.get('path') or event.get('rawPath') or ''
+  return path.rstrip('/').endswith('/batch')
 
 
 __all__ = ['lambda_handler']
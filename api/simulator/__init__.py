@@ -0,0 +1,17 @@
+"""Local Step Functions simulator for the orchestration contracts."""
+
+from .clock import VirtualClock, VirtualClockEventLoop, run_virtual
+from .engine import Histogram, SimulationReport, Simulator
+from .fakes import Invocation, LatencyFake, default_integrations
+
+__all__ = [
+  'Histogram',
+  'Invocation',
+  'LatencyFake',
+  'SimulationReport',
+  'Simulator',
+  'VirtualClock',
+  'VirtualClockEventLoop',
+  'default_integrations',
+  'run_virtual',
+]
@@ -0,0 +1,293 @@
+"""Run ``StateMachineContract`` definitions locally, many executions at once.
+
+:class:`Simulator` interprets the contract states directly: a ``Task`` state
+awaits the fake registered for its integration ARN (see :mod:`.fakes`) and
+follows the transition named by the returned outcome, ``timeout_seconds`` is
+enforced with ``asyncio.wait_for``, and ``Succeed``/``Fail`` states end the
+execution. Everything runs on a :class:`~.clock.VirtualClockEventLoop`, so a
+15 minute ``AwaitLifecycleConfirmation`` costs microseconds and tens of
+thousands of concurrent executions fit in one process.
+
+Each state's time is recorded in a log-bucketed :class:`Histogram`; the
+:class:`SimulationReport` adds outcome counts and throughput in both virtual
+time (what the orchestrator would sustain) and wall time (how fast the
+simulation ran).
+
+Usage:
+    python -m api.simulator [--executions 20000] [--arrival-rate 50] [--seed 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ..contracts.spec import STATE_MACHINES, StateMachineContract, StateMachineState
+from .clock import VirtualClock, run_virtual
+from .fakes import Integration, Invocation, default_integrations
+
+TERMINAL_STATE_TYPES = frozenset({'Succeed', 'Fail'})
+EXECUTION_LABEL = '(execution)'
+
+PayloadFactory = Callable[[int], Dict[str, Any]]
+
+
+class Histogram:
+  """Latency histogram with geometric buckets (about 5% relative error).
+
+  Memory is fixed by the bucket count, however many samples are recorded.
+  """
+
+  def __init__(self, lowest: float = 1e-3, highest: float = 7 * 24 * 3600.0, growth: float = 1.05) -> None:
+    count = math.ceil(math.log(highest / lowest) / math.log(growth)) + 1
+    self.bounds: List[float] = [lowest * growth ** index for index in range(count)]
+    self.counts: List[int] = [0] * (count + 1)
+    self.count = 0
+    self.total = 0.0
+    self.min = math.inf
+    self.max = 0.0
+
+  def record(self, value: float) -> None:
+    self.counts[bisect.bisect_left(self.bounds, value)] += 1
+    self.count += 1
+    self.total += value
+    self.min = min(self.min, value)
+    self.max = max(self.max, value)
+
+  @property
+  def mean(self) -> float:
+    return self.total / self.count if self.count else 0.0
+
+  def percentile(self, percent: float) -> float:
+    """Return the upper bound of the bucket holding the given percentile."""
+
+    if not self.count:
+      return 0.0
+    rank = max(1, math.ceil(percent / 100 * self.count))
+    seen = 0
+    for index, bucket in enumerate(self.counts):
+      seen += bucket
+      if seen >= rank:
+        bound = self.bounds[index] if index < len(self.bounds) else self.max
+        return min(max(bound, self.min), self.max)
+    return self.max
+
+
+@dataclass
+class StateStats:
+  """Latency and outcome counts for one state across every execution."""
+
+  latency: Histogram = field(default_factory=Histogram)
+  outcomes: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class SimulationReport:
+  state_machine: str
+  executions: int
+  succeeded: int
+  failed: int
+  virtual_seconds: float
+  wall_seconds: float
+  peak_in_flight: int
+  states: Dict[str, StateStats]
+  terminal_states: Counter
+
+  @property
+  def throughput(self) -> float:
+    """Completed executions per virtual second."""
+
+    return self.executions / self.virtual_seconds if self.virtual_seconds else 0.0
+
+  @property
+  def simulation_rate(self) -> float:
+    """Completed executions per wall-clock second of simulating."""
+
+    return self.executions / self.wall_seconds if self.wall_seconds else 0.0
+
+  def format(self) -> str:
+    lines = [
+      f'{self.state_machine}: {self.executions} executions '
+      f'({self.succeeded} succeeded, {self.failed} failed), peak {self.peak_in_flight} in flight',
+      f'virtual time {self.virtual_seconds:.1f}s, throughput {self.throughput:.2f} executions/s',
+      f'wall time {self.wall_seconds:.2f}s, {self.simulation_rate:.0f} simulated executions/s',
+      '',
+      f'{"state":<32} {"count":>7} {"p50":>9} {"p90":>9} {"p99":>9} {"max":>9}  outcomes',
+    ]
+    for name, stats in self.states.items():
+      latency = stats.latency
+      outcomes = ', '.join(f'{outcome}={count}' for outcome, count in sorted(stats.outcomes.items()))
+      lines.append(
+        f'{name:<32} {latency.count:>7} {_seconds(latency.percentile(50)):>9} {_seconds(latency.percentile(90)):>9} '
+        f'{_seconds(latency.percentile(99)):>9} {_seconds(latency.max):>9}  {outcomes}'
+      )
+    return '\n'.join(lines)
+
+
+def _seconds(value: float) -> str:
+  if value < 1:
+    return f'{value * 1000:.1f}ms'
+  if value < 120:
+    return f'{value:.1f}s'
+  return f'{value / 60:.1f}m'
+
+
+def _default_payload(index: int) -> Dict[str, Any]:
+  return {
+    'streamId': f'sim-{index:06d}',
+    'title': f'Simulated stream {index}',
+    'startTime': '2025-03-01T18:00:00Z',
+    'ingestEndpoints': [{'protocol': 'srt', 'url': 'srt://ingest.example.com:9000'}],
+  }
+
+
+class Simulator:
+  """Interpret one state machine contract against local fake integrations."""
+
+  def __init__(
+    self,
+    contract: StateMachineContract,
+    integrations: Optional[Dict[str, Integration]] = None,
+    seed: Optional[int] = None,
+  ) -> None:
+    if not contract.states:
+      raise ValueError(f'{contract.name} declares no states.')
+    self.contract = contract
+    self.integrations = default_integrations() if integrations is None else integrations
+    self.rng = random.Random(seed)
+    self._states: Dict[str, StateMachineState] = {state.name: state for state in contract.states}
+    for state in contract.states:
+      if state.state_type == 'Task' and state.integration not in self.integrations:
+        raise ValueError(f'No integration registered for {state.name} ({state.integration}).')
+      for target in state.transitions.values():
+        if target not in self._states:
+          raise ValueError(f'{state.name} transitions to unknown state {target}.')
+    self._reset()
+
+  def _reset(self) -> None:
+    self.stats: Dict[str, StateStats] = {state.name: StateStats() for state in self.contract.states}
+    self.stats[EXECUTION_LABEL] = StateStats()
+    self.terminal_states: Counter = Counter()
+    self.in_flight = 0
+    self.peak_in_flight = 0
+
+  async def _invoke(self, state: StateMachineState, invocation: Invocation) -> str:
+    if state.state_type != 'Task':
+      return 'success'
+    call = self.integrations[state.integration](invocation)
+    try:
+      if state.timeout_seconds is not None:
+        return await asyncio.wait_for(call, state.timeout_seconds)
+      return await call
+    except asyncio.TimeoutError:
+      return 'timeout'
+    except Exception:  # noqa: BLE001 - a failing integration is an outcome, as in Step Functions
+      return 'failure'
+
+  async def execute(self, execution_id: str, payload: Dict[str, Any]) -> str:
+    """Run one execution to a terminal state and return that state's name."""
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    self.in_flight += 1
+    self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    state = self.contract.states[0]
+    try:
+      while state.state_type not in TERMINAL_STATE_TYPES:
+        entered = loop.time()
+        outcome = await self._invoke(state, Invocation(execution_id, state, payload, self.rng))
+        target = state.transitions.get(outcome)
+        if target is None and outcome == 'timeout':
+          # An unhandled States.Timeout is caught like any other failure.
+          outcome, target = 'failure', state.transitions.get('failure')
+        if target is None:
+          raise ValueError(f'{state.name} has no transition for outcome {outcome!r}.')
+        stats = self.stats[state.name]
+        stats.latency.record(loop.time() - entered)
+        stats.outcomes[outcome] += 1
+        state = self._states[target]
+    finally:
+      self.in_flight -= 1
+
+    self.stats[state.name].latency.record(0.0)
+    self.stats[state.name].outcomes[state.state_type.lower()] += 1
+    execution = self.stats[EXECUTION_LABEL]
+    execution.latency.record(loop.time() - started)
+    execution.outcomes[state.state_type.lower()] += 1
+    self.terminal_states[state.name] += 1
+    return state.name
+
+  async def run(
+    self,
+    executions: int,
+    arrival_rate: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+    payload_factory: PayloadFactory = _default_payload,
+  ) -> None:
+    """Start executions, all at once or as a Poisson process of arrival_rate per second."""
+
+    gate = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def start(index: int) -> None:
+      if gate is None:
+        await self.execute(f'execution-{index}', payload_factory(index))
+        return
+      async with gate:
+        await self.execute(f'execution-{index}', payload_factory(index))
+
+    tasks = []
+    for index in range(executions):
+      if arrival_rate and index:
+        await asyncio.sleep(self.rng.expovariate(arrival_rate))
+      tasks.append(asyncio.ensure_future(start(index)))
+    await asyncio.gather(*tasks)
+
+  def simulate(
+    self,
+    executions: int,
+    arrival_rate: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+    payload_factory: PayloadFactory = _default_payload,
+  ) -> SimulationReport:
+    """Run a batch of executions on a fresh virtual clock and report on it."""
+
+    self._reset()
+    clock = VirtualClock()
+    wall_started = time.perf_counter()
+    run_virtual(self.run(executions, arrival_rate, max_concurrency, payload_factory), clock)
+    wall_seconds = time.perf_counter() - wall_started
+    succeeded = self.stats[EXECUTION_LABEL].outcomes['succeed']
+    return SimulationReport(
+      state_machine=self.contract.name,
+      executions=executions,
+      succeeded=succeeded,
+      failed=executions - succeeded,
+      virtual_seconds=clock.now,
+      wall_seconds=wall_seconds,
+      peak_in_flight=self.peak_in_flight,
+      states=self.stats,
+      terminal_states=self.terminal_states,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+  parser = argparse.ArgumentParser(description='Simulate StreamLifecycleOrchestrator executions locally.')
+  parser.add_argument('--state-machine', default=STATE_MACHINES[0].name, help='Contract name to simulate.')
+  parser.add_argument('--executions', type=int, default=20_000, help='Executions to run.')
+  parser.add_argument('--arrival-rate', type=float, help='Poisson arrivals per virtual second (default: all at once).')
+  parser.add_argument('--max-concurrency', type=int, help='Cap on executions in flight.')
+  parser.add_argument('--seed', type=int, default=7, help='Seed for latencies and failures.')
+  args = parser.parse_args(argv)
+
+  contract = next((machine for machine in STATE_MACHINES if machine.name == args.state_machine), None)
+  if contract is None:
+    parser.error(f'unknown state machine {args.state_machine}')
+  report = Simulator(contract, seed=args.seed).simulate(args.executions, args.arrival_rate, args.max_concurrency)
+  print(report.format())
@@ -0,0 +1,111 @@
+"""Local stand-ins for the AWS integrations the orchestrator calls.
+
+A fake is any coroutine function taking an :class:`Invocation` and returning
+the name of the transition to follow (``'success'``, ``'failure'``,
+``'ready'``, ...). Fakes wait with ``asyncio.sleep`` so they cost virtual,
+not wall, time; raising an exception is treated as ``'failure'``.
+
+:func:`default_integrations` maps every integration ARN used by
+``StreamLifecycleOrchestrator`` to a :class:`LatencyFake` with rough
+production latencies, which tests and load runs override per ARN.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..contracts.spec import StateMachineState
+
+LatencySampler = Callable[[random.Random], float]
+
+
+@dataclass
+class Invocation:
+  """One call of a state's integration within an execution."""
+
+  execution_id: str
+  state: StateMachineState
+  payload: Dict[str, Any]
+  rng: random.Random
+
+
+Integration = Callable[[Invocation], Awaitable[str]]
+
+
+def fixed(seconds: float) -> LatencySampler:
+  """Always take the same time."""
+
+  return lambda _rng: seconds
+
+
+def lognormal(median: float, p99: float) -> LatencySampler:
+  """Right-skewed latency with the given median and 99th percentile, in seconds."""
+
+  sigma = math.log(p99 / median) / 2.326
+  mu = math.log(median)
+  return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+class LatencyFake:
+  """Wait a sampled latency, then succeed or (with failure_rate) fail."""
+
+  def __init__(
+    self,
+    latency: LatencySampler,
+    failure_rate: float = 0.0,
+    outcome: str = 'success',
+    failure_outcome: str = 'failure',
+  ) -> None:
+    self.latency = latency
+    self.failure_rate = failure_rate
+    self.outcome = outcome
+    self.failure_outcome = failure_outcome
+    self.calls = 0
+
+  async def __call__(self, invocation: Invocation) -> str:
+    self.calls += 1
+    await asyncio.sleep(self.latency(invocation.rng))
+    if self.failure_rate and invocation.rng.random() < self.failure_rate:
+      return self.failure_outcome
+    return self.outcome
+
+
+def lifecycle_confirmation(latency: LatencySampler, failure_rate: float = 0.0) -> LatencyFake:
+  """Fake operations confirming READY (or FAILED) after a sampled delay.
+
+  Delays beyond the state's ``timeout_seconds`` surface as the ``timeout``
+  transition, exactly like the real waitForEvent task.
+  """
+
+  return LatencyFake(latency, failure_rate, outcome='ready', failure_outcome='failed')
+
+
+def default_integrations(overrides: Optional[Dict[str, Integration]] = None) -> Dict[str, Integration]:
+  """Return fakes for every orchestrator integration ARN, with overrides applied."""
+
+  integrations: Dict[str, Integration] = {
+    'arn:aws:states:::lambda:invoke': LatencyFake(lognormal(0.08, 0.6)),
+    'arn:aws:states:::dynamodb:putItem': LatencyFake(lognormal(0.012, 0.08)),
+    'arn:aws:states:::dynamodb:updateItem': LatencyFake(lognormal(0.012, 0.08)),
+    'arn:aws:states:::events:putEvents': LatencyFake(lognormal(0.03, 0.2)),
+    'arn:aws:states:::aws-sdk:medialive:startChannel': LatencyFake(lognormal(45.0, 120.0), failure_rate=0.01),
+    'arn:aws:states:::aws-sdk:cloudfront:updateDistribution': LatencyFake(lognormal(90.0, 300.0), failure_rate=0.005),
+    'arn:aws:states:::events:waitForEvent': lifecycle_confirmation(lognormal(240.0, 1200.0), failure_rate=0.02),
+  }
+  integrations.update(overrides or {})
+  return integrations
+
+
+__all__ = [
+  'Integration',
+  'Invocation',
+  'LatencyFake',
+  'default_integrations',
+  'fixed',
+  'lifecycle_confirmation',
+  'lognormal',
+]
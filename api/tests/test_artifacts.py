@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from api.contracts import REST_OPERATIONS, build_openapi_document
+from api.contracts.artifacts import clear_artifact_cache, contracts_digest, openapi_artifact, write_if_changed
+from api.infra import build_cloudformation_template, template_artifact
+
+
+class ArtifactCacheTestCase(unittest.TestCase):
+  def setUp(self) -> None:
+    clear_artifact_cache()
+    self.addCleanup(clear_artifact_cache)
+
+  def test_repeated_calls_reuse_the_build(self) -> None:
+    self.assertIs(openapi_artifact(), openapi_artifact())
+    self.assertIs(template_artifact(), template_artifact())
+    self.assertIsNot(template_artifact('EXPRESS'), template_artifact())
+
+  def test_body_and_hash_match_a_fresh_build(self) -> None:
+    for artifact, fresh in (
+      (openapi_artifact(), build_openapi_document()),
+      (template_artifact('EXPRESS'), build_cloudformation_template('EXPRESS')),
+    ):
+      with self.subTest(artifact=artifact.name):
+        self.assertEqual(json.loads(artifact.body), fresh)
+        self.assertEqual(artifact.sha256, hashlib.sha256(artifact.body).hexdigest())
+        self.assertEqual(artifact.contracts_digest, contracts_digest())
+
+  def test_documents_are_read_only(self) -> None:
+    document = openapi_artifact().document
+    with self.assertRaises(TypeError):
+      document['openapi'] = '3.0.0'
+    with self.assertRaises(TypeError):
+      document['paths']['/streams']['get']['summary'] = 'changed'
+    self.assertIsInstance(document['paths']['/streams']['post']['tags'], tuple)
+
+  def test_contract_changes_need_an_explicit_cache_clear(self) -> None:
+    before = openapi_artifact()
+    with mock.patch.dict(REST_OPERATIONS[0].responses, clear=True):
+      self.assertIs(openapi_artifact(), before)
+      clear_artifact_cache()
+      changed = openapi_artifact()
+    self.assertNotEqual(changed.sha256, before.sha256)
+    self.assertNotEqual(changed.contracts_digest, before.contracts_digest)
+
+    clear_artifact_cache()
+    self.assertEqual(openapi_artifact().sha256, before.sha256)
+
+  def test_write_if_changed_skips_identical_files(self) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp, 'deploy', 'template.json')
+      self.assertTrue(write_if_changed(template_artifact(), path))
+      self.assertFalse(write_if_changed(template_artifact(), path))
+      self.assertTrue(write_if_changed(template_artifact('EXPRESS'), path))
+      self.assertEqual(path.read_bytes(), template_artifact('EXPRESS').body)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import base64
+import importlib.util
+import json
+import unittest
+
+from api.lambdas import codec
+from api.lambdas.responses import json_response, parse_json_body
+
+
+PAYLOADS = [
+  {},
+  {'message': 'Validation failed.', 'issues': ['streamId is required.', 'title must be a string.']},
+  {
+    'streamId': 'launch-day',
+    'detailType': 'StreamProvisionRequested',
+    'stateMachineArn': 'arn:aws:states:us-east-1:123456789012:stateMachine:StreamLifecycleOrchestrator',
+    'acceptedAt': '2025-03-01T18:00:00+00:00',
+  },
+  {'title': 'Café “Live” — 東京 🎥', 'escapes': 'quote " backslash \\ newline \n tab \t nul \x00  '},
+  {'count': 3, 'negative': -42, 'big': 2 ** 62, 'ratio': 0.25, 'price': 1234.5, 'zero': 0.0},
+  {'flags': [True, False, None], 'nested': {'list': [[], {}, [1, [2, [3]]]]}},
+  ['top-level', 'list'],
+]
+
+INSTALLED = [name for name in codec.BACKENDS if name == 'json' or importlib.util.find_spec(name) is not None]
+
+
+class CodecTestCase(unittest.TestCase):
+  def setUp(self) -> None:
+    self.previous = codec.get_codec()
+
+  def tearDown(self) -> None:
+    codec.set_codec(self.previous)
+
+  def test_backends_produce_byte_identical_output(self) -> None:
+    reference = codec.load_codec('json')
+    for name in INSTALLED:
+      backend = codec.load_codec(name)
+      for payload in PAYLOADS:
+        with self.subTest(codec=name, payload=payload):
+          encoded = backend.dumps(payload)
+          self.assertEqual(encoded.encode('utf-8'), reference.dumps(payload).encode('utf-8'))
+          self.assertEqual(json.loads(encoded), payload)
+
+  def test_backends_decode_text_and_bytes(self) -> None:
+    for name in INSTALLED:
+      backend = codec.load_codec(name)
+      for payload in PAYLOADS:
+        text = json.dumps(payload)
+        with self.subTest(codec=name, payload=payload):
+          self.assertEqual(backend.loads(text), payload)
+          self.assertEqual(backend.loads(text.encode('utf-8')), payload)
+
+  def test_default_prefers_fastest_installed_backend(self) -> None:
+    self.assertEqual(codec.load_codec().name, INSTALLED[0])
+
+  def test_unknown_backend_is_rejected(self) -> None:
+    with self.assertRaises(ValueError):
+      codec.load_codec('yaml')
+
+  def test_json_response_body_matches_for_every_backend(self) -> None:
+    payload = PAYLOADS[3]
+    bodies = set()
+    for name in INSTALLED:
+      codec.set_codec(name)
+      bodies.add(json_response(200, payload)['body'])
+    self.assertEqual(len(bodies), 1)
+
+  def test_parse_json_body_decodes_base64_bytes(self) -> None:
+    payload = {'streamId': 'launch-day', 'title': 'Café'}
+    encoded = base64.b64encode(json.dumps(payload, ensure_ascii=False).encode('utf-8')).decode('ascii')
+    for name in INSTALLED:
+      codec.set_codec(name)
+      with self.subTest(codec=name):
+        parsed = parse_json_body({'body': encoded, 'isBase64Encoded': True})
+        self.assertIsNone(parsed.error)
+        self.assertEqual(parsed.value, payload)
+
+  def test_parse_json_body_reports_invalid_json(self) -> None:
+    events = [
+      {'body': '{"streamId":'},
+      {'body': base64.b64encode(b'\xff\xfe{').decode('ascii'), 'isBase64Encoded': True},
+    ]
+    for name in INSTALLED:
+      codec.set_codec(name)
+      for event in events:
+        with self.subTest(codec=name, event=event):
+          parsed = parse_json_body(event)
+          self.assertIsNone(parsed.value)
+          self.assertTrue(parsed.error.startswith('invalidJson:'))
+
+  def test_parse_json_body_treats_blank_bodies_as_empty(self) -> None:
+    self.assertEqual(parse_json_body({'body': '  \n'}).value, {})
+    self.assertEqual(parse_json_body({'body': base64.b64encode(b' ').decode('ascii'), 'isBase64Encoded': True}).value, {})
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from typing import Any, Dict
+from unittest import mock
+
+from api.lambdas import streams
+from api.lambdas.idempotency import IdempotencyCache, MemoryStore, SqliteStore, StoredResponse
+
+
+class FakeClock:
+  def __init__(self) -> None:
+    self.now = 1_000.0
+
+  def __call__(self) -> float:
+    return self.now
+
+
+def _create_event(stream_id: str = 'launch-day', key: str = 'retry-1', header: str = 'Idempotency-Key') -> Dict[str, Any]:
+  return {
+    'httpMethod': 'POST',
+    'headers': {header: key},
+    'body': json.dumps({
+      'streamId': stream_id,
+      'title': 'Launch Day Broadcast',
+      'startTime': '2025-03-01T18:00:00Z',
+      'ingestEndpoints': [{'protocol': 'rtmps', 'url': 'rtmps://ingest.example.com/app'}],
+    }),
+  }
+
+
+class MemoryStoreTestCase(unittest.TestCase):
+  def test_evicts_least_recently_used(self) -> None:
+    clock = FakeClock()
+    store = MemoryStore(max_entries=2, clock=clock)
+    for key in ('a', 'b'):
+      store.put(key, StoredResponse(key, {'statusCode': 202}, clock.now + 60))
+    store.get('a')
+    store.put('c', StoredResponse('c', {'statusCode': 202}, clock.now + 60))
+
+    self.assertIsNotNone(store.get('a'))
+    self.assertIsNone(store.get('b'))
+    self.assertEqual(len(store), 2)
+
+  def test_expired_entries_are_dropped(self) -> None:
+    clock = FakeClock()
+    store = MemoryStore(clock=clock)
+    store.put('a', StoredResponse('a', {'statusCode': 202}, clock.now + 60))
+    clock.now += 61
+    self.assertIsNone(store.get('a'))
+    self.assertEqual(len(store), 0)
+
+
+class SqliteStoreTestCase(unittest.TestCase):
+  def test_round_trip_and_expiry(self) -> None:
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as tmp:
+      store = SqliteStore(os.path.join(tmp, 'idempotency.db'), clock=clock)
+      response = {'statusCode': 202, 'headers': {'Content-Type': 'application/json'}, 'body': '{"streamId":"a"}'}
+      store.put('CreateStreamWorkflow:a', StoredResponse('fp', response, clock.now + 60))
+
+      entry = store.get('CreateStreamWorkflow:a')
+      self.assertEqual(entry, StoredResponse('fp', response, clock.now + 60))
+
+      clock.now += 61
+      self.assertIsNone(store.get('CreateStreamWorkflow:a'))
+      self.assertEqual(store.purge_expired(), 1)
+      store.close()
+
+
+class StreamsIdempotencyTestCase(unittest.TestCase):
+  def setUp(self) -> None:
+    self.clock = FakeClock()
+    self.store = MemoryStore(clock=self.clock)
+    cache = IdempotencyCache(store=self.store, ttl_seconds=60, clock=self.clock)
+    patcher = mock.patch.object(streams, 'idempotency', cache)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+    self.cache = cache
+
+  def test_repeated_key_replays_first_response_without_validation(self) -> None:
+    first = streams.lambda_handler(_create_event(), None)
+    with mock.patch.object(streams, 'validate_create_stream', side_effect=AssertionError('validated again')):
+      second = streams.lambda_handler(_create_event(header='idempotency-key'), None)
+
+    self.assertEqual(first['statusCode'], 202)
+    self.assertEqual(second['statusCode'], 202)
+    self.assertEqual(second['body'], first['body'])
+    self.assertEqual(second['headers']['Idempotent-Replayed'], 'true')
+    self.assertNotIn('Idempotent-Replayed', first['headers'])
+    self.assertEqual(self.cache.stats()['hits'], 1)
+    self.assertEqual(self.cache.stats()['misses'], 1)
+
+  def test_persistent_store_serves_cold_containers(self) -> None:
+    streams.lambda_handler(_create_event(), None)
+    cold = IdempotencyCache(store=self.store, ttl_seconds=60, clock=self.clock)
+    with mock.patch.object(streams, 'idempotency', cold):
+      replay = streams.lambda_handler(_create_event(), None)
+
+    self.assertEqual(replay['headers']['Idempotent-Replayed'], 'true')
+    self.assertEqual(cold.stats()['storeHits'], 1)
+
+  def test_reused_key_with_different_body_conflicts(self) -> None:
+    streams.lambda_handler(_create_event('launch-day'), None)
+    response = streams.lambda_handler(_create_event('other-stream'), None)
+
+    self.assertEqual(response['statusCode'], 422)
+    self.assertEqual(self.cache.stats()['conflicts'], 1)
+
+  def test_failed_requests_are_not_remembered(self) -> None:
+    event = {'httpMethod': 'POST', 'headers': {'Idempotency-Key': 'k'}, 'body': json.dumps({'title': 'x'})}
+    self.assertEqual(streams.lambda_handler(event, None)['statusCode'], 400)
+    self.assertEqual(streams.lambda_handler(event, None)['statusCode'], 400)
+    self.assertEqual(self.cache.stats()['misses'], 2)
+
+  def test_keys_expire_after_ttl(self) -> None:
+    streams.lambda_handler(_create_event(), None)
+    self.clock.now += 61
+    response = streams.lambda_handler(_create_event(), None)
+
+    self.assertNotIn('Idempotent-Replayed', response['headers'])
+    self.assertEqual(self.cache.stats()['misses'], 2)
+
+  def test_overlong_keys_are_rejected(self) -> None:
+    response = streams.lambda_handler(_create_event(key='k' * 256), None)
+    self.assertEqual(response['statusCode'], 400)
+
+
+if __name__ == '__main__':
+  unittest.main()
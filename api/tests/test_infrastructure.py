@@ -61,6 +61,16 @@ class InfrastructureTemplateTestCase(unittest.TestCase):
     env = streams_lambda['Properties']['Environment']['Variables']
     self.assertEqual(env['STATE_MACHINE_ARN'], {'Ref': 'StreamLifecycleStateMachine'})
 
+  def test_nested_paths_get_nested_resources(self) -> None:
+    streams_resource = self.resources['RootStreamsResource']
+    batch_resource = self.resources['RootStreamsResourceBatchResource']
+    self.assertEqual(batch_resource['Properties']['PathPart'], 'batch')
+    self.assertEqual(batch_resource['Properties']['ParentId'], {'Ref': 'RootStreamsResource'})
+    self.assertEqual(streams_resource['Properties']['PathPart'], 'streams')
+
+    batch_method = self.resources[_method_logical_id('BatchCreateStreamWorkflows')]
+    self.assertEqual(batch_method['Properties']['ResourceId'], {'Ref': 'RootStreamsResourceBatchResource'})
+
   def test_outputs_expose_core_resources(self) -> None:
     outputs = self.template['Outputs']
     for key in ['RestApiId', 'RestApiInvokeUrl', 'StateMachineArn', 'EventBusName']:
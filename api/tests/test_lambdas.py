@@ -103,5 +103,53 @@ class StreamsLambdaTestCase(unittest.TestCase):
     self.assertIn('Expected POST, PUT', payload['message'])
 
 
+def _stream(stream_id: str) -> Dict[str, Any]:
+  return {
+    'streamId': stream_id,
+    'title': f'Broadcast {stream_id}',
+    'startTime': '2025-03-01T18:00:00Z',
+    'ingestEndpoints': [{'protocol': 'srt', 'url': 'srt://ingest.example.com:9000'}],
+  }
+
+
+class BatchStreamsLambdaTestCase(unittest.TestCase):
+  def _post(self, body: Any) -> Dict[str, Any]:
+    event = {'httpMethod': 'POST', 'resource': '/streams/batch', 'body': json.dumps(body)}
+    return streams.lambda_handler(event, None)
+
+  def test_batch_accepts_every_valid_stream(self) -> None:
+    response = self._post({'streams': [_stream('week-01'), _stream('week-02')]})
+    self.assertEqual(response['statusCode'], 202)
+
+    payload = _parse_body(response)
+    self.assertEqual((payload['accepted'], payload['rejected']), (2, 0))
+    self.assertEqual([result['body']['streamId'] for result in payload['results']], ['week-01', 'week-02'])
+    self.assertTrue(all(result['statusCode'] == 202 for result in payload['results']))
+
+  def test_batch_reports_per_item_failures(self) -> None:
+    invalid = {**_stream('week-02'), 'ingestEndpoints': []}
+    response = self._post({'streams': [_stream('week-01'), invalid, _stream('week-01')]})
+    self.assertEqual(response['statusCode'], 207)
+
+    payload = _parse_body(response)
+    self.assertEqual((payload['accepted'], payload['rejected']), (1, 2))
+    statuses = [result['statusCode'] for result in payload['results']]
+    self.assertEqual(statuses, [202, 400, 400])
+    self.assertEqual(payload['results'][1]['body']['issues'], ['ingestEndpoints must be a non-empty list.'])
+    self.assertEqual(payload['results'][2]['body']['issues'], ['streamId duplicates streams[0].'])
+
+  def test_batch_rejects_oversized_or_empty_envelopes(self) -> None:
+    for body in ({'streams': []}, {'streams': [_stream(f'week-{n:02d}') for n in range(26)]}, {}):
+      with self.subTest(size=len(body.get('streams', []))):
+        response = self._post(body)
+        self.assertEqual(response['statusCode'], 400)
+        self.assertEqual(_parse_body(response)['message'], 'Validation failed.')
+
+  def test_batch_path_only_allows_post(self) -> None:
+    response = streams.lambda_handler({'httpMethod': 'PUT', 'resource': '/streams/batch'}, None)
+    self.assertEqual(response['statusCode'], 405)
+    self.assertEqual(response['headers']['Allow'], 'POST')
+
+
 if __name__ == '__main__':
   unittest.main()
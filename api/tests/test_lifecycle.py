@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from unittest import mock
+
+from api.contracts import STATUS_TRANSITIONS
+from api.contracts.lifecycle import build_transition_table
+from api.contracts.spec import STREAM_LIFECYCLE_ORCHESTRATOR_STATES, STREAM_STATUSES
+from api.lambdas import streams
+from api.lambdas.registry import InMemoryStreamRepository, InvalidTransition, StreamRecord
+
+CONTRACTS_README = Path(__file__).resolve().parents[1] / 'contracts' / 'README.md'
+
+
+def _update(stream_id: str, status: str) -> dict:
+  return streams.lambda_handler({
+    'httpMethod': 'PUT',
+    'body': json.dumps({'streamId': stream_id, 'status': status}),
+  }, None)
+
+
+class TransitionTableTestCase(unittest.TestCase):
+  def test_matrix_is_indexed_by_status_enum(self) -> None:
+    self.assertEqual(STATUS_TRANSITIONS.statuses, tuple(STREAM_STATUSES))
+    self.assertEqual(len(STATUS_TRANSITIONS.allowed), len(STREAM_STATUSES))
+    self.assertTrue(all(len(row) == len(STREAM_STATUSES) for row in STATUS_TRANSITIONS.allowed))
+
+  def test_orchestrator_edges_are_allowed(self) -> None:
+    by_name = {state.name: state for state in STREAM_LIFECYCLE_ORCHESTRATOR_STATES}
+    for state in STREAM_LIFECYCLE_ORCHESTRATOR_STATES:
+      for target in state.transitions.values():
+        with self.subTest(state=state.name, target=target):
+          self.assertTrue(STATUS_TRANSITIONS.allows(state.stream_status, by_name[target].stream_status))
+
+  def test_illegal_jumps_are_rejected(self) -> None:
+    for current, target in (('COMPLETE', 'PROVISIONING'), ('PROVISIONING', 'LIVE'), ('FAILED', 'READY'), ('LIVE', 'READY')):
+      with self.subTest(current=current, target=target):
+        self.assertFalse(STATUS_TRANSITIONS.allows(current, target))
+    self.assertTrue(STATUS_TRANSITIONS.allows('LIVE', 'LIVE'))
+
+  def test_reachability_closure(self) -> None:
+    self.assertEqual(STATUS_TRANSITIONS.initial, 'PROVISIONING')
+    for status in STREAM_STATUSES:
+      self.assertTrue(STATUS_TRANSITIONS.can_reach('PROVISIONING', status))
+    self.assertTrue(STATUS_TRANSITIONS.can_reach('READY', 'COMPLETE'))
+    self.assertFalse(STATUS_TRANSITIONS.can_reach('COMPLETE', 'LIVE'))
+    self.assertEqual([s for s in STREAM_STATUSES if STATUS_TRANSITIONS.is_terminal(s)], ['FAILED', 'COMPLETE'])
+
+  def test_inconsistent_contracts_fail_to_compile(self) -> None:
+    states = list(STREAM_LIFECYCLE_ORCHESTRATOR_STATES)
+    with self.assertRaisesRegex(ValueError, 'stream_status'):
+      build_transition_table([replace(states[0], stream_status=None), *states[1:]])
+    with self.assertRaisesRegex(ValueError, 'unreachable'):
+      build_transition_table(extra_transitions={})
+
+  def test_readme_documents_the_compiled_table(self) -> None:
+    self.assertIn(STATUS_TRANSITIONS.to_markdown(), CONTRACTS_README.read_text(encoding='utf-8'))
+
+
+class UpdateStreamTransitionTestCase(unittest.TestCase):
+  def setUp(self) -> None:
+    repository = InMemoryStreamRepository([StreamRecord('wrap-up', 'COMPLETE', '2025-03-01T20:00:00Z')])
+    patcher = mock.patch.object(streams, 'repository', repository)
+    self.repository = patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_invalid_transition_returns_409_and_keeps_status(self) -> None:
+    response = _update('wrap-up', 'PROVISIONING')
+
+    self.assertEqual(response['statusCode'], 409)
+    self.assertEqual(json.loads(response['body'])['issues'], [
+      'status cannot change from COMPLETE to PROVISIONING.',
+      'COMPLETE is terminal.',
+    ])
+    self.assertEqual(self.repository.get('wrap-up').status, 'COMPLETE')
+
+  def test_repository_guard_raises(self) -> None:
+    with self.assertRaises(InvalidTransition):
+      self.repository.update_status('wrap-up', 'LIVE', '2025-03-01T21:00:00Z', allowed_from=frozenset({'READY'}))
+
+  def test_unknown_streams_accept_any_status(self) -> None:
+    self.assertEqual(_update('cold-start', 'LIVE')['statusCode'], 200)
+    self.assertEqual(_update('cold-start', 'COMPLETE')['statusCode'], 200)
+
+
+if __name__ == '__main__':
+  unittest.main()
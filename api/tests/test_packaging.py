@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from api.infra.package import build_all, build_lambda_bundle, handler_modules, import_budget_ms, measure_import_ms
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+class HandlerModulesTestCase(unittest.TestCase):
+  def test_health_bundle_excludes_stream_dependencies(self) -> None:
+    modules = handler_modules('health')
+    self.assertIn('api.lambdas.health', modules)
+    self.assertIn('api.lambdas.codec', modules)
+    self.assertIn('api.lambdas', modules)
+    self.assertNotIn('api.lambdas.streams', modules)
+    self.assertFalse([name for name in modules if name.startswith('api.contracts')])
+
+  def test_streams_bundle_follows_relative_imports(self) -> None:
+    modules = handler_modules('streams')
+    for name in ('api.contracts', 'api.contracts.spec', 'api.contracts.validation', 'api.lambdas.idempotency'):
+      self.assertIn(name, modules)
+    self.assertNotIn('api.lambdas.health', modules)
+    self.assertFalse([name for name in modules if name.startswith('api.infra')])
+
+  def test_lambdas_package_imports_handlers_lazily(self) -> None:
+    code = 'import sys, api.lambdas.health; print("api.lambdas.streams" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    self.assertEqual(result.stdout.strip(), 'False')
+
+
+class BundleTestCase(unittest.TestCase):
+  def setUp(self) -> None:
+    self.tmp = tempfile.TemporaryDirectory()
+    self.addCleanup(self.tmp.cleanup)
+    self.output = Path(self.tmp.name)
+
+  def test_bundles_are_deterministic(self) -> None:
+    first = build_lambda_bundle('streams', self.output / 'a', bytecode=False).read_bytes()
+    second = build_lambda_bundle('streams', self.output / 'b', bytecode=False).read_bytes()
+    self.assertEqual(first, second)
+
+  def test_bundle_contains_handler_shim(self) -> None:
+    bundle = build_lambda_bundle('health', self.output, bytecode=False)
+    with zipfile.ZipFile(bundle) as archive:
+      names = archive.namelist()
+      shim = archive.read('health.py').decode('utf-8')
+    self.assertIn('from api.lambdas.health import lambda_handler', shim)
+    self.assertNotIn('api/lambdas/streams.py', names)
+
+  def test_bytecode_is_included_on_request(self) -> None:
+    bundle = build_lambda_bundle('health', self.output, bytecode=True)
+    with zipfile.ZipFile(bundle) as archive:
+      self.assertTrue([name for name in archive.namelist() if name.endswith('.pyc')])
+
+  def test_handlers_stay_within_import_budget(self) -> None:
+    for module, bundle in build_all(self.output, bytecode=False).items():
+      with self.subTest(module=module):
+        budget = import_budget_ms(module)
+        self.assertIsNotNone(budget)
+        elapsed = measure_import_ms(bundle, module)
+        self.assertGreater(elapsed, 0)
+        self.assertLessEqual(elapsed, budget, f'{module} imports in {elapsed:.1f}ms, budget {budget:.0f}ms')
+
+
+if __name__ == '__main__':
+  unittest.main()
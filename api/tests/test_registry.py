@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import json
+import random
+import unittest
+from typing import Any, Dict, Optional
+from unittest import mock
+
+from api.lambdas import streams
+from api.lambdas.registry import (
+  DynamoDbStreamRepository,
+  InMemoryStreamRepository,
+  InvalidTransition,
+  MAX_WINDOW_MONTHS,
+  LocalDynamoTable,
+  StreamRecord,
+  normalize_timestamp,
+)
+
+
+STATUSES = ['PROVISIONING', 'READY', 'LIVE', 'FAILED', 'COMPLETE']
+
+
+def _record(n: int, status: str = 'PROVISIONING', start: Optional[str] = None) -> StreamRecord:
+  return StreamRecord(
+    stream_id=f'stream-{n:04d}',
+    status=status,
+    updated_at='2025-01-01T00:00:00Z',
+    title=f'Stream {n}',
+    start_time=start or f'2025-{1 + n % 12:02d}-{1 + n % 28:02d}T18:00:00Z',
+  )
+
+
+class InMemoryStreamRepositoryTestCase(unittest.TestCase):
+  def test_status_index_follows_updates(self) -> None:
+    repository = InMemoryStreamRepository([_record(1), _record(2)])
+    previous, current = repository.update_status('stream-0001', 'READY', '2025-01-02T00:00:00Z')
+
+    self.assertEqual(previous.status, 'PROVISIONING')
+    self.assertEqual(current.title, 'Stream 1')
+    self.assertEqual([r.stream_id for r in repository.list(status='READY')], ['stream-0001'])
+    self.assertEqual([r.stream_id for r in repository.list(status='PROVISIONING')], ['stream-0002'])
+    self.assertEqual(repository.count('READY'), 1)
+
+  def test_start_time_window_is_inclusive_and_ordered(self) -> None:
+    repository = InMemoryStreamRepository([
+      _record(1, start='2025-03-01T18:00:00Z'),
+      _record(2, start='2025-02-01T18:00:00Z'),
+      _record(3, start='2025-04-01T18:00:00Z'),
+    ])
+    found = repository.list(start_from='2025-02-01T18:00:00Z', start_to='2025-03-01T18:00:00Z')
+    self.assertEqual([r.stream_id for r in found], ['stream-0002', 'stream-0001'])
+
+  def test_rescheduling_moves_start_index_entry(self) -> None:
+    repository = InMemoryStreamRepository([_record(1, start='2025-03-01T18:00:00Z')])
+    repository.put(_record(1, start='2025-06-01T18:00:00Z'))
+    self.assertEqual(repository.list(start_from='2025-03-01T00:00:00Z', start_to='2025-03-31T00:00:00Z'), [])
+    self.assertEqual(len(repository.list(start_from='2025-06-01T00:00:00Z', start_to='2025-06-30T00:00:00Z')), 1)
+
+  def test_add_keeps_existing_record(self) -> None:
+    repository = InMemoryStreamRepository([_record(1, status='LIVE')])
+    existing = repository.add(_record(1))
+    self.assertEqual(existing.status, 'LIVE')
+    self.assertEqual(repository.get('stream-0001').status, 'LIVE')
+
+  def test_normalize_timestamp_converts_to_utc(self) -> None:
+    self.assertEqual(normalize_timestamp('2025-03-01T20:00:00+02:00'), '2025-03-01T18:00:00Z')
+    self.assertEqual(normalize_timestamp('2025-03-01T18:00:00.5z'), '2025-03-01T18:00:00Z')
+
+
+class DynamoDbStreamRepositoryTestCase(unittest.TestCase):
+  def test_matches_in_memory_repository(self) -> None:
+    rng = random.Random(7)
+    memory = InMemoryStreamRepository()
+    # Small pages make every scan and query follow LastEvaluatedKey.
+    dynamo = DynamoDbStreamRepository(LocalDynamoTable(page_size=16))
+    for n in range(300):
+      record = _record(n, status=rng.choice(STATUSES))
+      memory.put(record)
+      dynamo.put(record)
+    for n in range(0, 300, 7):
+      status = rng.choice(STATUSES)
+      memory.update_status(f'stream-{n:04d}', status, '2025-01-03T00:00:00Z')
+      dynamo.update_status(f'stream-{n:04d}', status, '2025-01-03T00:00:00Z')
+
+    queries = [
+      {'status': 'LIVE'},
+      {'status': 'LIVE', 'limit': 1000},
+      {'status': 'READY', 'start_from': '2025-03-01T00:00:00Z', 'start_to': '2025-07-15T00:00:00Z'},
+      {'start_from': '2025-02-10T00:00:00Z', 'start_to': '2025-05-20T00:00:00Z'},
+      {'status': 'FAILED', 'limit': 5},
+    ]
+    for query in queries:
+      with self.subTest(query=query):
+        self.assertEqual(dynamo.list(**query), memory.list(**query))
+
+  def test_open_ended_window_without_status_is_rejected_by_both_backends(self) -> None:
+    for repository in (InMemoryStreamRepository(), DynamoDbStreamRepository(LocalDynamoTable())):
+      for window in ({'start_from': '2025-01-01T00:00:00Z'}, {'start_to': '2025-01-01T00:00:00Z'}):
+        with self.subTest(repository=type(repository).__name__, window=window):
+          with self.assertRaises(ValueError):
+            repository.list(**window)
+          self.assertEqual(repository.list(status='LIVE', **window), [])
+
+  def test_listing_without_an_index_is_rejected_by_both_backends(self) -> None:
+    table = mock.Mock(wraps=LocalDynamoTable())
+    for repository in (InMemoryStreamRepository(), DynamoDbStreamRepository(table)):
+      for query in ({}, {'limit': 1000}, {'start_from': '0001-01-01T00:00:00Z', 'start_to': '9999-12-31T00:00:00Z'}):
+        with self.subTest(repository=type(repository).__name__, query=query):
+          with self.assertRaises(ValueError):
+            repository.list(**query)
+    table.query.assert_not_called()
+
+  def test_longest_window_queries_each_month(self) -> None:
+    dynamo = DynamoDbStreamRepository(LocalDynamoTable(page_size=7))
+    for n in range(50):
+      dynamo.put(_record(n))
+    table = dynamo.table = mock.Mock(wraps=dynamo.table)
+    window = {'start_from': '2024-02-01T00:00:00Z', 'start_to': '2027-01-31T00:00:00Z'}
+
+    self.assertEqual(len(dynamo.list(limit=1000, **window)), 50)
+    months = {call.kwargs['ExpressionAttributeValues'][':month'] for call in table.query.call_args_list}
+    self.assertEqual(len(months), MAX_WINDOW_MONTHS)
+    with self.assertRaises(ValueError):
+      dynamo.list(start_from='2024-01-31T00:00:00Z', start_to='2027-01-31T00:00:00Z')
+
+  def _racing(self, writer: StreamRecord) -> DynamoDbStreamRepository:
+    """Return a repository whose first read is followed by another container writing writer."""
+
+    table = LocalDynamoTable()
+    get_item = table.get_item
+
+    def racing_get_item(**kwargs: Any) -> Dict[str, Any]:
+      result = get_item(**kwargs)
+      if not hasattr(table, 'raced'):
+        table.raced = True
+        DynamoDbStreamRepository(table).put(writer)
+      return result
+
+    table.get_item = racing_get_item
+    return DynamoDbStreamRepository(table)
+
+  def test_concurrent_change_to_a_disallowed_status_is_rejected(self) -> None:
+    dynamo = self._racing(_record(1, status='FAILED'))
+    dynamo.table.items['stream-0001'] = _record(1, status='PROVISIONING').to_item()
+
+    with self.assertRaises(InvalidTransition) as caught:
+      dynamo.update_status('stream-0001', 'READY', '2025-01-02T00:00:00Z', allowed_from={'PROVISIONING'})
+    self.assertEqual(caught.exception.record.status, 'FAILED')
+    self.assertEqual(dynamo.get('stream-0001').status, 'FAILED')
+
+  def test_concurrent_change_to_an_allowed_status_is_retried(self) -> None:
+    dynamo = self._racing(_record(1, status='READY'))
+    dynamo.table.items['stream-0001'] = _record(1, status='PROVISIONING').to_item()
+
+    previous, current = dynamo.update_status(
+      'stream-0001', 'FAILED', '2025-01-02T00:00:00Z', allowed_from={'PROVISIONING', 'READY'},
+    )
+    self.assertEqual((previous.status, current.status), ('READY', 'FAILED'))
+
+  def test_concurrent_create_is_checked_against_the_new_record(self) -> None:
+    dynamo = self._racing(_record(1, status='COMPLETE'))
+    with self.assertRaises(InvalidTransition):
+      dynamo.update_status('stream-0001', 'LIVE', '2025-01-02T00:00:00Z', allowed_from={'READY'})
+
+
+def _create(stream_id: str, start: str = '2025-03-01T18:00:00Z') -> Dict[str, Any]:
+  return {
+    'httpMethod': 'POST',
+    'body': json.dumps({
+      'streamId': stream_id,
+      'title': f'Broadcast {stream_id}',
+      'startTime': start,
+      'ingestEndpoints': [{'protocol': 'srt', 'url': 'srt://ingest.example.com:9000'}],
+    }),
+  }
+
+
+class StreamsRegistryLambdaTestCase(unittest.TestCase):
+  def setUp(self) -> None:
+    patcher = mock.patch.object(streams, 'repository', InMemoryStreamRepository())
+    self.repository = patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def _list(self, **query: str) -> Dict[str, Any]:
+    return streams.lambda_handler({'httpMethod': 'GET', 'queryStringParameters': query or None}, None)
+
+  def test_created_streams_are_listed_by_status(self) -> None:
+    streams.lambda_handler(_create('week-01'), None)
+    streams.lambda_handler(_create('week-02', '2025-03-08T18:00:00+01:00'), None)
+    for status, previous in (('READY', 'PROVISIONING'), ('LIVE', 'READY')):
+      update = streams.lambda_handler({
+        'httpMethod': 'PUT',
+        'body': json.dumps({'streamId': 'week-01', 'status': status}),
+      }, None)
+      self.assertEqual(json.loads(update['body'])['previousStatus'], previous)
+
+    live = json.loads(self._list(status='LIVE')['body'])
+    self.assertEqual([s['streamId'] for s in live['streams']], ['week-01'])
+    self.assertEqual(live['streams'][0]['title'], 'Broadcast week-01')
+
+    provisioning = json.loads(self._list(status='PROVISIONING')['body'])
+    self.assertEqual(provisioning['streams'][0]['startTime'], '2025-03-08T17:00:00Z')
+
+  def test_listing_reports_truncation(self) -> None:
+    for n in range(3):
+      streams.lambda_handler(_create(f'week-{n:02d}'), None)
+    payload = json.loads(self._list(status='PROVISIONING', limit='2')['body'])
+    self.assertEqual(payload['count'], 2)
+    self.assertTrue(payload['truncated'])
+
+  def test_invalid_query_parameters_are_rejected(self) -> None:
+    for query in (
+      {'status': 'PAUSED'}, {'limit': '0'}, {'limit': 'many'}, {'from': 'yesterday'},
+      {'from': '2025-03-01T00:00:00Z'}, {'to': '2025-03-01T00:00:00Z'}, {}, {'limit': '10'},
+      {'from': '2020-01-01T00:00:00Z', 'to': '2025-03-01T00:00:00Z'},
+    ):
+      with self.subTest(query=query):
+        response = self._list(**query)
+        self.assertEqual(response['statusCode'], 400)
+        self.assertEqual(json.loads(response['body'])['message'], 'Invalid query parameters.')
+
+
+if __name__ == '__main__':
+  unittest.main()
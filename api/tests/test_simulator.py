@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import unittest
+
+from api.contracts import STATE_MACHINES
+from api.simulator import Histogram, LatencyFake, Simulator, VirtualClock, default_integrations, run_virtual
+from api.simulator.fakes import fixed, lifecycle_confirmation
+
+ORCHESTRATOR = STATE_MACHINES[0]
+
+
+def _fixed_integrations(**overrides: object) -> dict:
+  integrations = {arn: LatencyFake(fixed(1.0)) for arn in default_integrations()}
+  integrations['arn:aws:states:::events:waitForEvent'] = lifecycle_confirmation(fixed(60.0))
+  integrations.update(overrides)
+  return integrations
+
+
+class VirtualClockTestCase(unittest.TestCase):
+  def test_sleeps_advance_virtual_time_only(self) -> None:
+    clock = VirtualClock()
+
+    async def scenario() -> list:
+      order = []
+
+      async def sleeper(seconds: float) -> None:
+        await asyncio.sleep(seconds)
+        order.append((seconds, asyncio.get_running_loop().time()))
+
+      await asyncio.gather(sleeper(900), sleeper(30), sleeper(0.5))
+      return order
+
+    started = time.perf_counter()
+    order = run_virtual(scenario(), clock)
+
+    self.assertLess(time.perf_counter() - started, 1.0)
+    self.assertEqual(order, [(0.5, 0.5), (30, 30.0), (900, 900.0)])
+    self.assertEqual(clock.now, 900.0)
+
+
+class SimulatorTestCase(unittest.TestCase):
+  def test_happy_path_follows_success_transitions(self) -> None:
+    report = Simulator(ORCHESTRATOR, _fixed_integrations()).simulate(10)
+
+    self.assertEqual((report.succeeded, report.failed), (10, 0))
+    self.assertEqual(report.terminal_states, {'WorkflowSucceeded': 10})
+    self.assertEqual(report.states['AwaitLifecycleConfirmation'].outcomes, {'ready': 10})
+    self.assertEqual(report.states['HandleProvisionFailure'].latency.count, 0)
+    # Seven one-second tasks plus the 60 second confirmation, all executions in parallel.
+    self.assertAlmostEqual(report.virtual_seconds, 67.0)
+    self.assertAlmostEqual(report.states['(execution)'].latency.max, 67.0)
+
+  def test_confirmation_timeout_uses_contract_timeout(self) -> None:
+    integrations = _fixed_integrations(**{
+      'arn:aws:states:::events:waitForEvent': lifecycle_confirmation(fixed(3600.0)),
+    })
+    report = Simulator(ORCHESTRATOR, integrations).simulate(3)
+
+    await_stats = report.states['AwaitLifecycleConfirmation']
+    self.assertEqual(await_stats.outcomes, {'timeout': 3})
+    self.assertAlmostEqual(await_stats.latency.max, 900.0)
+    self.assertEqual(report.terminal_states, {'WorkflowFailed': 3})
+
+  def test_integration_errors_take_the_failure_transition(self) -> None:
+    async def broken(_invocation: object) -> str:
+      raise RuntimeError('MediaLive quota exceeded')
+
+    integrations = _fixed_integrations(**{'arn:aws:states:::aws-sdk:medialive:startChannel': broken})
+    report = Simulator(ORCHESTRATOR, integrations).simulate(4)
+
+    self.assertEqual(report.states['ProvisionEncoderInfrastructure'].outcomes, {'failure': 4})
+    self.assertEqual(report.states['HandleProvisionFailure'].outcomes, {'success': 4})
+    self.assertEqual(report.failed, 4)
+
+  def test_runs_thousands_of_concurrent_executions(self) -> None:
+    started = time.perf_counter()
+    report = Simulator(ORCHESTRATOR, seed=3).simulate(5000)
+
+    self.assertEqual(report.peak_in_flight, 5000)
+    self.assertEqual(report.succeeded + report.failed, 5000)
+    self.assertGreater(report.succeeded, 4000)
+    self.assertLess(time.perf_counter() - started, 30)
+    self.assertIn('AwaitLifecycleConfirmation', report.format())
+
+  def test_seeded_runs_are_reproducible(self) -> None:
+    first = Simulator(ORCHESTRATOR, seed=11).simulate(200, arrival_rate=2.0, max_concurrency=50)
+    second = Simulator(ORCHESTRATOR, seed=11).simulate(200, arrival_rate=2.0, max_concurrency=50)
+
+    self.assertEqual(first.terminal_states, second.terminal_states)
+    self.assertEqual(first.virtual_seconds, second.virtual_seconds)
+    self.assertLessEqual(first.peak_in_flight, 50)
+
+  def test_missing_integration_is_rejected(self) -> None:
+    with self.assertRaises(ValueError):
+      Simulator(ORCHESTRATOR, {})
+
+
+class HistogramTestCase(unittest.TestCase):
+  def test_percentiles_within_bucket_error(self) -> None:
+    rng = random.Random(5)
+    values = sorted(rng.lognormvariate(0, 1.5) for _ in range(10_000))
+    histogram = Histogram()
+    for value in values:
+      histogram.record(value)
+
+    for percent in (50, 90, 99):
+      exact = values[int(percent / 100 * len(values)) - 1]
+      self.assertAlmostEqual(histogram.percentile(percent) / exact, 1.0, delta=0.06)
+    self.assertEqual(histogram.max, values[-1])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import unittest
+from typing import Any, Dict, Set
+
+from api.contracts import STATE_MACHINES
+from api.contracts.spec import STREAM_LIFECYCLE_ORCHESTRATOR_STATES
+from api.infra import build_cloudformation_template
+from api.infra.state_machine import build_state_machine_definition, split_express_workflow
+
+ORCHESTRATOR = STATE_MACHINES[0]
+
+
+def _targets(state: Dict[str, Any]) -> Set[str]:
+  targets = {state['Next']} if 'Next' in state else set()
+  targets.update(catch['Next'] for catch in state.get('Catch', []))
+  targets.update(choice['Next'] for choice in state.get('Choices', []))
+  if 'Default' in state:
+    targets.add(state['Default'])
+  return targets
+
+
+def _assert_well_formed(test: unittest.TestCase, definition: Dict[str, Any]) -> None:
+  states = definition['States']
+  test.assertIn(definition['StartAt'], states)
+  reached = {definition['StartAt']}
+  pending = [definition['StartAt']]
+  while pending:
+    for target in _targets(states[pending.pop()]):
+      test.assertIn(target, states)
+      if target not in reached:
+        reached.add(target)
+        pending.append(target)
+  test.assertEqual(reached, set(states))
+  for name, state in states.items():
+    if state['Type'] == 'Task':
+      test.assertTrue('Next' in state or state.get('End'), name)
+  json.dumps(definition)
+
+
+class StateMachineDefinitionTestCase(unittest.TestCase):
+  def setUp(self) -> None:
+    self.definition = build_state_machine_definition(ORCHESTRATOR)
+    self.states = self.definition['States']
+
+  def test_every_contract_state_is_generated(self) -> None:
+    _assert_well_formed(self, self.definition)
+    contract_names = {state.name for state in STREAM_LIFECYCLE_ORCHESTRATOR_STATES}
+    self.assertEqual(set(self.states) - contract_names, {'AwaitLifecycleConfirmationOutcome'})
+    self.assertEqual(self.definition['StartAt'], 'ValidateProvisionRequest')
+
+  def test_transitions_become_next_catch_and_choice(self) -> None:
+    validate = self.states['ValidateProvisionRequest']
+    self.assertEqual(validate['Next'], 'PersistProvisionRequest')
+    self.assertEqual(validate['Catch'], [
+      {'ErrorEquals': ['States.ALL'], 'ResultPath': '$.error', 'Next': 'HandleProvisionFailure'},
+    ])
+
+    await_state = self.states['AwaitLifecycleConfirmation']
+    self.assertEqual(await_state['Resource'], 'arn:aws:states:::events:putEvents.waitForTaskToken')
+    self.assertEqual(await_state['TimeoutSeconds'], 900)
+    self.assertEqual(await_state['Catch'][0]['ErrorEquals'], ['States.Timeout'])
+    self.assertNotIn('Retry', await_state)
+    self.assertEqual(self.states['AwaitLifecycleConfirmationOutcome']['Choices'], [
+      {'Variable': '$.confirmation.status', 'StringEquals': 'READY', 'Next': 'PublishReadyNotification'},
+      {'Variable': '$.confirmation.status', 'StringEquals': 'FAILED', 'Next': 'HandleProvisionFailure'},
+    ])
+    self.assertEqual(self.states['WorkflowFailed']['Type'], 'Fail')
+
+  def test_tasks_retry_transient_errors_with_backoff(self) -> None:
+    for name, state in self.states.items():
+      if state['Type'] != 'Task' or name == 'AwaitLifecycleConfirmation':
+        continue
+      with self.subTest(state=name):
+        retry = state['Retry'][0]
+        self.assertGreater(retry['BackoffRate'], 1)
+        self.assertEqual(retry['JitterStrategy'], 'FULL')
+    self.assertNotIn('States.ALL', self.states['ValidateProvisionRequest']['Retry'][0]['ErrorEquals'])
+
+  def test_sdk_tasks_retry_only_transient_errors(self) -> None:
+    for name, service in (('ProvisionEncoderInfrastructure', 'MediaLive'), ('ConfigurePlaybackEndpoints', 'CloudFront')):
+      with self.subTest(state=name):
+        errors = self.states[name]['Retry'][0]['ErrorEquals']
+        self.assertIn(f'{service}.ThrottlingException', errors)
+        self.assertIn('States.Timeout', errors)
+        self.assertNotIn('States.TaskFailed', errors)
+        self.assertNotIn('States.ALL', errors)
+
+  def test_express_definition_rejects_long_running_states(self) -> None:
+    with self.assertRaises(ValueError):
+      build_state_machine_definition(ORCHESTRATOR, workflow_type='EXPRESS')
+
+  def test_express_split_hands_off_to_standard(self) -> None:
+    express, standard = split_express_workflow(ORCHESTRATOR)
+    _assert_well_formed(self, express)
+    _assert_well_formed(self, standard)
+
+    self.assertEqual(set(express['States']), {
+      'ValidateProvisionRequest', 'PersistProvisionRequest', 'EmitProvisionRequestedEvent',
+      'StartLifecycleWorkflow', 'HandleProvisionFailure', 'WorkflowFailed',
+    })
+    self.assertEqual(express['States']['EmitProvisionRequestedEvent']['Next'], 'StartLifecycleWorkflow')
+    self.assertEqual(express['States']['StartLifecycleWorkflow']['Resource'], 'arn:aws:states:::states:startExecution')
+    self.assertLessEqual(express['TimeoutSeconds'], 300)
+    self.assertEqual(standard['StartAt'], 'ProvisionEncoderInfrastructure')
+    self.assertNotIn('ValidateProvisionRequest', standard['States'])
+
+
+class StateMachineTemplateTestCase(unittest.TestCase):
+  def test_standard_template_uses_generated_definition(self) -> None:
+    resources = build_cloudformation_template()['Resources']
+    machine = resources['StreamLifecycleStateMachine']['Properties']
+
+    self.assertEqual(machine['StateMachineType'], 'STANDARD')
+    self.assertEqual(machine['Definition'], build_state_machine_definition(ORCHESTRATOR))
+    self.assertEqual(machine['DefinitionSubstitutions']['StreamsTableName'], {'Ref': 'StreamsTable'})
+    self.assertNotIn('StreamProvisioningStateMachine', resources)
+
+  def test_express_template_fronts_the_standard_workflow(self) -> None:
+    template = build_cloudformation_template(workflow_type='EXPRESS')
+    resources = template['Resources']
+    express = resources['StreamProvisioningStateMachine']['Properties']
+
+    self.assertEqual(express['StateMachineType'], 'EXPRESS')
+    self.assertEqual(express['DefinitionSubstitutions']['LifecycleStateMachineArn'], {'Ref': 'StreamLifecycleStateMachine'})
+    self.assertEqual(
+      resources['StreamsLambdaFunction']['Properties']['Environment']['Variables']['STATE_MACHINE_ARN'],
+      {'Ref': 'StreamProvisioningStateMachine'},
+    )
+    self.assertIn('ProvisioningStateMachineArn', template['Outputs'])
+
+  def test_unknown_workflow_type_is_rejected(self) -> None:
+    with self.assertRaises(ValueError):
+      build_cloudformation_template(workflow_type='SYNC')
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import unittest
+
+from api.contracts import REQUEST_VALIDATORS, REST_OPERATIONS, compile_schema
+from api.contracts.spec import CREATE_STREAM_REQUEST_SCHEMA, UPDATE_STREAM_REQUEST_SCHEMA
+from api.contracts.validation import validate
+
+
+VALID_CREATE = {
+  'streamId': 'launch-day',
+  'title': 'Launch Day Broadcast',
+  'startTime': '2025-03-01T18:00:00Z',
+  'ingestEndpoints': [
+    {'protocol': 'rtmps', 'url': 'rtmps://ingest.example.com/app', 'backupUrl': 'rtmps://backup.example.com/app'},
+  ],
+  'metadata': {'region': 'us-east-1'},
+}
+
+CREATE_PAYLOADS = [
+  VALID_CREATE,
+  {},
+  [],
+  'not an object',
+  {'title': 'Missing required fields'},
+  {**VALID_CREATE, 'streamId': 'no spaces allowed'},
+  {**VALID_CREATE, 'streamId': 'abc\n'},
+  {**VALID_CREATE, 'title': ''},
+  {**VALID_CREATE, 'title': 'x' * 141},
+  {**VALID_CREATE, 'startTime': 'tomorrow'},
+  {**VALID_CREATE, 'ingestEndpoints': []},
+  {**VALID_CREATE, 'ingestEndpoints': 'rtmp://ingest'},
+  {**VALID_CREATE, 'ingestEndpoints': ['rtmp://ingest', {'protocol': 'hls', 'url': 'not a uri', 'extra': 1}]},
+  {**VALID_CREATE, 'metadata': {'region': 1}},
+  {**VALID_CREATE, 'metadata': 'region'},
+  {**VALID_CREATE, 'unexpected': True},
+  {**VALID_CREATE, 'streamId': 42, 'title': None},
+]
+
+UPDATE_PAYLOADS = [
+  {'streamId': 'launch-day', 'status': 'READY'},
+  {'streamId': 'launch-day', 'status': 'READY', 'reason': 'Encoder warmed up.'},
+  {'streamId': 'launch-day', 'status': 'UNKNOWN'},
+  {'streamId': 'launch-day', 'status': 'READY', 'reason': 'x' * 281},
+  {'status': 'LIVE'},
+  {'streamId': 'launch-day', 'status': 3},
+]
+
+
+class CompiledValidatorTestCase(unittest.TestCase):
+  def test_request_validators_cover_operations_with_schemas(self) -> None:
+    expected = {operation.name for operation in REST_OPERATIONS if operation.request_schema is not None}
+    self.assertEqual(set(REQUEST_VALIDATORS), expected)
+    self.assertIn('CreateStreamWorkflow', expected)
+
+  def test_compiled_matches_generic_validator(self) -> None:
+    for schema, payloads in (
+      (CREATE_STREAM_REQUEST_SCHEMA, CREATE_PAYLOADS),
+      (UPDATE_STREAM_REQUEST_SCHEMA, UPDATE_PAYLOADS),
+    ):
+      compiled = compile_schema(schema)
+      for payload in payloads:
+        with self.subTest(payload=payload):
+          self.assertEqual(compiled(payload), validate(schema, payload))
+
+  def test_valid_payload_has_no_issues(self) -> None:
+    self.assertEqual(REQUEST_VALIDATORS['CreateStreamWorkflow'](VALID_CREATE), [])
+
+  def test_enforces_patterns_enums_lengths_and_additional_properties(self) -> None:
+    payload = {
+      **VALID_CREATE,
+      'streamId': 'x',
+      'title': 'x' * 141,
+      'ingestEndpoints': [{'protocol': 'hls', 'url': 'rtmp://ingest', 'extra': 1}],
+      'unexpected': True,
+    }
+
+    issues = REQUEST_VALIDATORS['CreateStreamWorkflow'](payload)
+
+    self.assertEqual(issues, [
+      'streamId must match ^[a-zA-Z0-9-]{3,64}$.',
+      'title must be at most 140 characters.',
+      'ingestEndpoints[0].protocol must be one of rtmp, rtmps, srt.',
+      'ingestEndpoints[0].extra is not allowed.',
+      'unexpected is not allowed.',
+    ])
+
+  def test_trailing_dollar_does_not_accept_a_final_newline(self) -> None:
+    payload = {**VALID_CREATE, 'streamId': 'abc\n'}
+    expected = ['streamId must match ^[a-zA-Z0-9-]{3,64}$.']
+
+    self.assertEqual(REQUEST_VALIDATORS['CreateStreamWorkflow'](payload), expected)
+    self.assertEqual(validate(CREATE_STREAM_REQUEST_SCHEMA, payload), expected)
+    self.assertEqual(REQUEST_VALIDATORS['CreateStreamWorkflow']({**VALID_CREATE, 'streamId': 'abc'}), [])
+
+  def test_escaped_trailing_dollar_stays_literal(self) -> None:
+    validator = compile_schema({'type': 'string', 'pattern': r'^a\$'})
+    self.assertEqual(validator('a$'), [])
+    self.assertEqual(validate({'type': 'string', 'pattern': r'^a\$'}, 'a$'), [])
+
+  def test_reports_missing_and_mistyped_fields_with_paths(self) -> None:
+    issues = REQUEST_VALIDATORS['CreateStreamWorkflow']({
+      **VALID_CREATE,
+      'startTime': None,
+      'ingestEndpoints': ['rtmp://ingest', {'protocol': 'srt'}],
+    })
+
+    self.assertEqual(issues, [
+      'startTime is required.',
+      'ingestEndpoints[0] must be an object.',
+      'ingestEndpoints[1].url is required.',
+    ])
+
+  def test_rejects_non_object_body(self) -> None:
+    self.assertEqual(REQUEST_VALIDATORS['UpdateStreamStatus']([]), ['body must be an object.'])
+
+  def test_unsupported_keywords_fail_at_compile_time(self) -> None:
+    with self.assertRaises(ValueError):
+      compile_schema({'type': 'object', 'oneOf': []})
+    with self.assertRaises(ValueError):
+      compile_schema({'type': 'string', 'format': 'email'})
+
+  def test_compiled_source_is_kept_for_debugging(self) -> None:
+    validator = compile_schema({'type': 'string', 'pattern': '^a{2}$'}, 'validate_pair')
+    self.assertIn('def validate_pair(value):', validator.__source__)
+    self.assertEqual(validator('aa'), [])
+    self.assertEqual(validator('a'), ['body must match ^a{2}$.'])
+
+
+if __name__ == '__main__':
+  unittest.main()
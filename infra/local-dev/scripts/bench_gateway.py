@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Measure API gateway throughput against the local Cognito and Lambda services.
+
+Starts the Cognito mock, the Lambda simulation, and the API gateway as
+separate uvicorn processes on free localhost ports, fetches a token, then
+drives ``GET /hello`` through the gateway with a fixed number of concurrent
+clients and reports requests per second and latency percentiles.
+
+Compare two versions of the gateway by pointing ``--app`` at an older copy:
+
+    git show HEAD~1:infra/local-dev/services/api-gateway/app/main.py > /tmp/gateway_before.py
+    python infra/local-dev/scripts/bench_gateway.py --app /tmp/gateway_before.py
+    python infra/local-dev/scripts/bench_gateway.py
+
+Requires the packages in ``infra/local-dev/services/requirements.txt``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+SERVICES_DIR = Path(__file__).resolve().parents[1] / "services"
+GATEWAY_APP = SERVICES_DIR / "api-gateway" / "app" / "main.py"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+@contextmanager
+def _uvicorn(app_file: Path, port: int, env: Dict[str, str]) -> Iterator[str]:
+    """Serve app_file's ``app`` on port in a child process and yield its base URL."""
+
+    command = [
+        sys.executable, "-m", "uvicorn", f"{app_file.stem}:app",
+        "--app-dir", str(app_file.parent), "--port", str(port), "--log-level", "warning", "--no-access-log",
+    ]
+    process = subprocess.Popen(command, env={**os.environ, **env})
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_up(f"{base_url}/healthz")
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+async def _drive(url: str, headers: Dict[str, str], requests: int, concurrency: int) -> List[float]:
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+
+        async def worker() -> None:
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the local API gateway.")
+    parser.add_argument("--app", type=Path, default=GATEWAY_APP, help="Gateway main.py to benchmark.")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests to send after warm-up.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent client connections.")
+    parser.add_argument("--path", default="/hello", help="Lambda path to request through the gateway.")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra gateway environment.")
+    args = parser.parse_args(argv)
+
+    cognito_port, lambda_port, gateway_port = _free_port(), _free_port(), _free_port()
+    issuer = f"http://127.0.0.1:{cognito_port}"
+    cognito_env = {"COGNITO_ISSUER": issuer}
+    gateway_env = {
+        "COGNITO_JWKS_URL": f"{issuer}/.well-known/jwks.json",
+        "COGNITO_ISSUER": issuer,
+        "LAMBDA_URL": f"http://127.0.0.1:{lambda_port}",
+        "FARGATE_URL": f"http://127.0.0.1:{lambda_port}",
+        **dict(item.split("=", 1) for item in args.env),
+    }
+
+    with _uvicorn(SERVICES_DIR / "cognito-mock" / "app" / "main.py", cognito_port, cognito_env), \
+            _uvicorn(SERVICES_DIR / "lambda" / "app" / "main.py", lambda_port, {}), \
+            _uvicorn(args.app.resolve(), gateway_port, gateway_env) as gateway_url:
+        token = httpx.post(f"{issuer}/token", json={"username": "bench", "audience": "guidogerb-api"}).json()["access_token"]
+        headers = {"Host": "api.local.bench.test", "Authorization": f"Bearer {token}"}
+        url = f"{gateway_url}{args.path}"
+
+        asyncio.run(_drive(url, headers, min(500, args.requests), args.concurrency))
+        started = time.perf_counter()
+        latencies = asyncio.run(_drive(url, headers, args.requests, args.concurrency))
+        elapsed = time.perf_counter() - started
+
+    print(f"{args.app}: {args.requests} requests, concurrency {args.concurrency}")
+    print(
+        f"{args.requests / elapsed:8.0f} req/s   p50 {_percentile(latencies, 50) * 1000:6.1f}ms   "
+        f"p99 {_percentile(latencies, 99) * 1000:6.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import itertools
+import json
+import logging
+import math
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Dict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, Union
 
 import httpx
 import jwt
 from fastapi import FastAPI, HTTPException, Request, Response, status
-from fastapi.responses import JSONResponse
-from jwt import PyJWKClient
+from fastapi.responses import JSONResponse, StreamingResponse
 
-app = FastAPI(title="GuidoGerb API Gateway", version="0.1.0")
+logger = logging.getLogger("guidogerb.api_gateway")
 
 JWKS_URL = os.getenv("COGNITO_JWKS_URL", "http://cognito-mock:8000/.well-known/jwks.json")
 ISSUER = os.getenv("COGNITO_ISSUER", "http://cognito-mock:8000")
@@ -19,8 +31,556 @@ FARGATE_URL = os.getenv("FARGATE_URL", "http://fargate-service:9001")
 LAMBDA_AUDIENCE = os.getenv("LAMBDA_AUDIENCE", "guidogerb-api")
 FARGATE_AUDIENCE = os.getenv("FARGATE_AUDIENCE", "guidogerb-app")
 REQUEST_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "200"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "50"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() in {"1", "true", "yes"}
+JWKS_REFRESH_SECONDS = float(os.getenv("JWKS_REFRESH_SECONDS", "300"))
+JWKS_MIN_REFETCH_SECONDS = float(os.getenv("JWKS_MIN_REFETCH_SECONDS", "5"))
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_VERIFY_WORKERS = int(os.getenv("JWT_VERIFY_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Defaults mirror API Gateway's account-level throttle (10,000 req/s, burst 5,000);
+# max in-flight 0 means unlimited. THROTTLE_CONFIG points at per-tenant overrides.
+THROTTLE_RATE_LIMIT = float(os.getenv("THROTTLE_RATE_LIMIT", "10000"))
+THROTTLE_BURST_LIMIT = int(os.getenv("THROTTLE_BURST_LIMIT", "5000"))
+THROTTLE_MAX_IN_FLIGHT = int(os.getenv("THROTTLE_MAX_IN_FLIGHT", "0"))
+THROTTLE_CONFIG = os.getenv("THROTTLE_CONFIG", "")
+# Tenants come from the Host header, so the per-tenant table is capped; see TenantThrottler.
+THROTTLE_MAX_TENANTS = int(os.getenv("THROTTLE_MAX_TENANTS", "10000"))
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+# Used when the upstream sends no max-age; 0 caches only responses that opt in.
+RESPONSE_CACHE_DEFAULT_TTL = float(os.getenv("RESPONSE_CACHE_DEFAULT_TTL", "0"))
+# Request headers that are part of the cache key. Keying on authorization keeps each
+# caller's responses separate; drop it to share responses across a tenant's users.
+RESPONSE_CACHE_VARY = tuple(
+    header.strip().lower() for header in os.getenv("RESPONSE_CACHE_VARY", "authorization").split(",") if header.strip()
+)
 
-_jwks_client = PyJWKClient(JWKS_URL)
+
+class JwksCache:
+    """Signing keys fetched asynchronously and refreshed in the background.
+
+    A token whose ``kid`` is unknown triggers one immediate refetch (rotated
+    keys), at most every ``JWKS_MIN_REFETCH_SECONDS`` so bogus kids cannot
+    hammer the identity provider. The window counts from the last attempt, so
+    an unreachable provider is not retried by every request either.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.keys: Dict[str, jwt.PyJWK] = {}
+        self.fetched_at = 0.0
+        self.attempted_at = -math.inf
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        try:
+            await self.refresh()
+        except (httpx.HTTPError, jwt.PyJWTError, ValueError) as exc:
+            # The identity provider may still be starting; a later kid miss retries.
+            logger.warning("Initial JWKS fetch from %s failed: %s", self.url, exc)
+        self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def refresh(self) -> None:
+        self.attempted_at = time.monotonic()
+        response = await self._client.get(self.url)
+        response.raise_for_status()
+        key_set = jwt.PyJWKSet.from_dict(response.json())
+        keys = {key.key_id: key for key in key_set.keys if key.key_id}
+        if set(self.keys) - set(keys):
+            # A signing key was withdrawn: tokens it verified must be checked again.
+            _verified_tokens.clear()
+        self.keys = keys
+        self.fetched_at = time.monotonic()
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(JWKS_REFRESH_SECONDS)
+            try:
+                await self.refresh()
+            except (httpx.HTTPError, jwt.PyJWTError, ValueError) as exc:
+                logger.warning("JWKS refresh from %s failed: %s", self.url, exc)
+
+    async def get_signing_key(self, kid: Optional[str]) -> jwt.PyJWK:
+        key = self.keys.get(kid)
+        if key is not None:
+            return key
+        async with self._lock:
+            key = self.keys.get(kid)
+            if key is None and time.monotonic() - self.attempted_at >= JWKS_MIN_REFETCH_SECONDS:
+                await self.refresh()
+                key = self.keys.get(kid)
+        if key is None:
+            raise KeyError(kid)
+        return key
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified claims keyed by token hash and audience, expiring at ``exp``."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[bytes, str], Tuple[Dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str, audience: str) -> Tuple[bytes, str]:
+        return hashlib.sha256(token.encode("utf-8")).digest(), audience
+
+    def get(self, key: Tuple[bytes, str]) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple[bytes, str], claims: Dict) -> None:
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.max_entries <= 0:
+            return  # tokens without an expiry are verified every time
+        with self._lock:
+            self._entries[key] = (claims, float(expires_at))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@dataclass(frozen=True)
+class ThrottleLimits:
+    rate_limit: float
+    burst_limit: int
+    max_in_flight: int = 0
+
+
+class TokenBucket:
+    """Refilled lazily from the elapsed time on each call, so no timer task is needed."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Spend one token and return 0, or return the seconds until one is available."""
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (1 - self.tokens) / self.rate
+
+    def full(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class Throttle:
+    """Token bucket, in-flight count, and counters for one tenant and target."""
+
+    def __init__(self, limits: ThrottleLimits) -> None:
+        self.limits = limits
+        self.bucket = TokenBucket(limits.rate_limit, limits.burst_limit)
+        self.in_flight = 0
+        self.allowed = 0
+        self.rate_limited = 0
+        self.concurrency_limited = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_limit": self.limits.rate_limit,
+            "burst_limit": self.limits.burst_limit,
+            "max_in_flight": self.limits.max_in_flight,
+            "in_flight": self.in_flight,
+            "allowed": self.allowed,
+            "rate_limited": self.rate_limited,
+            "concurrency_limited": self.concurrency_limited,
+        }
+
+
+class TenantThrottler:
+    """Per ``tenant/target`` throttling in the style of API Gateway usage plans.
+
+    Overrides are looked up most specific first: ``tenant/target``, ``tenant``,
+    ``*/target``, then ``*``; anything unset falls back to the defaults.
+
+    Tenants come from the client's Host header, so the table holds at most
+    ``max_tenants`` throttles, least recently used first. A new tenant replaces
+    one of the oldest throttles that is idle (nothing in flight, bucket refilled,
+    so forgetting it changes nothing); when none is, the new tenant goes to a
+    shared ``*/target`` overflow throttle until one frees up. Every call runs on
+    the event loop, so the counters need no locking.
+    """
+
+    # How many of the least recently used throttles a new tenant may look at for an idle one.
+    EVICTION_SCAN = 16
+
+    def __init__(
+        self,
+        defaults: ThrottleLimits,
+        overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_tenants: int = THROTTLE_MAX_TENANTS,
+    ) -> None:
+        self.defaults = defaults
+        self.overrides = overrides or {}
+        self.max_tenants = max_tenants
+        self._throttles: "OrderedDict[str, Throttle]" = OrderedDict()
+        self._overflow: Dict[str, Throttle] = {}
+
+    @classmethod
+    def from_config(cls, path: str) -> "TenantThrottler":
+        defaults = ThrottleLimits(THROTTLE_RATE_LIMIT, THROTTLE_BURST_LIMIT, THROTTLE_MAX_IN_FLIGHT)
+        if not path:
+            return cls(defaults)
+        with open(path, encoding="utf-8") as handle:
+            return cls(defaults, json.load(handle))
+
+    def limits_for(self, tenant: str, target: str) -> ThrottleLimits:
+        for key in (f"{tenant}/{target}", tenant, f"*/{target}", "*"):
+            if key in self.overrides:
+                override = self.overrides[key]
+                return ThrottleLimits(
+                    rate_limit=float(override.get("rate_limit", self.defaults.rate_limit)),
+                    burst_limit=int(override.get("burst_limit", self.defaults.burst_limit)),
+                    max_in_flight=int(override.get("max_in_flight", self.defaults.max_in_flight)),
+                )
+        return self.defaults
+
+    def acquire(self, tenant: str, target: str) -> Callable[[], None]:
+        """Admit one request or raise 429; call the returned function when it finishes."""
+
+        now = time.monotonic()
+        throttle = self._throttle_for(tenant, target, now)
+
+        max_in_flight = throttle.limits.max_in_flight
+        if max_in_flight and throttle.in_flight >= max_in_flight:
+            throttle.concurrency_limited += 1
+            raise _too_many_requests(1.0)
+        wait = throttle.bucket.take(now)
+        if wait:
+            throttle.rate_limited += 1
+            raise _too_many_requests(wait)
+
+        throttle.allowed += 1
+        throttle.in_flight += 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                throttle.in_flight -= 1
+
+        return release
+
+    def _throttle_for(self, tenant: str, target: str, now: float) -> Throttle:
+        key = f"{tenant}/{target}"
+        throttle = self._throttles.get(key)
+        if throttle is not None:
+            self._throttles.move_to_end(key)
+            return throttle
+        if len(self._throttles) >= self.max_tenants:
+            oldest = itertools.islice(self._throttles.items(), self.EVICTION_SCAN)
+            idle = next((name for name, old in oldest if not old.in_flight and old.bucket.full(now)), None)
+            if idle is None:
+                overflow = self._overflow.get(target)
+                if overflow is None:
+                    overflow = self._overflow[target] = Throttle(self.limits_for("*", target))
+                return overflow
+            del self._throttles[idle]
+        throttle = self._throttles[key] = Throttle(self.limits_for(tenant, target))
+        return throttle
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        throttles = {**self._throttles, **{f"*/{target}": throttle for target, throttle in self._overflow.items()}}
+        return {key: throttle.stats() for key, throttle in sorted(throttles.items())}
+
+
+def _too_many_requests(retry_after: float) -> HTTPException:
+    seconds = 3600 if math.isinf(retry_after) else max(1, math.ceil(retry_after))
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too Many Requests",
+        headers={"retry-after": str(seconds)},
+    )
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+    expires_at: float
+    # The upstream's Age when stored, so a hit reports the response's age, not the entry's.
+    initial_age: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(key) + len(value) for key, value in self.headers.items())
+
+    def to_response(self, outcome: str) -> Response:
+        age = self.initial_age + time.monotonic() - self.stored_at
+        headers = {**self.headers, "age": str(int(age)), "x-cache": f"{outcome} from gateway"}
+        return Response(content=self.body, status_code=self.status_code, headers=headers)
+
+
+class ResponseCache:
+    """Opt-in cache for GET responses, modelled on API Gateway stage caching.
+
+    Entries are keyed on tenant, target, path, query, and the ``RESPONSE_CACHE_VARY``
+    request headers, live for the upstream's ``s-maxage``/``max-age``, and are evicted
+    least recently used once ``max_bytes`` is exceeded. Concurrent misses on one key
+    share a single upstream call: its error, or its response when small and not
+    ``private``/``no-store`` (even an uncacheable one), goes to every waiter. A
+    response that cannot be shared is streamed to the first caller only, and one
+    waiter then makes the next call for the rest.
+    """
+
+    def __init__(self, enabled: bool, max_bytes: int, max_entry_bytes: int, default_ttl: float, vary: Tuple[str, ...]) -> None:
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.default_ttl = default_ttl
+        self.vary = vary
+        self._entries: "OrderedDict[bytes, CachedResponse]" = OrderedDict()
+        self._pending: Dict[bytes, asyncio.Future] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def key_for(self, context: BackendContext, request: Request) -> Optional[bytes]:
+        if not self.enabled or request.method != "GET":
+            return None
+        parts = [context.tenant, context.target, request.url.path, *sorted(request.query_params.multi_items())]
+        parts.extend(request.headers.get(header, "") for header in self.vary)
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).digest()
+
+    def shareable(self, response: httpx.Response) -> bool:
+        """Whether response may be buffered and handed to other callers with the same key."""
+
+        headers = response.headers
+        try:
+            length = int(headers.get("content-length", self.max_entry_bytes + 1))
+        except ValueError:
+            return False
+        return (
+            length <= self.max_entry_bytes
+            and "set-cookie" not in headers
+            and headers.get("vary", "").strip() != "*"
+            and not {"no-store", "private"} & _cache_directives(headers).keys()
+        )
+
+    def ttl_for(self, response: httpx.Response) -> Optional[float]:
+        if response.status_code != 200 or not self.shareable(response):
+            return None
+        headers = response.headers
+        directives = _cache_directives(headers)
+        if "no-cache" in directives:
+            return None
+        try:
+            age = _age(headers)
+        except ValueError:
+            return None
+        for name in ("s-maxage", "max-age"):
+            if name in directives:
+                try:
+                    ttl = float(directives[name]) - age
+                except ValueError:
+                    return None
+                return ttl if ttl > 0 else None
+        return self.default_ttl or None
+
+    def get(self, key: bytes) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: bytes) -> None:
+        self.bytes -= self._entries.pop(key).size
+
+    def _store(self, key: bytes, entry: CachedResponse) -> None:
+        if entry.size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def fetch(
+        self, key: bytes, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> Tuple[str, Optional[CachedResponse], Optional[httpx.Response]]:
+        """Return ``(outcome, cached, None)`` when cached or ``(outcome, None, streaming response)``.
+
+        A waiter on another caller's upstream call raises that call's error.
+        """
+
+        while True:
+            entry = self.get(key)
+            if entry is not None:
+                self.hits += 1
+                return "Hit", entry, None
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            result = await pending
+            if isinstance(result, Exception):
+                raise result
+            if result is not None:
+                self.coalesced += 1
+                return "Coalesced", result, None
+            # The response went to its caller alone; the first waiter to get here leads the next call.
+
+        self.misses += 1
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        shared: Union[CachedResponse, Exception, None] = None
+        try:
+            response = await send()
+            if not self.shareable(response):
+                return "Miss", None, response
+            ttl = self.ttl_for(response)
+            try:
+                body = b"".join([chunk async for chunk in response.aiter_raw()])
+            finally:
+                await response.aclose()
+            excluded = {"content-length", "connection", "transfer-encoding", "age"}
+            now = time.monotonic()
+            entry = CachedResponse(
+                status_code=response.status_code,
+                headers={name: value for name, value in response.headers.items() if name.lower() not in excluded},
+                body=body,
+                stored_at=now,
+                expires_at=now + (ttl or 0),
+                initial_age=_age(response.headers) if ttl is not None else 0.0,
+            )
+            if ttl is not None:
+                self._store(key, entry)
+            shared = entry
+            return "Miss", entry, None
+        except Exception as exc:
+            # Waiters fail with the leader instead of each retrying a failing upstream.
+            shared = exc
+            raise
+        finally:
+            del self._pending[key]
+            future.set_result(shared)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+
+def _cache_directives(headers: httpx.Headers) -> Dict[str, str]:
+    directives: Dict[str, str] = {}
+    for directive in headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().lower().partition("=")
+        directives[name] = value.strip('"')
+    return directives
+
+
+def _age(headers: httpx.Headers) -> float:
+    """The upstream's ``Age`` in seconds; raises ``ValueError`` when it is malformed."""
+
+    age = float(headers.get("age", "0"))
+    if not math.isfinite(age):
+        raise ValueError(f"invalid age {age}")
+    return max(0.0, age)
+
+
+_jwks = JwksCache(JWKS_URL)
+_verified_tokens = VerifiedTokenCache(JWT_CACHE_SIZE)
+# RS256 verification runs in OpenSSL without the GIL, so a small pool keeps it off the event loop.
+_verify_executor = ThreadPoolExecutor(max_workers=JWT_VERIFY_WORKERS, thread_name_prefix="jwt-verify")
+_throttler = TenantThrottler.from_config(THROTTLE_CONFIG)
+_response_cache = ResponseCache(
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRY_BYTES,
+    RESPONSE_CACHE_DEFAULT_TTL,
+    RESPONSE_CACHE_VARY,
+)
+
+
+def build_upstream_client(base_url: str) -> httpx.AsyncClient:
+    """Create the long-lived, pooled client used for every request to one backend."""
+
+    if UPSTREAM_HTTP2 and importlib.util.find_spec("h2") is None:
+        raise RuntimeError("UPSTREAM_HTTP2 requires the h2 package: pip install 'httpx[http2]'")
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+        ),
+        http2=UPSTREAM_HTTP2,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # One client (and connection pool) per backend target for the life of the process,
+    # so requests reuse keep-alive connections instead of opening one each.
+    app.state.upstream_clients = {
+        "lambda": build_upstream_client(LAMBDA_URL),
+        "fargate": build_upstream_client(FARGATE_URL),
+    }
+    await _jwks.start()
+    try:
+        yield
+    finally:
+        await _jwks.stop()
+        for client in app.state.upstream_clients.values():
+            await client.aclose()
+
+
+app = FastAPI(title="GuidoGerb API Gateway", version="0.1.0", lifespan=lifespan)
 
 
 @dataclass
@@ -42,23 +602,34 @@ def resolve_context(host_header: str) -> BackendContext:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown API host '{host_header}'")
 
 
-def decode_jwt(token: str, expected_audience: str) -> Dict:
+async def decode_jwt(token: str, expected_audience: str) -> Dict:
+    cache_key = VerifiedTokenCache.key(token, expected_audience)
+    claims = _verified_tokens.get(cache_key)
+    if claims is not None:
+        return claims
+
     try:
-        signing_key = _jwks_client.get_signing_key_from_jwt(token)
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await _jwks.get_signing_key(kid)
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unable to resolve signing key") from exc
 
+    verify = functools.partial(
+        jwt.decode,
+        token,
+        signing_key.key,
+        algorithms=["RS256"],
+        audience=expected_audience,
+        issuer=ISSUER,
+    )
     try:
-        return jwt.decode(
-            token,
-            signing_key.key,
-            algorithms=["RS256"],
-            audience=expected_audience,
-            issuer=ISSUER,
-        )
+        claims = await asyncio.get_running_loop().run_in_executor(_verify_executor, verify)
     except jwt.PyJWTError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
 
+    _verified_tokens.put(cache_key, claims)
+    return claims
+
 
 @app.get("/healthz")
 async def healthz() -> dict:
@@ -67,6 +638,11 @@ async def healthz() -> dict:
         "jwks": JWKS_URL,
         "lambda_url": LAMBDA_URL,
         "fargate_url": FARGATE_URL,
+        "upstream_http2": UPSTREAM_HTTP2,
+        "jwks_keys": len(_jwks.keys),
+        "jwt_cache": _verified_tokens.stats(),
+        "throttling": _throttler.stats(),
+        "response_cache": _response_cache.stats(),
     }
 
 
@@ -86,14 +662,13 @@ async def proxy(path: str, request: Request) -> Response:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Bearer token is required")
 
     token = auth_header.split(" ", 1)[1]
-    claims = decode_jwt(token, context.audience)
-
-    body = await request.body()
+    claims = await decode_jwt(token, context.audience)
+    release = _throttler.acquire(context.tenant, context.target)
 
     forward_headers = {
         key: value
         for key, value in request.headers.items()
-        if key.lower() not in {"host", "content-length", "connection"}
+        if key.lower() not in {"host", "connection", "transfer-encoding"}
     }
     forward_headers.update(
         {
@@ -104,33 +679,71 @@ async def proxy(path: str, request: Request) -> Response:
         }
     )
 
-    target_url = f"{context.base_url}{request.url.path}"
+    client: httpx.AsyncClient = request.app.state.upstream_clients[context.target]
+    upstream_request = client.build_request(
+        request.method,
+        request.url.path,
+        params=dict(request.query_params),
+        headers=forward_headers,
+        # Bodies are relayed chunk by chunk as the upstream reads them; the client's
+        # content-length is kept above so fixed-size uploads are not re-chunked.
+        content=request.stream() if _has_body(request) else None,
+    )
 
+    send = functools.partial(client.send, upstream_request, stream=True)
+    cache_key = _response_cache.key_for(context, request)
+    cached: Optional[CachedResponse] = None
     try:
-        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-            upstream_response = await client.request(
-                request.method,
-                target_url,
-                params=dict(request.query_params),
-                headers=forward_headers,
-                content=body,
-            )
+        if cache_key is None:
+            upstream_response = await send()
+        else:
+            cache_outcome, cached, upstream_response = await _response_cache.fetch(cache_key, send)
     except httpx.HTTPError as exc:
+        release()
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+    except BaseException:
+        release()
+        raise
+
+    if cached is not None:
+        release()
+        return cached.to_response(cache_outcome)
 
     excluded = {"content-length", "connection", "transfer-encoding"}
     response_headers = {
         key: value for key, value in upstream_response.headers.items() if key.lower() not in excluded
     }
+    if cache_key is not None:
+        response_headers["x-cache"] = f"{cache_outcome} from gateway"
 
-    return Response(
-        content=upstream_response.content,
+    # Raw chunks keep any content-encoding intact.
+    return StreamingResponse(
+        _relay(upstream_response, release),
         status_code=upstream_response.status_code,
         headers=response_headers,
         media_type=upstream_response.headers.get("content-type"),
     )
 
 
+async def _relay(upstream_response: httpx.Response, release: Callable[[], None]) -> AsyncIterator[bytes]:
+    """Stream the upstream body, then close it and free the in-flight slot.
+
+    This runs in ``finally`` rather than as a background task because Starlette
+    skips background tasks when the body fails partway or the client disconnects.
+    """
+
+    try:
+        async for chunk in upstream_response.aiter_raw():
+            yield chunk
+    finally:
+        release()
+        await upstream_response.aclose()
+
+
+def _has_body(request: Request) -> bool:
+    return "transfer-encoding" in request.headers or request.headers.get("content-length", "0") != "0"
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(_: Request, exc: HTTPException) -> JSONResponse:
     headers = exc.headers or {}
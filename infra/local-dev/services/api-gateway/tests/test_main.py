@@ -0,0 +1,342 @@
+"""Gateway caches exercised in-process against httpx.MockTransport upstreams.
+
+Run from the api-gateway directory so ``app`` is importable:
+``python -m unittest discover tests`` (or ``python -m pytest tests``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+from unittest import mock
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from starlette.requests import Request
+
+from app import main
+
+
+def _jwks(kid: str) -> Dict[str, Any]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    return {"keys": [{**jwk, "kid": kid, "use": "sig", "alg": "RS256"}]}
+
+
+class JwksCacheTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.requests = 0
+        self.responses = []
+        self.cache = main.JwksCache("http://idp/.well-known/jwks.json")
+        self.cache._client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+
+    async def asyncTearDown(self) -> None:
+        await self.cache.stop()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return self.responses.pop(0)
+
+    async def test_unknown_kid_refetches_once_per_window(self) -> None:
+        self.responses = [httpx.Response(200, json=_jwks("rotated"))]
+
+        key = await self.cache.get_signing_key("rotated")
+
+        self.assertEqual(key.key_id, "rotated")
+        with self.assertRaises(KeyError):
+            await self.cache.get_signing_key("bogus")
+        self.assertEqual(self.requests, 1)
+
+    async def test_failed_refresh_is_throttled(self) -> None:
+        self.responses = [httpx.Response(503), httpx.Response(200, json=_jwks("rotated"))]
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.cache.get_signing_key("rotated")
+        for _ in range(3):
+            with self.assertRaises(KeyError):
+                await self.cache.get_signing_key("rotated")
+        self.assertEqual(self.requests, 1)
+
+        self.cache.attempted_at -= main.JWKS_MIN_REFETCH_SECONDS
+        key = await self.cache.get_signing_key("rotated")
+
+        self.assertEqual(key.key_id, "rotated")
+        self.assertEqual(self.requests, 2)
+
+
+class TenantThrottlerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.throttler = main.TenantThrottler(
+            main.ThrottleLimits(rate_limit=0, burst_limit=2, max_in_flight=0),
+            {"noisy.test": {"burst_limit": 1}, "*/fargate": {"burst_limit": 3}},
+        )
+
+    def test_configured_tenants_get_their_own_bucket(self) -> None:
+        self.throttler.acquire("noisy.test", "lambda")
+        with self.assertRaises(main.HTTPException) as raised:
+            self.throttler.acquire("noisy.test", "lambda")
+
+        self.assertEqual(raised.exception.status_code, 429)
+        self.throttler.acquire("quiet.test", "lambda")
+
+    def test_unconfigured_tenants_get_their_own_bucket_too(self) -> None:
+        self.throttler.acquire("first.test", "lambda")
+        self.throttler.acquire("first.test", "lambda")
+        with self.assertRaises(main.HTTPException):
+            self.throttler.acquire("first.test", "lambda")
+
+        self.throttler.acquire("second.test", "lambda")
+        self.assertEqual(set(self.throttler.stats()), {"first.test/lambda", "second.test/lambda"})
+
+    def test_table_is_capped_and_replaces_only_idle_throttles(self) -> None:
+        throttler = main.TenantThrottler(main.ThrottleLimits(rate_limit=1, burst_limit=1), max_tenants=2)
+        with mock.patch.object(main.time, "monotonic", return_value=100.0) as clock:
+            throttler.acquire("done.test", "lambda")()
+            throttler.acquire("busy.test", "lambda")
+            # done.test has nothing in flight but its bucket is still empty: forgetting it would reset it.
+            throttler.acquire("new.test", "lambda")()
+            self.assertEqual(set(throttler.stats()), {"done.test/lambda", "busy.test/lambda", "*/lambda"})
+
+            clock.return_value = 105.0
+            throttler.acquire("new.test", "lambda")
+            self.assertEqual(set(throttler.stats()), {"busy.test/lambda", "new.test/lambda", "*/lambda"})
+
+            for index in range(1000):
+                try:
+                    throttler.acquire(f"tenant-{index}.test", "lambda")
+                except main.HTTPException:
+                    pass
+            self.assertEqual(len(throttler.stats()), 3)
+            self.assertEqual(throttler.stats()["busy.test/lambda"]["in_flight"], 1)
+
+
+class ProxyStreamingTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.fail_midway = True
+        self.upstream_closed = 0
+        self.throttler = main.TenantThrottler(main.ThrottleLimits(rate_limit=1000, burst_limit=1000, max_in_flight=2))
+        upstream = httpx.AsyncClient(transport=httpx.MockTransport(self._handle), base_url="http://lambda")
+        main.app.state.upstream_clients = {"lambda": upstream}
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://api.local.acme.test")
+        for patcher in (
+            mock.patch.object(main, "_throttler", self.throttler),
+            mock.patch.object(main, "decode_jwt", mock.AsyncMock(return_value={"sub": "user"})),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+        await main.app.state.upstream_clients["lambda"].aclose()
+        del main.app.state.upstream_clients
+
+    async def _body(self) -> AsyncIterator[bytes]:
+        try:
+            yield b"first chunk"
+            if self.fail_midway:
+                raise httpx.ReadError("connection reset")
+            yield b"second chunk"
+        finally:
+            self.upstream_closed += 1
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=self._body())
+
+    async def _get(self) -> httpx.Response:
+        return await self.client.get("/streams", headers={"authorization": "Bearer token"})
+
+    async def test_failed_upstream_stream_frees_its_slot(self) -> None:
+        for _ in range(3):
+            # The ReadError reaches the client, wrapped in an ExceptionGroup by Starlette's task group.
+            with self.assertRaises(Exception):
+                await self._get()
+
+        self.assertEqual(self.throttler.stats()["acme.test/lambda"]["in_flight"], 0)
+        self.assertEqual(self.upstream_closed, 3)
+
+        self.fail_midway = False
+        response = await self._get()
+
+        self.assertEqual((response.status_code, response.content), (200, b"first chunksecond chunk"))
+        self.assertEqual(self.throttler.stats()["acme.test/lambda"]["in_flight"], 0)
+
+
+CONTEXT = main.BackendContext(tenant="acme.test", audience="guidogerb-api", base_url="http://lambda", target="lambda")
+
+
+def _request(path: str = "/streams", query: str = "", method: str = "GET", **headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+        }
+    )
+
+
+def _cache(**overrides: Any) -> main.ResponseCache:
+    settings: Dict[str, Any] = {
+        "enabled": True,
+        "max_bytes": 1024 * 1024,
+        "max_entry_bytes": 64 * 1024,
+        "default_ttl": 0,
+        "vary": ("authorization",),
+    }
+    settings.update(overrides)
+    return main.ResponseCache(**settings)
+
+
+class ResponseCacheKeyTestCase(unittest.TestCase):
+    def test_key_covers_path_query_and_vary_headers(self) -> None:
+        cache = _cache()
+        key = cache.key_for(CONTEXT, _request(query="a=1&b=2", authorization="Bearer one"))
+
+        self.assertEqual(key, cache.key_for(CONTEXT, _request(query="b=2&a=1", authorization="Bearer one")))
+        self.assertNotEqual(key, cache.key_for(CONTEXT, _request(query="a=1&b=3", authorization="Bearer one")))
+        self.assertNotEqual(key, cache.key_for(CONTEXT, _request("/other", "a=1&b=2", authorization="Bearer one")))
+        self.assertNotEqual(key, cache.key_for(CONTEXT, _request(query="a=1&b=2", authorization="Bearer two")))
+        other_tenant = main.BackendContext("other.test", CONTEXT.audience, CONTEXT.base_url, CONTEXT.target)
+        self.assertNotEqual(key, cache.key_for(other_tenant, _request(query="a=1&b=2", authorization="Bearer one")))
+
+    def test_authorization_is_shared_only_when_not_varied(self) -> None:
+        shared = _cache(vary=())
+
+        self.assertEqual(
+            shared.key_for(CONTEXT, _request(authorization="Bearer one")),
+            shared.key_for(CONTEXT, _request(authorization="Bearer two")),
+        )
+
+    def test_only_enabled_get_requests_are_cached(self) -> None:
+        self.assertIsNone(_cache().key_for(CONTEXT, _request(method="POST")))
+        self.assertIsNone(_cache(enabled=False).key_for(CONTEXT, _request()))
+
+
+class ResponseCacheTtlTestCase(unittest.TestCase):
+    def ttl(self, status_code: int = 200, cache: Optional[main.ResponseCache] = None, **headers: str) -> Optional[float]:
+        headers = {name.replace("_", "-"): value for name, value in headers.items()}
+        return (cache or _cache()).ttl_for(httpx.Response(status_code, headers=headers, content=b"{}"))
+
+    def test_max_age_less_upstream_age(self) -> None:
+        self.assertEqual(self.ttl(cache_control="public, max-age=60"), 60)
+        self.assertEqual(self.ttl(cache_control="max-age=60, s-maxage=30"), 30)
+        self.assertEqual(self.ttl(cache_control='max-age="60"', age="45"), 15)
+        self.assertIsNone(self.ttl(cache_control="max-age=60", age="60"))
+
+    def test_default_ttl_applies_without_max_age(self) -> None:
+        self.assertIsNone(self.ttl())
+        self.assertEqual(self.ttl(cache=_cache(default_ttl=5)), 5)
+
+    def test_uncacheable_responses(self) -> None:
+        for status_code, headers in (
+            (404, {"cache_control": "max-age=60"}),
+            (200, {"cache_control": "private, max-age=60"}),
+            (200, {"cache_control": "no-store"}),
+            (200, {"cache_control": "max-age=soon"}),
+            (200, {"cache_control": "max-age=60", "set_cookie": "session=1"}),
+            (200, {"cache_control": "max-age=60", "vary": "*"}),
+            (200, {"cache_control": "max-age=60", "age": "later"}),
+            (200, {"cache_control": "max-age=60", "content_length": "abc"}),
+            (200, {"cache_control": "max-age=60", "content_length": str(64 * 1024 + 1)}),
+        ):
+            with self.subTest(status_code=status_code, headers=headers):
+                self.assertIsNone(self.ttl(status_code, **headers))
+
+
+async def _stream(body: bytes) -> AsyncIterator[bytes]:
+    # Bytes content is read eagerly by httpx; a real transport hands back an unread stream.
+    yield body
+
+
+class ResponseCacheFetchTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.requests = 0
+        self.in_flight = self.max_in_flight = 0
+        self.release = asyncio.Event()
+        self.status_code = 200
+        self.headers = {"cache-control": "max-age=60", "age": "7"}
+        self.error: Optional[Exception] = None
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle), base_url="http://lambda")
+        self.cache = _cache()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        body = json.dumps({"request": self.requests}, separators=(",", ":")).encode()
+        try:
+            await self.release.wait()
+            await asyncio.sleep(0)
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.in_flight -= 1
+        headers = {**self.headers, "content-length": str(len(body))}
+        return httpx.Response(self.status_code, headers=headers, content=_stream(body))
+
+    async def _send(self) -> httpx.Response:
+        return await self.client.send(self.client.build_request("GET", "/streams"), stream=True)
+
+    async def _fetch_all(self, count: int) -> List[Any]:
+        fetches = [asyncio.create_task(self.cache.fetch(b"key", self._send)) for _ in range(count)]
+        await asyncio.sleep(0.01)
+        self.release.set()
+        results = await asyncio.gather(*fetches, return_exceptions=True)
+        for result in results:
+            if not isinstance(result, BaseException) and result[2] is not None:
+                await result[2].aclose()
+        return results
+
+    async def test_concurrent_misses_share_one_upstream_call(self) -> None:
+        results = await self._fetch_all(5)
+
+        self.assertEqual(self.requests, 1)
+        self.assertEqual(sorted(outcome for outcome, _, _ in results), ["Coalesced"] * 4 + ["Miss"])
+        self.assertEqual({entry.body for _, entry, _ in results}, {b'{"request":1}'})
+
+        outcome, entry, _ = await self.cache.fetch(b"key", self._send)
+
+        self.assertEqual((outcome, self.requests), ("Hit", 1))
+        self.assertEqual(self.cache.stats()["coalesced"], 4)
+        self.assertEqual(entry.to_response(outcome).headers["age"], "7")
+
+    async def test_uncacheable_response_is_shared_but_not_stored(self) -> None:
+        self.status_code = 503
+        self.headers = {"cache-control": "no-cache"}
+
+        results = await self._fetch_all(5)
+
+        self.assertEqual(self.requests, 1)
+        self.assertEqual(sorted(outcome for outcome, _, _ in results), ["Coalesced"] * 4 + ["Miss"])
+        self.assertEqual({entry.status_code for _, entry, _ in results}, {503})
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    async def test_upstream_error_fails_every_waiter(self) -> None:
+        self.error = httpx.ConnectError("connection refused")
+
+        results = await self._fetch_all(5)
+
+        self.assertEqual(self.requests, 1)
+        self.assertTrue(all(isinstance(result, httpx.ConnectError) for result in results))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    async def test_unshareable_response_is_fetched_one_caller_at_a_time(self) -> None:
+        self.headers = {"cache-control": "no-store"}
+
+        results = await self._fetch_all(3)
+
+        self.assertEqual((self.requests, self.max_in_flight), (3, 1))
+        self.assertEqual([outcome for outcome, _, _ in results], ["Miss"] * 3)
+        self.assertTrue(all(entry is None for _, entry, _ in results))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1 @@
+"""Benchmarks for the writeHtml pipeline. Run each module with ``python -m``."""
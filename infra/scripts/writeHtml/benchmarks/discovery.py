@@ -0,0 +1,101 @@
+"""Compare the parallel scandir discovery engine against the legacy os.walk walker.
+
+Usage:
+    python -m infra.scripts.writeHtml.benchmarks.discovery [--files 500000] [--workers 16] [--root DIR]
+
+A synthetic library (artist/album/track folders plus hidden and system folders
+that must be skipped) is created under a temporary directory unless ``--root``
+points at an existing tree. Both walkers must return the same ordered paths.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from ..discovery import DEFAULT_WORKERS, iter_mp3s, natural_key
+
+
+def legacy_find_mp3s(root: Path) -> List[Path]:
+    """The original serial os.walk walker, kept verbatim as the baseline."""
+    mp3s: List[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d.lower() not in {'system volume information', '$recycle.bin'}]
+        for fn in filenames:
+            if fn.lower().endswith('.mp3'):
+                mp3s.append(Path(dirpath) / fn)
+
+    def path_key(p: Path):
+        rel = p.relative_to(root)
+        return [natural_key(part) for part in rel.parts]
+
+    mp3s.sort(key=path_key)
+    return mp3s
+
+
+def build_synthetic_library(root: Path, files: int, tracks_per_album: int = 12, albums_per_artist: int = 8) -> int:
+    """Create empty .mp3 files laid out as Artist N/Album M/NN Track.mp3; return the count."""
+    created = 0
+    artist = 0
+    while created < files:
+        artist += 1
+        for album in range(1, albums_per_artist + 1):
+            album_dir = root / f'Artist {artist}' / f'Album {album}'
+            album_dir.mkdir(parents=True, exist_ok=True)
+            for track in range(1, tracks_per_album + 1):
+                if created >= files:
+                    break
+                (album_dir / f'{track} Track {track}.mp3').touch()
+                created += 1
+            (album_dir / 'cover.jpg').touch()
+            if created >= files:
+                break
+    hidden = root / '.hidden'
+    hidden.mkdir(exist_ok=True)
+    (hidden / 'skipped.mp3').touch()
+    system = root / 'System Volume Information'
+    system.mkdir(exist_ok=True)
+    (system / 'skipped.mp3').touch()
+    return created
+
+
+def _time(label: str, fn) -> List[Path]:
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f'{label:<28} {elapsed:8.3f}s  ({len(result)} files)')
+    return result
+
+
+def run(root: Path, workers: int) -> None:
+    legacy = _time('os.walk (legacy)', lambda: legacy_find_mp3s(root))
+    serial = _time('scandir, 1 worker', lambda: list(iter_mp3s(root, workers=1)))
+    parallel = _time(f'scandir, {workers} workers', lambda: list(iter_mp3s(root, workers=workers)))
+    if not (legacy == serial == parallel):
+        raise SystemExit('Walkers disagree on the discovered paths or their order.')
+    print('Outputs identical.')
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=500_000, help='Number of synthetic tracks to create.')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Thread pool size for the parallel walker.')
+    parser.add_argument('--root', default=None, help='Benchmark an existing library instead of a synthetic tree.')
+    args = parser.parse_args(argv)
+
+    if args.root:
+        run(Path(args.root).expanduser().resolve(), args.workers)
+        return
+
+    with tempfile.TemporaryDirectory(prefix='writehtml-bench-') as tmp:
+        root = Path(tmp)
+        started = time.perf_counter()
+        created = build_synthetic_library(root, args.files)
+        print(f'Created {created} synthetic tracks in {time.perf_counter() - started:.1f}s under {root}')
+        run(root, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Time cold, warm, and one-album-added runs of writeHtml with the scan manifest.
+
+Usage:
+    python -m infra.scripts.writeHtml.benchmarks.manifest [--files 200000] [--workers 16]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from ..discovery import DEFAULT_WORKERS
+from ..main import main as write_html
+from .discovery import build_synthetic_library
+
+
+def _run(label: str, argv: List[str]) -> None:
+    started = time.perf_counter()
+    code, message = write_html(argv)
+    if code != 0:
+        raise SystemExit(message)
+    print(f'{label:<24} {time.perf_counter() - started:8.3f}s')
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=200_000, help='Number of synthetic tracks to create.')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Thread pool size for directory listing.')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='writehtml-bench-') as tmp:
+        library = Path(tmp) / 'library'
+        library.mkdir()
+        build_synthetic_library(library, args.files)
+        cli = [str(library), '--output', str(Path(tmp) / 'music_index.html'), '--workers', str(args.workers)]
+
+        _run('cold (no manifest)', cli)
+        _run('warm (unchanged)', cli)
+        album = library / 'Artist 1' / 'Bonus Album'
+        album.mkdir()
+        for track in range(1, 13):
+            (album / f'{track} Bonus.mp3').touch()
+        _run('warm (one album added)', cli)
+        _run('--no-manifest', cli + ['--no-manifest'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Time serial, pooled, and cached metadata reads over a synthetic tagged library.
+
+Usage:
+    python -m infra.scripts.writeHtml.benchmarks.metadata [--files 20000] [--processes 8]
+
+Each file carries an ID3v2.3 tag with a 64 KiB cover image (which the reader
+seeks past) and a Xing header, so reads stay bounded however big the art is.
+"""
+
+import argparse
+import struct
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from ..metadata import DEFAULT_PROCESSES, TagCache, read_many
+
+COVER_BYTES = 64 * 1024
+
+
+def _frame(frame_id: bytes, body: bytes) -> bytes:
+    return frame_id + struct.pack('>I', len(body)) + b'\0\0' + body
+
+
+def synthetic_mp3(n: int) -> bytes:
+    frames = (_frame(b'TIT2', f'\x00Track {n}'.encode('latin-1'))
+              + _frame(b'APIC', bytes(COVER_BYTES))
+              + _frame(b'TPE1', f'\x00Artist {n % 97}'.encode('latin-1')))
+    size = len(frames)
+    header = b'ID3\x03\x00\x00' + bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    audio = b'\xff\xfb\x90\x00' + bytes(32) + b'Xing' + struct.pack('>II', 1, 7000 + n % 5000)
+    return header + frames + audio.ljust(417, b'\0')
+
+
+def _timed(label: str, fn) -> None:
+    started = time.perf_counter()
+    fn()
+    print(f'{label:<28} {time.perf_counter() - started:8.3f}s')
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=20_000, help='Number of synthetic tracks to create.')
+    parser.add_argument('--processes', type=int, default=DEFAULT_PROCESSES, help='Process pool size.')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='writehtml-bench-') as tmp:
+        root = Path(tmp)
+        paths = []
+        for n in range(args.files):
+            p = root / f'{n % 100}' / f'{n}.mp3'
+            p.parent.mkdir(exist_ok=True)
+            p.write_bytes(synthetic_mp3(n))
+            paths.append(p)
+        names = [str(p) for p in paths]
+        cache_path = root / 'tags.json'
+
+        _timed('serial read', lambda: read_many(names, processes=1))
+        _timed(f'pooled read ({args.processes} procs)', lambda: read_many(names, processes=args.processes))
+
+        def cold():
+            cache = TagCache(cache_path, root)
+            cache.resolve(paths, processes=args.processes)
+            cache.save()
+
+        _timed('cold run (fills cache)', cold)
+        _timed('warm run (cache hits)', lambda: TagCache.load(cache_path, root).resolve(paths, processes=args.processes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Show that tree building and rendering scale flat with folder depth.
+
+Usage:
+    python -m infra.scripts.writeHtml.benchmarks.render [--tracks 50000] [--depths 1 5 10 20 40]
+
+The legacy columns reproduce the old dict-of-dicts renderer reduced to its
+asymptotic core: a full subtree recount, a ``relative_to`` per track, and a
+string join at every level.
+No files are touched; paths are synthesised in memory.
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from ..discovery import natural_key
+from ..main import html_escape, render_html
+from ..tree import build_directory_tree
+
+
+def synthetic_paths(root: Path, tracks: int, depth: int, branches: int = 100) -> List[Path]:
+    """Spread tracks over ``branches`` folder chains that are ``depth`` levels deep."""
+    per_leaf = max(1, tracks // branches)
+    paths: List[Path] = []
+    for branch in range(branches):
+        folder = root.joinpath(f'Branch {branch}', *(f'Level {level}' for level in range(1, depth)))
+        paths.extend(folder / f'{n} Track.mp3' for n in range(per_leaf))
+    return paths
+
+
+def legacy_build(root: Path, mp3s: List[Path]) -> dict:
+    tree = {'name': root.name, 'path': root, 'subdirs': {}, 'files': []}
+    for p in mp3s:
+        cursor = tree
+        for part in p.relative_to(root).parts[:-1]:
+            cursor = cursor['subdirs'].setdefault(part, {'name': part, 'path': cursor['path'] / part, 'subdirs': {}, 'files': []})
+        cursor['files'].append(p)
+
+    def sort_node(node):
+        node['files'].sort(key=lambda p: natural_key(p.name))
+        for _, sub in sorted(node['subdirs'].items(), key=lambda kv: natural_key(kv[0])):
+            sort_node(sub)
+        node['subdirs'] = {name: node['subdirs'][name] for name in sorted(node['subdirs'].keys(), key=natural_key)}
+
+    sort_node(tree)
+    return tree
+
+
+def legacy_render(tree: dict, link_base: Path) -> str:
+    def rel_href(p: Path) -> str:
+        try:
+            return p.relative_to(link_base).as_posix()
+        except ValueError:
+            return p.as_posix()
+
+    def count(node) -> int:
+        return len(node['files']) + sum(count(sub) for sub in node['subdirs'].values())
+
+    def render(node, depth: int) -> str:
+        indent = '    ' * depth
+        html = [f"{indent}<details class=\"folder\"><summary>{html_escape(node['name'])} • {count(node)} tracks</summary>"]
+        html.extend(render(sub, depth + 1) for sub in node['subdirs'].values())
+        for f in node['files']:
+            html.append(f"{indent}  <li class=\"track\"><a href=\"{html_escape(rel_href(f))}\">{html_escape(f.name)}</a></li>")
+        html.append(f'{indent}</details>')
+        return '\n'.join(html)
+
+    return render(tree, 2)
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tracks', type=int, default=50_000, help='Tracks per synthetic tree.')
+    parser.add_argument('--depths', type=int, nargs='+', default=[1, 5, 10, 20, 40], help='Folder depths to compare.')
+    args = parser.parse_args(argv)
+
+    root = Path('/library')
+    output = root / 'music_index.html'
+    print(f"{'depth':>5} {'legacy build':>13} {'legacy render':>14} {'build':>8} {'render':>8} {'µs/track':>9}")
+    for depth in args.depths:
+        paths = synthetic_paths(root, args.tracks, depth)
+        legacy_tree = {}
+
+        def run_legacy_build():
+            legacy_tree['tree'] = legacy_build(root, paths)
+
+        legacy_build_s = _timed(run_legacy_build)
+        legacy_render_s = _timed(lambda: legacy_render(legacy_tree['tree'], root))
+
+        tree = {}
+
+        def run_build():
+            tree['tree'] = build_directory_tree(root, paths)
+
+        build_s = _timed(run_build)
+        render_s = _timed(lambda: render_html(tree['tree'], root, output, 'Benchmark'))
+        per_track = (build_s + render_s) / len(paths) * 1e6
+        print(f'{depth:>5} {legacy_build_s:>12.3f}s {legacy_render_s:>13.3f}s {build_s:>7.3f}s {render_s:>7.3f}s {per_track:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
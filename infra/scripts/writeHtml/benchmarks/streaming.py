@@ -0,0 +1,53 @@
+"""Compare peak memory of building the page as one string vs streaming it to disk.
+
+Usage:
+    python -m infra.scripts.writeHtml.benchmarks.streaming [--tracks 20000 100000 300000]
+
+The tree itself is built before measuring, so the numbers cover rendering and
+writing only. Paths are synthesised in memory; output goes to a temp directory.
+"""
+
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+from ..main import render_html, write_html
+from ..tree import build_directory_tree
+from .render import synthetic_paths
+
+
+def _peak_mib(fn: Callable[[], None]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1 << 20)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tracks', type=int, nargs='+', default=[20_000, 100_000, 300_000], help='Library sizes to compare.')
+    args = parser.parse_args(argv)
+
+    root = Path('/library')
+    print(f"{'tracks':>8} {'output MiB':>11} {'string peak':>12} {'stream peak':>12}")
+    with tempfile.TemporaryDirectory(prefix='writehtml-bench-') as tmp:
+        output = Path(tmp) / 'music_index.html'
+        for tracks in args.tracks:
+            tree = build_directory_tree(root, synthetic_paths(root, tracks, depth=3))
+
+            def write_string():
+                output.write_text(render_html(tree, root, output, 'Benchmark'), encoding='utf-8')
+
+            string_peak = _peak_mib(write_string)
+            stream_peak = _peak_mib(lambda: write_html(tree, root, output, 'Benchmark'))
+            size = output.stat().st_size / (1 << 20)
+            print(f'{tracks:>8} {size:>10.1f}M {string_peak:>11.1f}M {stream_peak:>11.1f}M')
+
+
+if __name__ == '__main__':
+    main()
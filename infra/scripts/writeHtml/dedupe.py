@@ -0,0 +1,135 @@
+"""Duplicate track detection that reads as little of the library as possible.
+
+Files are bucketed by size first; a file with a unique size cannot have a
+duplicate and is never opened. Within a bucket only the first and last
+``PARTIAL_BYTES`` are hashed, and only files whose partial hashes still
+collide are hashed in full. Every stage runs on a thread pool (hashing and
+file reads release the GIL).
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from .discovery import DEFAULT_WORKERS
+
+# Bytes hashed from each end of a file in the partial pass. The tail covers
+# ID3v1 trailers; the head covers the ID3v2 tag and the first audio frames.
+PARTIAL_BYTES = 16 * 1024
+
+READ_BLOCK_BYTES = 1 << 20
+
+K = TypeVar('K')
+
+
+class DuplicateGroup(NamedTuple):
+    size: int
+    paths: List[Path]  # in input order; the first one is kept when collapsing
+
+    @property
+    def wasted(self) -> int:
+        return self.size * (len(self.paths) - 1)
+
+
+def duplicates_path_for(output_path: Path) -> Path:
+    """Return the duplicate report location stored next to the generated HTML."""
+    return output_path.with_name(f'{output_path.stem}.duplicates.json')
+
+
+def _size(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+def partial_hash(path: Path, size: int) -> Optional[bytes]:
+    """Hash the first and last PARTIAL_BYTES of a file (the whole file when it is small)."""
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, 'rb') as fh:
+            digest.update(fh.read(PARTIAL_BYTES))
+            if size > 2 * PARTIAL_BYTES:
+                fh.seek(-PARTIAL_BYTES, os.SEEK_END)
+                digest.update(fh.read(PARTIAL_BYTES))
+            elif size > PARTIAL_BYTES:
+                digest.update(fh.read())
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def full_hash(path: Path) -> Optional[bytes]:
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, 'rb') as fh:
+            for block in iter(lambda: fh.read(READ_BLOCK_BYTES), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def _refine(pool: ThreadPoolExecutor, groups: Iterable[Sequence[Path]], key: Callable[[Path], Optional[K]]) -> List[List[Path]]:
+    """Split each group by key (computed in parallel), keeping only sub-groups with 2+ members."""
+    groups = [list(group) for group in groups]
+    keys = iter(pool.map(key, [p for group in groups for p in group]))
+    refined: List[List[Path]] = []
+    for group in groups:
+        buckets: Dict[K, List[Path]] = defaultdict(list)
+        for p in group:
+            k = next(keys)
+            if k is not None:
+                buckets[k].append(p)
+        refined.extend(bucket for bucket in buckets.values() if len(bucket) > 1)
+    return refined
+
+
+def find_duplicates(paths: Sequence[Path], workers: int = DEFAULT_WORKERS) -> List[DuplicateGroup]:
+    """Return groups of byte-identical files, largest waste first."""
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='writehtml-dedupe') as pool:
+        sizes = dict(zip(paths, pool.map(_size, paths)))
+        buckets: Dict[int, List[Path]] = defaultdict(list)
+        for p in paths:
+            if sizes[p] is not None:
+                buckets[sizes[p]].append(p)
+        by_size = [bucket for bucket in buckets.values() if len(bucket) > 1]
+        candidates = _refine(pool, by_size, lambda p: partial_hash(p, sizes[p]))
+        # Files no larger than both partial windows were already hashed in full.
+        small = [group for group in candidates if sizes[group[0]] <= 2 * PARTIAL_BYTES]
+        large = [group for group in candidates if sizes[group[0]] > 2 * PARTIAL_BYTES]
+        confirmed = small + _refine(pool, large, full_hash)
+
+    order = {p: i for i, p in enumerate(paths)}
+    groups = [DuplicateGroup(sizes[group[0]], sorted(group, key=order.__getitem__)) for group in confirmed]
+    groups.sort(key=lambda g: (-g.wasted, order[g.paths[0]]))
+    return groups
+
+
+def collapse(paths: List[Path], groups: Iterable[DuplicateGroup]) -> List[Path]:
+    """Return paths without the extra copies, keeping the first path of every group."""
+    extras = {p for group in groups for p in group.paths[1:]}
+    return [p for p in paths if p not in extras]
+
+
+def write_report(path: Path, root: Path, groups: List[DuplicateGroup]) -> Tuple[int, int]:
+    """Write the duplicate groups as JSON; return (extra copies, wasted bytes)."""
+    copies = sum(len(group.paths) - 1 for group in groups)
+    wasted = sum(group.wasted for group in groups)
+    data = {
+        'root': os.fspath(root),
+        'extra_copies': copies,
+        'wasted_bytes': wasted,
+        'groups': [
+            {'size': group.size, 'paths': [p.relative_to(root).as_posix() for p in group.paths]}
+            for group in groups
+        ],
+    }
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, path)
+    return copies, wasted
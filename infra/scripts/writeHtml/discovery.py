@@ -0,0 +1,116 @@
+"""Parallel MP3 discovery built on ``os.scandir``.
+
+Directory listings are fanned out over a bounded thread pool while results are
+yielded in the same natural path order the serial ``os.walk`` walker produced.
+"""
+
+import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Directory listing is I/O bound (especially on network mounts), so oversubscribe the CPUs.
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+SKIPPED_DIR_NAMES = {'system volume information', '$recycle.bin'}
+
+Listing = Tuple[List[str], List[str]]
+
+
+def natural_key(s: str):
+    """Return a key for natural sorting (e.g., track2 < track10)."""
+    return [int(text) if text.isdigit() else text.lower() for text in re.split(r"(\d+)", s)]
+
+
+def is_skipped_dir(name: str) -> bool:
+    """Return True for hidden/system directories that are never descended into."""
+    return name.startswith('.') or name.lower() in SKIPPED_DIR_NAMES
+
+
+def is_mp3(name: str) -> bool:
+    return name.lower().endswith('.mp3')
+
+
+def list_directory(path: str) -> Listing:
+    """Return ``(mp3 file names, subdirectory names)`` found directly inside path.
+
+    Only the ``DirEntry`` type information is consulted, so no per-file ``stat``
+    is issued. Symlinked directories are skipped and unreadable directories are
+    treated as empty, matching ``os.walk`` defaults.
+    """
+    files: List[str] = []
+    dirs: List[str] = []
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return files, dirs
+    with it:
+        for entry in it:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not entry.is_symlink() and not is_skipped_dir(name):
+                    dirs.append(name)
+            elif is_mp3(name):
+                files.append(name)
+    return files, dirs
+
+
+def iter_mp3s(
+    root: Path,
+    workers: int = DEFAULT_WORKERS,
+    lister: Callable[[str], Listing] = list_directory,
+) -> Iterator[Path]:
+    """Yield every .mp3 under root, naturally sorted by relative path, as a stream.
+
+    Subdirectories are submitted to the pool as soon as their parent is listed, so
+    listings run ahead of the consumer. A listing the consumer needs that has not
+    started yet is run inline instead of waiting behind queued prefetches.
+    """
+    if workers <= 1:
+        yield from _ordered_walk(os.fspath(root), lister, None)
+        return
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='writehtml-scandir')
+    try:
+        yield from _ordered_walk(os.fspath(root), lister, pool)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _ordered_walk(root: str, lister: Callable[[str], Listing], pool: Optional[ThreadPoolExecutor]) -> Iterator[Path]:
+    def submit(path: str) -> Optional[Future]:
+        return pool.submit(lister, path) if pool is not None else None
+
+    def listing(path: str, future: Optional[Future]) -> Listing:
+        if future is None or future.cancel():
+            return lister(path)
+        return future.result()
+
+    def expand(path: str, future: Optional[Future]):
+        files, dirs = listing(path, future)
+        # Files and folders are interleaved by name, exactly like sorting full relative paths.
+        children = [(natural_key(name), name, False) for name in files]
+        children.extend((natural_key(name), name, True) for name in dirs)
+        children.sort(key=itemgetter(0))
+        pending = []
+        for _, name, is_dir in children:
+            child = os.path.join(path, name)
+            pending.append((child, is_dir, submit(child) if is_dir else None))
+        return iter(pending)
+
+    stack = [expand(root, submit(root))]
+    while stack:
+        for child, is_dir, future in stack[-1]:
+            if not is_dir:
+                yield Path(child)
+                continue
+            stack.append(expand(child, future))
+            break
+        else:
+            stack.pop()
@@ -1,75 +1,25 @@
 import argparse
+import hashlib
+import json
 import os
-import re
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Container, Dict, Iterator, List, Mapping, Optional, Tuple
 
+from .dedupe import collapse, duplicates_path_for, find_duplicates, write_report
+from .discovery import DEFAULT_WORKERS, Listing, iter_mp3s, list_directory, natural_key
+from .manifest import Manifest, manifest_path_for
+from .metadata import DEFAULT_PROCESSES, TagCache, TrackInfo, format_duration, tag_cache_path_for
+from .outputs import OutputWriter, outputs_path_for
+from .search import build_search_index, search_index_path_for
+from .tree import FolderNode, build_directory_tree
 
-def natural_key(s: str):
-    """Return a key for natural sorting (e.g., track2 < track10)."""
-    return [int(text) if text.isdigit() else text.lower() for text in re.split(r"(\d+)", s)]
+# Quiet period --watch waits for before regenerating, so bulk copies coalesce.
+DEFAULT_DEBOUNCE = 2.0
 
 
-def find_mp3s(root: Path) -> List[Path]:
+def find_mp3s(root: Path, workers: int = DEFAULT_WORKERS, lister: Callable[[str], Listing] = list_directory) -> List[Path]:
     """Return a list of all .mp3 files under root (case-insensitive), sorted naturally by path."""
-    mp3s: List[Path] = []
-    for dirpath, dirnames, filenames in os.walk(root):
-        # Optionally ignore hidden/system directories
-        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d.lower() not in {'system volume information', '$recycle.bin'}]
-        for fn in filenames:
-            if fn.lower().endswith('.mp3'):
-                mp3s.append(Path(dirpath) / fn)
-    # Natural sort by relative path components
-    def path_key(p: Path):
-        rel = p.relative_to(root)
-        parts = list(rel.parts)
-        return [natural_key(part) for part in parts]
-
-    mp3s.sort(key=path_key)
-    return mp3s
-
-
-def build_directory_tree(root: Path, mp3s: List[Path]):
-    """Build a nested dict tree from a list of mp3 Paths.
-
-    Tree node format:
-    {
-        'name': 'FolderName',
-        'path': Path,
-        'subdirs': { name: node, ... },
-        'files': [Path, ...]  # files directly in this folder
-    }
-    """
-    tree = {
-        'name': root.name,
-        'path': root,
-        'subdirs': {},
-        'files': []
-    }
-    for p in mp3s:
-        rel = p.relative_to(root)
-        parts = list(rel.parts)
-        cursor = tree
-        for part in parts[:-1]:
-            if part not in cursor['subdirs']:
-                cursor['subdirs'][part] = {
-                    'name': part,
-                    'path': cursor['path'] / part,
-                    'subdirs': {},
-                    'files': []
-                }
-            cursor = cursor['subdirs'][part]
-        cursor['files'].append(p)
-    # Sort subdirs and files naturally
-    def sort_node(node):
-        node['files'].sort(key=lambda p: natural_key(p.name))
-        for name, sub in sorted(node['subdirs'].items(), key=lambda kv: natural_key(kv[0])):
-            sort_node(sub)
-        # Reassign ordered subdirs as dict in sorted order to preserve iteration order in Python 3.7+
-        node['subdirs'] = {name: node['subdirs'][name] for name in sorted(node['subdirs'].keys(), key=natural_key)}
-
-    sort_node(tree)
-    return tree
+    return list(iter_mp3s(root, workers=workers, lister=lister))
 
 
 def html_escape(text: str) -> str:
@@ -82,63 +32,129 @@ def html_escape(text: str) -> str:
     )
 
 
-def render_html(tree, root: Path, output_path: Path, title: str) -> str:
-    """Render the full HTML document as a string."""
+def rel_href(p: Path, link_base: Path) -> str:
+    """Return the URL of p relative to the directory the page is written to."""
+    try:
+        rel = p.relative_to(link_base)
+    except ValueError:
+        # Fall back to absolute path if not relative
+        rel = p
+    # Use POSIX-style separators for URLs
+    return rel.as_posix()
+
+
+def open_folder(node: FolderNode, depth: int, root: Path, title: str, fragment: Optional[str] = None) -> str:
+    """Return the markup that opens a folder, up to and including its body ``<div>``."""
+    indent = '    ' * depth
+    total_tracks = node.track_count
+    is_root = node.path == root
+    summary_label = f"{html_escape(node.name)} • {total_tracks} track{'s' if total_tracks != 1 else ''}" if not is_root else f"{html_escape(title)} • {total_tracks} track{'s' if total_tracks != 1 else ''}"
+    # Root is expanded by default; others collapsed
+    open_attr = ' open' if is_root else ''
+    fragment_attr = f" data-fragment=\"{html_escape(fragment)}\"" if fragment else ''
+    return "\n".join([f"{indent}<details class=\"folder\"{open_attr}{fragment_attr}>",
+                      f"{indent}  <summary>",
+                      f"{indent}    <span class=\"folder-icon\">📁</span>",
+                      f"{indent}    <span class=\"folder-name\">{summary_label}</span>",
+                      f"{indent}  </summary>",
+                      f"{indent}  <div class=\"folder-body\">"])
+
+
+def folder_tracks(node: FolderNode, depth: int, link_base: Path, tags: Optional[Mapping[Path, TrackInfo]] = None) -> List[str]:
+    """Return the track list lines for the files directly inside node.
+
+    When ``tags`` has metadata for a file, its title replaces the file name and
+    artist/album/duration are shown alongside.
+    """
+    if not node.files:
+        return []
+    indent = '    ' * depth
+    # Resolve the folder's href once; per track only the file name is appended.
+    folder_href = rel_href(node.path, link_base)
+    folder_href = '' if folder_href == '.' else folder_href + '/'
+    out = [f"{indent}    <ul class=\"track-list\">"]
+    for track_id, f in enumerate(node.files, node.first_track):
+        rel = folder_href + f.name
+        display = f.name
+        info = tags.get(f) if tags else None
+        meta = ''
+        if info is not None:
+            details = [info.artist, info.album, format_duration(info.duration) if info.duration else None]
+            meta = ' · '.join(d for d in details if d)
+            meta = f"<span class=\"track-meta\">{html_escape(meta)}</span>" if meta else ''
+        out.append(
+            f"{indent}      <li class=\"track\" id=\"t{track_id}\">"
+            f"<a href=\"{html_escape(rel)}\" class=\"track-link\" target=\"_blank\" title=\"Play {html_escape(display)}\">"
+            f"<span class=\"track-icon\">🎵</span>"
+            f"<span class=\"track-name\">{html_escape(info.title if info and info.title else display)}</span>"
+            f"{meta}"
+            f"</a>"
+            f"</li>"
+        )
+    out.append(f"{indent}    </ul>")
+    return out
+
+
+def iter_folders(tree: FolderNode, depth: int, root: Path, title: str, link_base: Path,
+                 fragments: Optional[Mapping[Path, str]] = None, body_only: bool = False,
+                 tags: Optional[Mapping[Path, TrackInfo]] = None) -> Iterator[str]:
+    """Yield the markup of tree and its descendants, one folder at a time.
+
+    Folders listed in ``fragments`` are emitted collapsed with an empty body and
+    a ``data-fragment`` URL instead of their contents. With ``body_only`` the
+    wrapper of ``tree`` itself is left out, which is what a fragment file holds.
+    """
+    # Explicit stack instead of nested generators, so deep trees cost O(1) per chunk.
+    stack = [(tree, depth, False)]
+    first = True
+    while stack:
+        node, level, closing = stack.pop()
+        wrapped = not (body_only and node is tree)
+        fragment = fragments.get(node.path) if fragments and wrapped else None
+        if closing:
+            lines = [] if fragment else folder_tracks(node, level, link_base, tags)
+            if wrapped:
+                indent = '    ' * level
+                lines.extend([f"{indent}  </div>", f"{indent}</details>"])
+            if not lines:
+                continue
+            chunk = "\n".join(lines)
+        else:
+            stack.append((node, level, True))
+            if not fragment:
+                stack.extend((sub, level + 1, False) for sub in reversed(list(node.subdirs.values())))
+            if not wrapped:
+                continue
+            chunk = open_folder(node, level, root, title, fragment)
+        yield chunk if first else "\n" + chunk
+        first = False
+
+
+def page_footer() -> str:
+    """Return the closing markup of the page, including the generated-at stamp."""
+    return """
+    <footer>Generated by writeHtml • {date}</footer>
+  </div>
+</body>
+</html>
+""".replace('{date}', html_escape(__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M')))
+
+
+def iter_html(tree: FolderNode, root: Path, output_path: Path, title: str,
+              fragments: Optional[Mapping[Path, str]] = None,
+              tags: Optional[Mapping[Path, TrackInfo]] = None,
+              index_url: Optional[str] = None, footer: bool = True) -> Iterator[str]:
+    """Yield the HTML document in chunks, one folder at a time, while walking the tree once.
+
+    ``fragments`` maps folder paths to fragment URLs for the sharded shell page;
+    ``tags`` holds optional per-track metadata. ``index_url`` defaults to the
+    search index file name. With ``footer=False`` the :func:`page_footer` is
+    left for the caller to append.
+    """
     # Because the HTML file will be placed at output_path, make links relative to output directory
     link_base = output_path.parent
 
-    def rel_href(p: Path) -> str:
-        try:
-            rel = p.relative_to(link_base)
-        except ValueError:
-            # Fall back to absolute path if not relative
-            rel = p
-        # Use POSIX-style separators for URLs
-        return rel.as_posix()
-
-    def folder_track_count(node) -> int:
-        count = len(node['files'])
-        for sub in node['subdirs'].values():
-            count += folder_track_count(sub)
-        return count
-
-    def render_node(node, depth: int = 0) -> str:
-        indent = '    ' * depth
-        name = node['name']
-        total_tracks = folder_track_count(node)
-        is_root = node['path'] == root
-        summary_label = f"{html_escape(name)} • {total_tracks} track{'s' if total_tracks != 1 else ''}" if not is_root else f"{html_escape(title)} • {total_tracks} track{'s' if total_tracks != 1 else ''}"
-        # Root is expanded by default; others collapsed
-        open_attr = ' open' if is_root else ''
-        html = [f"{indent}<details class=\"folder\"{open_attr}>",
-                f"{indent}  <summary>",
-                f"{indent}    <span class=\"folder-icon\">📁</span>",
-                f"{indent}    <span class=\"folder-name\">{summary_label}</span>",
-                f"{indent}  </summary>",
-                f"{indent}  <div class=\"folder-body\">"]
-        # Subfolders first
-        for subname, subnode in node['subdirs'].items():
-            html.append(render_node(subnode, depth + 1))
-        # Files
-        if node['files']:
-            html.append(f"{indent}    <ul class=\"track-list\">")
-            for f in node['files']:
-                rel = rel_href(f)
-                display = f.name
-                html.append(
-                    f"{indent}      <li class=\"track\">"
-                    f"<a href=\"{html_escape(rel)}\" class=\"track-link\" target=\"_blank\" title=\"Play {html_escape(display)}\">"
-                    f"<span class=\"track-icon\">🎵</span>"
-                    f"<span class=\"track-name\">{html_escape(display)}</span>"
-                    f"</a>"
-                    f"</li>"
-                )
-            html.append(f"{indent}    </ul>")
-        html.append(f"{indent}  </div>")
-        html.append(f"{indent}</details>")
-        return "\n".join(html)
-
-    total = folder_track_count(tree)
+    total = tree.track_count
 
     head = f"""<!DOCTYPE html>
 <html lang=\"en\">\n<head>\n  <meta charset=\"utf-8\">\n  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n  <title>{html_escape(title)} — Music Library</title>\n  <style>
@@ -171,9 +187,11 @@ def render_html(tree, root: Path, output_path: Path, title: str) -> str:
     .track-link:hover {{ transform: translateY(-1px); border-color: var(--accent); background: #11162a; }}
     .track-icon {{ color: var(--accent-2); }}
     .track-name {{ overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }}
+    .track-meta {{ margin-left: auto; color: var(--muted); font-size: 13px; white-space: nowrap; }}
 
     footer {{ color: var(--muted); font-size: 13px; text-align: center; padding: 24px 0 12px; }}
     .hidden {{ display: none !important; }}
+    .searching details.folder:not(.match), .searching li.track:not(.match) {{ display: none; }}
   </style>\n</head>"""
 
     body_open = f"""
@@ -188,43 +206,230 @@ def render_html(tree, root: Path, output_path: Path, title: str) -> str:
     </div>
 """
 
-    tree_html = render_node(tree, 2)
-
-    scripts = """
+    scripts = ""
+    if fragments:
+        scripts += """
     <script>
-      // Simple client-side filter: hides folders and tracks not matching
+      // Sharded output: top-level folders fetch their contents the first time they are expanded
+      const fragmentLoads = new Map();
+      const loadFragment = d => {
+        if (!fragmentLoads.has(d)) {
+          fragmentLoads.set(d, fetch(d.dataset.fragment)
+            .then(r => r.ok ? r.text() : Promise.reject(new Error(r.statusText)))
+            .then(html => { d.querySelector(':scope > .folder-body').innerHTML = html; })
+            .catch(err => { fragmentLoads.delete(d); throw err; }));
+        }
+        return fragmentLoads.get(d);
+      };
+      document.querySelectorAll('details[data-fragment]').forEach(d => d.addEventListener('toggle', () => {
+        if (d.open) loadFragment(d).catch(() => {});
+      }));
+    </script>
+"""
+    scripts += """
+    <script>
+      // Search queries the prebuilt index next to the page and only touches matching nodes.
+      // Without the index (e.g. opened from file://) it falls back to filtering the DOM.
       const input = document.getElementById('search');
-      const normalize = s => (s || '').toLowerCase();
-      input?.addEventListener('input', () => {
-        const q = normalize(input.value);
+      const container = document.querySelector('.container');
+      const rootFolder = document.querySelector('details.folder');
+      const normalize = s => (s || '').normalize('NFKD').replace(/[\\u0300-\\u036f]/g, '').toLowerCase();
+      const tokenize = s => normalize(s).split(/[^\\p{L}\\p{N}]+/u).filter(Boolean);
+      let index = null, indexLoad = null;
+      const postingCache = new Map();
+
+      const decode = b64 => {
+        // base64 of LEB128 deltas -> sorted Uint32Array of ids
+        const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+        const ids = new Uint32Array(bytes.length);
+        let n = 0, prev = 0, value = 0, scale = 1;
+        for (const byte of bytes) {
+          value += (byte & 0x7f) * scale;
+          if (byte & 0x80) { scale *= 128; continue; }
+          prev += value; ids[n++] = prev; value = 0; scale = 1;
+        }
+        return ids.subarray(0, n);
+      };
+      const postings = (table, key) => {
+        const cacheKey = table + key;
+        if (!postingCache.has(cacheKey)) {
+          const encoded = index[table][key];
+          postingCache.set(cacheKey, encoded ? decode(encoded) : new Uint32Array(0));
+        }
+        return postingCache.get(cacheKey);
+      };
+      const intersect = (a, b) => {
+        const out = [];
+        for (let i = 0, j = 0; i < a.length && j < b.length;) {
+          if (a[i] === b[j]) { out.push(a[i]); i++; j++; } else if (a[i] < b[j]) i++; else j++;
+        }
+        return Uint32Array.from(out);
+      };
+      const lookup = (table, token) => {
+        const keys = token.length < 3 ? ['^' + token] : Array.from({ length: token.length - 2 }, (_, i) => token.slice(i, i + 3));
+        return keys.map(key => postings(table, key)).reduce(intersect);
+      };
+      const search = q => {
+        // A track matches when every query token hits its name or one of its folders.
+        const tokens = tokenize(q);
+        const hits = new Uint16Array(index.n);
+        tokens.forEach((token, t) => {
+          const mark = id => { if (hits[id] === t) hits[id] = t + 1; };
+          lookup('t', token).forEach(mark);
+          lookup('f', token).forEach(f => {
+            const start = index.folders[2 * f], end = start + index.folders[2 * f + 1];
+            for (let id = start; id < end; id++) mark(id);
+          });
+        });
+        const matches = [];
+        hits.forEach((h, id) => { if (h === tokens.length) matches.push(id); });
+        return matches;
+      };
+
+      let marked = [];
+      const opened = new Set();
+      const clearMatches = () => { marked.forEach(el => el.classList.remove('match')); marked = []; };
+      const showMatches = ids => {
+        clearMatches();
+        const pending = new Set();
+        for (const id of ids) {
+          let el = document.getElementById('t' + id);
+          if (!el) {
+            // Sharded output: the track lives in a fragment that is not loaded yet.
+            const top = index.top.find(f => id >= index.folders[2 * f] && id < index.folders[2 * f] + index.folders[2 * f + 1]);
+            if (top !== undefined) pending.add(index.top.indexOf(top));
+            continue;
+          }
+          for (; el && !el.classList.contains('match'); el = el.parentElement.closest('details.folder')) {
+            el.classList.add('match');
+            marked.push(el);
+            if (el.tagName === 'DETAILS' && !el.open) { el.open = true; opened.add(el); }
+          }
+        }
+        if (pending.size && typeof loadFragment === 'function') {
+          const shards = document.querySelectorAll('details[data-fragment]');
+          const q = input.value;
+          Promise.all([...pending].map(k => loadFragment(shards[k])))
+            .then(() => { if (input.value === q) showMatches(ids); }, () => {});
+        }
+      };
+      const domFilter = q => {
         const folders = document.querySelectorAll('details.folder');
         folders.forEach(d => {
           const summaryText = normalize(d.querySelector('summary')?.innerText || '');
-          const tracks = Array.from(d.querySelectorAll('.track'));
           let anyTrackVisible = false;
-          tracks.forEach(li => {
-            const name = normalize(li.innerText);
-            const show = !q || name.includes(q);
+          d.querySelectorAll('.track').forEach(li => {
+            const show = !q || normalize(li.innerText).includes(q);
             li.classList.toggle('hidden', !show);
             if (show) anyTrackVisible = true;
           });
           const showFolder = !q || summaryText.includes(q) || anyTrackVisible;
           d.classList.toggle('hidden', !showFolder);
-          // Expand folder if any matching found
           if (q && showFolder) d.setAttribute('open', ''); else if (!q && d !== folders[0]) d.removeAttribute('open');
         });
-      });
+      };
+      const run = async () => {
+        const q = input.value;
+        indexLoad = indexLoad || fetch('{index}')
+          .then(r => r.ok ? r.json() : Promise.reject(new Error(r.statusText)))
+          .then(data => { index = data; }, () => { index = false; });
+        await indexLoad;
+        if (q !== input.value) return;
+        if (index === false) { domFilter(normalize(q.trim())); return; }
+        const searching = tokenize(q).length > 0;
+        container.classList.toggle('searching', searching);
+        if (searching) { showMatches(search(q)); return; }
+        clearMatches();
+        opened.forEach(d => { if (d !== rootFolder) d.open = false; });
+        opened.clear();
+      };
+      let debounce = 0;
+      input?.addEventListener('input', () => { clearTimeout(debounce); debounce = setTimeout(run, 150); });
     </script>
-"""
+""".replace('{index}', html_escape(index_url or search_index_path_for(output_path).name))
+
+    yield head
+    yield "\n"
+    yield body_open
+    yield "\n"
+    yield from iter_folders(tree, 2, root, title, link_base, fragments, tags=tags)
+    yield "\n"
+    yield scripts
+    yield "\n"
+    if footer:
+        yield page_footer()
+
+
+def render_html(tree: FolderNode, root: Path, output_path: Path, title: str,
+                tags: Optional[Mapping[Path, TrackInfo]] = None) -> str:
+    """Render the full HTML document as a string."""
+    return "".join(iter_html(tree, root, output_path, title, tags=tags))
 
-    body_close = """
-    <footer>Generated by writeHtml • {date}</footer>
-  </div>
-</body>
-</html>
-""".replace('{date}', html_escape(__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M')))
 
-    return "\n".join([head, body_open, tree_html, scripts, body_close])
+def fragments_dir_for(output_path: Path) -> Path:
+    """Return the directory holding the per-folder fragments of a sharded page."""
+    return output_path.with_name(f'{output_path.stem}.parts')
+
+
+def fragment_name(node: FolderNode) -> str:
+    """Return a file name for a top-level folder's fragment that is stable across runs."""
+    return hashlib.sha1(node.name.encode('utf-8', 'surrogatepass')).hexdigest()[:12] + '.html'
+
+
+def versioned(url: str, sha256: Optional[str]) -> str:
+    """Append a content-hash query so caches can keep each version forever."""
+    return f'{url}?v={sha256[:12]}' if sha256 else url
+
+
+def write_fragments(writer: OutputWriter, tree: FolderNode, root: Path, output_path: Path, title: str,
+                    tags: Optional[Mapping[Path, TrackInfo]] = None,
+                    only: Optional[Container[Path]] = None) -> Dict[Path, str]:
+    """Write one HTML fragment per top-level folder and return their versioned URLs keyed by folder path.
+
+    With ``only``, just the fragments of those top-level folder paths are
+    (re)written. Fragments of folders that no longer exist are removed.
+    """
+    link_base = output_path.parent
+    parts = fragments_dir_for(output_path)
+    parts.mkdir(exist_ok=True)
+    fragments: Dict[Path, str] = {}
+    names = set()
+    for node in tree.subdirs.values():
+        name = fragment_name(node)
+        sha256 = writer.sha256(parts / name)
+        if only is None or node.path in only or sha256 is None or not (parts / name).exists():
+            sha256 = writer.write(parts / name, iter_folders(node, 3, root, title, link_base, body_only=True, tags=tags))
+        fragments[node.path] = versioned(f'{parts.name}/{name}', sha256)
+        names.add(name)
+    for stale in parts.glob('*.html'):
+        if stale.name not in names:
+            writer.remove(stale)
+    return fragments
+
+
+def write_html(tree: FolderNode, root: Path, output_path: Path, title: str, shard: bool = False,
+               tags: Optional[Mapping[Path, TrackInfo]] = None,
+               only_fragments: Optional[Container[Path]] = None, compress: bool = True) -> OutputWriter:
+    """Write the page to output_path, optionally as a light shell plus per-folder fragments.
+
+    Fragments and the search index are written before the page so a reader
+    never sees a page that points at files which do not exist yet, and they
+    are referenced by content hash. Outputs whose content did not change are
+    left untouched; the others get ``.gz``/``.br`` siblings unless ``compress``
+    is false. ``only_fragments`` limits which fragments are rewritten (see
+    :func:`write_fragments`). Returns the writer, whose counters tell what was
+    written.
+    """
+    writer = OutputWriter.load(outputs_path_for(output_path), compress)
+    fragments = write_fragments(writer, tree, root, output_path, title, tags, only_fragments) if shard else None
+    index_path = search_index_path_for(output_path)
+    index = build_search_index(tree, tags)
+    index_sha = writer.write(index_path, [json.dumps(index, separators=(',', ':'), ensure_ascii=False)])
+    writer.write(output_path, iter_html(tree, root, output_path, title, fragments, tags,
+                                        index_url=versioned(index_path.name, index_sha), footer=False),
+                 volatile=[page_footer()])
+    writer.save()
+    return writer
 
 
 def main(argv: List[str] = None) -> Tuple[int, str]:
@@ -234,6 +439,17 @@ def main(argv: List[str] = None) -> Tuple[int, str]:
     parser.add_argument('directory', help='Root directory to scan for MP3 files.')
     parser.add_argument('--title', help='Page title shown in the HTML.', default=None)
     parser.add_argument('--output', '-o', help='Output HTML file path. Defaults to music_index.html inside the given directory.', default=None)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'Threads used to list directories in parallel (default: {DEFAULT_WORKERS}).')
+    parser.add_argument('--shard', action='store_true', help='Write one fragment per top-level folder and a light shell page that loads them on expand (serve over HTTP).')
+    parser.add_argument('--metadata', action='store_true', help='Read ID3 title/artist/album and duration for each track (cached next to the output).')
+    parser.add_argument('--processes', type=int, default=DEFAULT_PROCESSES, help=f'Processes used to read track metadata (default: {DEFAULT_PROCESSES}).')
+    parser.add_argument('--watch', action='store_true', help='Keep running and regenerate the output when the library changes.')
+    parser.add_argument('--poll', type=float, default=None, metavar='SECONDS', help='With --watch, poll directory mtimes at this interval instead of using inotify (e.g. for network mounts).')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, metavar='SECONDS', help=f'With --watch, wait for this long a quiet period before regenerating (default: {DEFAULT_DEBOUNCE}).')
+    parser.add_argument('--dedupe', action='store_true', help='Report byte-identical duplicate tracks in a JSON file next to the output.')
+    parser.add_argument('--collapse-duplicates', action='store_true', help='Like --dedupe, and list only the first copy of each duplicate in the page.')
+    parser.add_argument('--no-compress', action='store_true', help='Do not write precompressed .gz/.br siblings of the outputs.')
+    parser.add_argument('--no-manifest', action='store_true', help='Ignore and do not write the incremental scan manifest stored next to the output.')
     args = parser.parse_args(argv)
 
     root = Path(args.directory).expanduser().resolve()
@@ -244,14 +460,53 @@ def main(argv: List[str] = None) -> Tuple[int, str]:
 
     output_path = Path(args.output).expanduser().resolve() if args.output else (root / 'music_index.html')
 
-    mp3s = find_mp3s(root)
+    manifest = None if args.no_manifest else Manifest.load(manifest_path_for(output_path), root)
+    lister = manifest.lister if manifest is not None else list_directory
+    mp3s = find_mp3s(root, workers=args.workers, lister=lister)
+
+    tag_cache = None
+    tags = None
+    if args.metadata:
+        tag_cache = TagCache.load(tag_cache_path_for(output_path), root) if manifest is not None else TagCache(tag_cache_path_for(output_path), root)
+        tags = tag_cache.resolve(mp3s, workers=args.workers, processes=args.processes)
+
+    # The report is asked for per run, so it is written even when the page is up to date.
+    if args.dedupe or args.collapse_duplicates:
+        groups = find_duplicates(mp3s, workers=args.workers)
+        report = duplicates_path_for(output_path)
+        copies, wasted = write_report(report, root, groups)
+        print(f"Found {copies} duplicate cop{'y' if copies == 1 else 'ies'} in {len(groups)} group(s), "
+              f"{wasted / (1 << 20):.1f} MiB reclaimable; see {report}")
+        if args.collapse_duplicates:
+            mp3s = collapse(mp3s, groups)
+
+    # Nothing on disk changed since the last run: keep the existing output untouched.
+    settings = {'title': title, 'output': str(output_path), 'shard': args.shard, 'metadata': args.metadata,
+                'compress': not args.no_compress, 'collapse_duplicates': args.collapse_duplicates}
+    tags_clean = tag_cache is None or not tag_cache.changed
+    clean = manifest is not None and manifest.is_clean(settings) and tags_clean and output_path.exists()
+    if clean and not args.watch:
+        return 0, str(output_path)
+
     tree = build_directory_tree(root, mp3s)
 
-    html = render_html(tree, root, output_path, title)
-    try:
-        output_path.write_text(html, encoding='utf-8')
-    except OSError as e:
-        return 2, f"Failed to write HTML: {e}"
+    if not clean:
+        try:
+            write_html(tree, root, output_path, title, shard=args.shard, tags=tags, compress=not args.no_compress)
+            if manifest is not None:
+                manifest.save(settings)
+                if tag_cache is not None:
+                    tag_cache.save()
+        except OSError as e:
+            return 2, f"Failed to write HTML: {e}"
+
+    if args.watch:
+        from .watch import LibraryWatch
+
+        watch = LibraryWatch(tree, root, output_path, title, shard=args.shard, tags=tags, tag_cache=tag_cache,
+                             persist_tags=manifest is not None, workers=args.workers, processes=args.processes,
+                             compress=not args.no_compress)
+        return watch.run(poll_interval=args.poll, debounce=args.debounce)
 
     return 0, str(output_path)
 
@@ -0,0 +1,106 @@
+"""On-disk manifest of directory listings so warm runs only rescan changed folders.
+
+Each directory is stored under its root-relative POSIX path together with the
+``(st_mtime_ns, st_ino)`` pair observed *before* it was listed. Adding,
+removing or renaming an entry bumps the directory mtime, so an unchanged pair
+means the cached listing can be reused with a single ``stat`` instead of a full
+``scandir``.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from .discovery import Listing, list_directory
+
+MANIFEST_VERSION = 1
+
+# Listings taken within this window of the directory mtime may miss a same-tick
+# modification (coarse NAS/FAT timestamps), so they are never trusted on reload.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def manifest_path_for(output_path: Path) -> Path:
+    """Return the manifest location stored next to the generated HTML."""
+    return output_path.with_name(f'{output_path.stem}.manifest.json')
+
+
+class Manifest:
+    """Directory listings keyed by relative path and validated against mtime/inode."""
+
+    def __init__(self, path: Path, root: Path, entries: Optional[Dict[str, list]] = None, settings: Optional[dict] = None):
+        self.path = path
+        self.root = root
+        self.settings = settings or {}
+        self._previous: Dict[str, list] = entries or {}
+        self._current: Dict[str, list] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path, root: Path) -> 'Manifest':
+        """Load a manifest, starting empty when it is missing, corrupt, or for another root."""
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return cls(path, root)
+        if not isinstance(data, dict) or data.get('version') != MANIFEST_VERSION or data.get('root') != os.fspath(root):
+            return cls(path, root)
+        return cls(path, root, data.get('dirs') or {}, data.get('settings') or {})
+
+    def _key(self, path: str) -> str:
+        rel = os.path.relpath(path, self.root)
+        return '' if rel == '.' else Path(rel).as_posix()
+
+    def lister(self, path: str) -> Listing:
+        """Drop-in replacement for ``list_directory`` that consults the manifest first."""
+        key = self._key(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return [], []
+        cached = self._previous.get(key)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_ino:
+            with self._lock:
+                self.hits += 1
+                self._current[key] = cached
+            return cached[2], cached[3]
+
+        files, dirs = list_directory(path)
+        mtime = st.st_mtime_ns if time.time_ns() - st.st_mtime_ns > RACY_WINDOW_NS else -1
+        with self._lock:
+            self.misses += 1
+            self._current[key] = [mtime, st.st_ino, files, dirs]
+            if cached is None or cached[2] != files or cached[3] != dirs:
+                self._dirty.add(key)
+        return files, dirs
+
+    @property
+    def dirty(self) -> Set[str]:
+        """Relative paths of directories whose listing changed since the last run."""
+        return set(self._dirty)
+
+    def is_clean(self, settings: dict) -> bool:
+        """True when no directory changed, none disappeared, and render settings match."""
+        return not self._dirty and self._current.keys() == self._previous.keys() and settings == self.settings
+
+    def save(self, settings: dict) -> None:
+        """Persist the listings observed in this run (dropping vanished directories)."""
+        data = {
+            'version': MANIFEST_VERSION,
+            'root': os.fspath(self.root),
+            'settings': settings,
+            'dirs': self._current,
+        }
+        tmp = self.path.with_name(f'.{self.path.name}.tmp')
+        tmp.write_text(json.dumps(data, separators=(',', ':'), ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.path)
+        self._previous = dict(self._current)
+        self._dirty.clear()
+        self.settings = settings
+
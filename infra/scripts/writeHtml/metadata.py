@@ -0,0 +1,275 @@
+"""Track metadata (title, artist, album, duration) read with small bounded reads.
+
+Only the ID3v2 frames we need are read (large frames such as cover art are
+seeked past), followed by the first MPEG frame header and its Xing/Info/VBRI
+block for the duration. An ID3v1 trailer is used when there is no ID3v2 tag.
+Reads are spread over a process pool, and results are cached next to the
+output keyed on ``(path, size, mtime)`` so warm runs only open new or changed
+files.
+"""
+
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .discovery import DEFAULT_WORKERS
+
+TAG_CACHE_VERSION = 1
+
+DEFAULT_PROCESSES = os.cpu_count() or 1
+
+# Below this many files a process pool costs more to start than it saves.
+MIN_PARALLEL_FILES = 64
+
+# Longest text frame body that is read; longer values are truncated.
+MAX_TEXT_FRAME_BYTES = 1024
+
+# How far past the ID3v2 tag to look for the first MPEG frame sync.
+FRAME_SEARCH_BYTES = 16 * 1024
+
+TEXT_FRAMES = {
+    b'TIT2': 'title', b'TPE1': 'artist', b'TALB': 'album', b'TLEN': 'length',
+    b'TT2': 'title', b'TP1': 'artist', b'TAL': 'album', b'TLE': 'length',
+}
+
+TEXT_ENCODINGS = {0: 'latin-1', 1: 'utf-16', 2: 'utf-16-be', 3: 'utf-8'}
+
+# Bitrates in kbit/s indexed by [MPEG-1?][layer][bitrate index]; layer 1 = Layer III.
+BITRATES = {
+    True: {
+        3: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+        2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+        1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    },
+    False: {
+        3: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+        2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+        1: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    },
+}
+
+# Sample rates indexed by the MPEG version bits (0 = 2.5, 2 = 2, 3 = 1).
+SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+
+class TrackInfo(NamedTuple):
+    title: Optional[str] = None
+    artist: Optional[str] = None
+    album: Optional[str] = None
+    duration: Optional[float] = None
+
+
+def tag_cache_path_for(output_path: Path) -> Path:
+    """Return the tag cache location stored next to the generated HTML."""
+    return output_path.with_name(f'{output_path.stem}.tags.json')
+
+
+def format_duration(seconds: float) -> str:
+    """Return ``m:ss`` (or ``h:mm:ss``) for a duration in seconds."""
+    total = int(round(seconds))
+    hours, rest = divmod(total, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f'{hours}:{minutes:02d}:{secs:02d}' if hours else f'{minutes}:{secs:02d}'
+
+
+def _syncsafe(data: bytes) -> int:
+    return (data[0] & 0x7F) << 21 | (data[1] & 0x7F) << 14 | (data[2] & 0x7F) << 7 | (data[3] & 0x7F)
+
+
+def _decode_text(body: bytes) -> Optional[str]:
+    if not body:
+        return None
+    encoding = TEXT_ENCODINGS.get(body[0], 'latin-1')
+    text = body[1:].decode(encoding, errors='replace')
+    # Multiple values are NUL separated; keep the first.
+    text = text.split('\x00', 1)[0].strip()
+    return text or None
+
+
+def _read_id3v2(fh: BinaryIO) -> Tuple[Dict[str, str], int]:
+    """Return the wanted text frames and the offset where audio starts."""
+    header = fh.read(10)
+    if len(header) < 10 or header[:3] != b'ID3':
+        return {}, 0
+    major, flags = header[3], header[5]
+    end = 10 + _syncsafe(header[6:10]) + (10 if flags & 0x10 else 0)
+    pos = 10
+    if flags & 0x40 and major >= 3:
+        ext = fh.read(4)
+        if len(ext) < 4:
+            return {}, 0  # truncated tag
+        pos += _syncsafe(ext) if major == 4 else 4 + struct.unpack('>I', ext)[0]
+    id_len, header_len = (3, 6) if major == 2 else (4, 10)
+
+    frames: Dict[str, str] = {}
+    while pos + header_len <= end and len(frames) < 4:
+        fh.seek(pos)
+        frame = fh.read(header_len)
+        frame_id = frame[:id_len]
+        if len(frame) < header_len or not frame_id.isalnum():
+            break  # padding or a truncated file
+        raw = frame[id_len:id_len + (3 if major == 2 else 4)]
+        if major == 2:
+            size = int.from_bytes(raw, 'big')
+        elif major == 4:
+            size = _syncsafe(raw)
+        else:
+            size = struct.unpack('>I', raw)[0]
+        name = TEXT_FRAMES.get(frame_id)
+        if name is not None and name not in frames:
+            value = _decode_text(fh.read(min(size, MAX_TEXT_FRAME_BYTES)))
+            if value:
+                frames[name] = value
+        pos += header_len + size
+    return frames, end
+
+
+def _read_id3v1(fh: BinaryIO) -> Dict[str, str]:
+    try:
+        fh.seek(-128, os.SEEK_END)
+    except OSError:
+        return {}
+    trailer = fh.read(128)
+    if trailer[:3] != b'TAG':
+        return {}
+    fields = {'title': trailer[3:33], 'artist': trailer[33:63], 'album': trailer[63:93]}
+    frames = {}
+    for name, raw in fields.items():
+        value = raw.split(b'\x00', 1)[0].decode('latin-1').strip()
+        if value:
+            frames[name] = value
+    return frames
+
+
+def _mpeg_duration(fh: BinaryIO, audio_start: int, file_size: int) -> Optional[float]:
+    """Estimate duration from the first frame header (and its VBR block when present)."""
+    fh.seek(audio_start)
+    window = fh.read(FRAME_SEARCH_BYTES)
+    for offset in range(len(window) - 3):
+        b0, b1, b2, b3 = window[offset:offset + 4]
+        if b0 != 0xFF or b1 & 0xE0 != 0xE0:
+            continue
+        version, layer = (b1 >> 3) & 3, (b1 >> 1) & 3
+        bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 3
+        if version == 1 or layer == 0 or bitrate_index in (0, 15) or rate_index == 3:
+            continue
+        mpeg1 = version == 3
+        sample_rate = SAMPLE_RATES[version][rate_index]
+        samples = 384 if layer == 3 else (1152 if mpeg1 or layer == 2 else 576)
+        mono = b3 >> 6 == 3
+
+        frame = window[offset:]
+        side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        xing = frame[4 + side_info:]
+        if xing[:4] in (b'Xing', b'Info') and len(xing) >= 12 and xing[7] & 1:
+            return struct.unpack('>I', xing[8:12])[0] * samples / sample_rate
+        vbri = frame[36:]
+        if vbri[:4] == b'VBRI' and len(vbri) >= 18:
+            return struct.unpack('>I', vbri[14:18])[0] * samples / sample_rate
+
+        bitrate = BITRATES[mpeg1][layer][bitrate_index] * 1000
+        return (file_size - audio_start - offset) * 8 / bitrate
+    return None
+
+
+def read_tags(path: str) -> TrackInfo:
+    """Read title/artist/album/duration from one MP3 without loading the whole file."""
+    try:
+        with open(path, 'rb') as fh:
+            file_size = os.fstat(fh.fileno()).st_size
+            frames, audio_start = _read_id3v2(fh)
+            if not frames.keys() & {'title', 'artist', 'album'}:
+                frames.update(_read_id3v1(fh))
+            duration = None
+            length = frames.get('length', '')
+            if length.isdigit() and int(length) > 0:
+                duration = int(length) / 1000
+            else:
+                duration = _mpeg_duration(fh, audio_start, file_size)
+    except (OSError, struct.error, IndexError, ValueError, UnicodeDecodeError):
+        # Unreadable or malformed files are listed without metadata rather than failing the run.
+        return TrackInfo()
+    return TrackInfo(frames.get('title'), frames.get('artist'), frames.get('album'), duration)
+
+
+class TagCache:
+    """Track metadata keyed by root-relative path and validated against size/mtime."""
+
+    def __init__(self, path: Path, root: Path, entries: Optional[Dict[str, list]] = None):
+        self.path = path
+        self.root = root
+        self._previous: Dict[str, list] = entries or {}
+        self._current: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path, root: Path) -> 'TagCache':
+        """Load a cache, starting empty when it is missing, corrupt, or for another root."""
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return cls(path, root)
+        if not isinstance(data, dict) or data.get('version') != TAG_CACHE_VERSION or data.get('root') != os.fspath(root):
+            return cls(path, root)
+        return cls(path, root, data.get('tracks') or {})
+
+    @property
+    def changed(self) -> bool:
+        """True when any file was read afresh or a cached file disappeared."""
+        return bool(self.misses) or self._current.keys() != self._previous.keys()
+
+    def resolve(self, mp3s: List[Path], workers: int = DEFAULT_WORKERS, processes: int = DEFAULT_PROCESSES) -> Dict[Path, TrackInfo]:
+        """Return metadata for every path, reading only files missing from or stale in the cache."""
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='writehtml-stat') as pool:
+            stats = list(pool.map(_stat, mp3s))
+
+        tags: Dict[Path, TrackInfo] = {}
+        stale: List[Tuple[Path, str, int, int]] = []
+        for p, st in zip(mp3s, stats):
+            if st is None:
+                continue
+            key = p.relative_to(self.root).as_posix()
+            size, mtime = st
+            cached = self._previous.get(key)
+            if cached is not None and cached[0] == size and cached[1] == mtime:
+                self.hits += 1
+                self._current[key] = cached
+                tags[p] = TrackInfo(*cached[2:])
+            else:
+                stale.append((p, key, size, mtime))
+
+        self.misses = len(stale)
+        for (p, key, size, mtime), info in zip(stale, read_many([os.fspath(p) for p, *_ in stale], processes)):
+            self._current[key] = [size, mtime, *info]
+            tags[p] = info
+        return tags
+
+    def save(self) -> None:
+        """Persist the entries seen in this run (dropping vanished files)."""
+        data = {'version': TAG_CACHE_VERSION, 'root': os.fspath(self.root), 'tracks': self._current}
+        tmp = self.path.with_name(f'.{self.path.name}.tmp')
+        tmp.write_text(json.dumps(data, separators=(',', ':'), ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.path)
+        self._previous = dict(self._current)
+        self.misses = 0
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def read_many(paths: List[str], processes: int = DEFAULT_PROCESSES) -> Iterable[TrackInfo]:
+    """Read tags for paths in order, across a process pool when there are enough of them."""
+    if processes <= 1 or len(paths) < MIN_PARALLEL_FILES:
+        return [read_tags(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        chunksize = max(1, min(256, len(paths) // (processes * 4)))
+        return list(pool.map(read_tags, paths, chunksize=chunksize))
@@ -0,0 +1,160 @@
+"""Content-hashed, precompressed output files.
+
+Every file writeHtml emits goes through :class:`OutputWriter`. The writer
+streams the rendered text to a temp file while hashing it. When the hash
+matches the previous run, the temp file is dropped and the existing file (and
+its mtime, hence the ETag nginx and S3 derive from it) stays untouched.
+Otherwise the file is renamed into place together with ``.gz`` and (when the
+optional ``brotli`` package is installed) ``.br`` siblings for ``gzip_static`` /
+``brotli_static``.
+
+Hashes are kept in ``<stem>.outputs.json`` next to the page. ``sha256`` is the
+hash of the bytes on disk, usable as a strong ETag or cache-busting version.
+``digest`` skips volatile trailers such as the generated-at footer, so those
+alone never force a rewrite.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz siblings are written without it
+    brotli = None
+
+OUTPUTS_VERSION = 1
+
+# Size of the write buffer used when streaming outputs to disk.
+WRITE_BUFFER_BYTES = 1 << 20
+
+GZIP_LEVEL = 9
+# Quality 11 is several times slower than 9 on multi-megabyte pages for a few percent.
+BROTLI_QUALITY = 9
+
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def outputs_path_for(output_path: Path) -> Path:
+    """Return the output hash record stored next to the generated HTML."""
+    return output_path.with_name(f'{output_path.stem}.outputs.json')
+
+
+class OutputWriter:
+    """Write outputs atomically, skip unchanged ones, and keep precompressed siblings."""
+
+    def __init__(self, path: Path, base: Path, records: Optional[Dict[str, dict]] = None, compress: bool = True):
+        self.path = path
+        self.base = base
+        self.records: Dict[str, dict] = records or {}
+        self.compress = compress
+        self.written = 0
+        self.skipped = 0
+
+    @classmethod
+    def load(cls, path: Path, compress: bool = True) -> 'OutputWriter':
+        """Load the previous hashes, starting empty when the record is missing or corrupt."""
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return cls(path, path.parent, compress=compress)
+        if not isinstance(data, dict) or data.get('version') != OUTPUTS_VERSION:
+            return cls(path, path.parent, compress=compress)
+        return cls(path, path.parent, data.get('files') or {}, compress)
+
+    def _key(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.base)).as_posix()
+
+    def _siblings(self, path: Path):
+        if not self.compress:
+            return []
+        siblings = [path.with_name(path.name + '.gz')]
+        if brotli is not None:
+            siblings.append(path.with_name(path.name + '.br'))
+        return siblings
+
+    def sha256(self, path: Path) -> Optional[str]:
+        """Return the recorded hash of the bytes currently at path, if known."""
+        record = self.records.get(self._key(path))
+        return record['sha256'] if record else None
+
+    def write(self, path: Path, chunks: Iterable[str], volatile: Iterable[str] = ()) -> str:
+        """Stream chunks (then volatile trailer chunks) to path unless the content is unchanged.
+
+        Returns the SHA-256 of the bytes at path afterwards.
+        """
+        key = self._key(path)
+        digest = hashlib.sha256()
+        full = hashlib.sha256()
+        tmp = path.with_name(f'.{path.name}.tmp')
+        try:
+            with open(tmp, 'wb', buffering=WRITE_BUFFER_BYTES) as fh:
+                for chunk in chunks:
+                    data = chunk.encode('utf-8')
+                    digest.update(data)
+                    full.update(data)
+                    fh.write(data)
+                for chunk in volatile:
+                    data = chunk.encode('utf-8')
+                    full.update(data)
+                    fh.write(data)
+
+            siblings = self._siblings(path)
+            record = self.records.get(key)
+            if (record is not None and record['digest'] == digest.hexdigest()
+                    and path.exists() and all(s.exists() for s in siblings)):
+                tmp.unlink()
+                self.skipped += 1
+                return record['sha256']
+
+            # Compress from the finished temp file, so unchanged outputs never pay for it.
+            for sibling in siblings:
+                _compress_file(tmp, sibling)
+            for suffix in COMPRESSED_SUFFIXES:
+                stale = path.with_name(path.name + suffix)
+                if stale not in siblings:
+                    stale.unlink(missing_ok=True)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        self.records[key] = {'digest': digest.hexdigest(), 'sha256': full.hexdigest()}
+        self.written += 1
+        return full.hexdigest()
+
+    def remove(self, path: Path) -> None:
+        """Delete an output that is no longer produced, with its compressed siblings."""
+        for target in (path, *(path.with_name(path.name + suffix) for suffix in COMPRESSED_SUFFIXES)):
+            target.unlink(missing_ok=True)
+        self.records.pop(self._key(path), None)
+
+    def save(self) -> None:
+        data = {'version': OUTPUTS_VERSION, 'files': self.records}
+        tmp = self.path.with_name(f'.{self.path.name}.tmp')
+        tmp.write_text(json.dumps(data, separators=(',', ':'), sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+
+def _compress_file(source: Path, target: Path) -> None:
+    """Write a compressed copy of source to target via a temp file."""
+    if target.suffix == '.gz':
+        # wbits=31 emits a gzip container with a zero mtime, so equal input gives equal bytes.
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+    else:
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    tmp = target.with_name(f'.{target.name}.tmp')
+    try:
+        with open(source, 'rb') as src, open(tmp, 'wb', buffering=WRITE_BUFFER_BYTES) as dst:
+            for block in iter(lambda: src.read(WRITE_BUFFER_BYTES), b''):
+                dst.write(process(block))
+            dst.write(finish())
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,111 @@
+"""Prebuilt search index written next to the generated page.
+
+Names are normalised (NFKD, accents stripped, lower-cased) and split into
+tokens. Every token contributes its trigrams plus ``^``-prefixed one- and
+two-character prefixes, so queries of any length resolve to a handful of
+posting lists. Tracks are indexed by file name and folders by folder name; a
+folder hit expands to the contiguous id range of its subtree on the client.
+
+Posting lists are sorted ids stored as LEB128-encoded deltas in base64, which
+the client decodes into ``Uint32Array``s only for the grams a query touches.
+"""
+
+import base64
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+from .metadata import TrackInfo
+from .tree import FolderNode, iter_postorder
+
+SEARCH_INDEX_VERSION = 1
+
+_TOKEN_SPLIT = re.compile(r'[\W_]+')
+
+
+def search_index_path_for(output_path: Path) -> Path:
+    """Return the search index location stored next to the generated HTML."""
+    return output_path.with_name(f'{output_path.stem}.search.json')
+
+
+def normalize(text: str) -> str:
+    """Lower-case text and strip accents; mirrors ``normalize`` in the page script."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_SPLIT.split(normalize(text)) if token]
+
+
+def grams(token: str) -> Set[str]:
+    """Return the index keys for one token: short prefixes and every trigram."""
+    keys = {'^' + token[:1], '^' + token[:2]}
+    keys.update(token[i:i + 3] for i in range(len(token) - 2))
+    return keys
+
+
+def encode_postings(ids: Iterable[int]) -> str:
+    """Encode ascending ids as base64 LEB128 deltas."""
+    out = bytearray()
+    previous = 0
+    for value in ids:
+        delta = value - previous
+        previous = value
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return base64.b64encode(bytes(out)).decode('ascii')
+
+
+def _postings(names: Iterable[tuple]) -> Dict[str, str]:
+    """Build ``{gram: encoded ids}`` from ``(id, name)`` pairs given in ascending id order."""
+    index: Dict[str, List[int]] = defaultdict(list)
+    for item_id, name in names:
+        keys: Set[str] = set()
+        for token in tokenize(name):
+            keys |= grams(token)
+        for key in keys:
+            index[key].append(item_id)
+    return {key: encode_postings(ids) for key, ids in sorted(index.items())}
+
+
+def _track_text(path: Path, tags: Optional[Mapping[Path, TrackInfo]]) -> str:
+    info = tags.get(path) if tags else None
+    if info is None:
+        return path.stem
+    return ' '.join(filter(None, (path.stem, info.title, info.artist, info.album)))
+
+
+def build_search_index(tree: FolderNode, tags: Optional[Mapping[Path, TrackInfo]] = None) -> dict:
+    """Return the JSON-ready search index for a numbered tree.
+
+    Tracks are indexed by file name plus title, artist and album when ``tags``
+    has them.
+
+    ``folders`` is a flat ``[start, count, ...]`` table of subtree track ranges,
+    and ``top`` lists the folder ids of the top-level folders in render order
+    (used to find the fragment holding a track in sharded output).
+    """
+    folder_ids: Dict[int, int] = {}
+    folders: List[int] = []
+    folder_names = []
+    track_names = []
+    for node in iter_postorder(tree):
+        track_names.extend((node.first_track + i, _track_text(f, tags)) for i, f in enumerate(node.files))
+        if node is tree:
+            continue
+        folder_ids[id(node)] = len(folder_names)
+        folder_names.append((len(folder_names), node.name))
+        folders.extend((node.subtree_start, node.track_count))
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'n': tree.track_count,
+        'folders': folders,
+        'top': [folder_ids[id(node)] for node in tree.subdirs.values()],
+        't': _postings(track_names),
+        'f': _postings(folder_names),
+    }
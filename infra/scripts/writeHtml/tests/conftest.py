@@ -0,0 +1,44 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+# Names chosen to exercise natural ordering, case-insensitive extensions, files
+# interleaved with folders, and the hidden/system folders discovery must skip.
+LIBRARY = [
+    'Artist 10/Album 1/01 Intro.mp3',
+    'Artist 10/Album 1/02 Song.MP3',
+    'Artist 2/Album 10/track10.mp3',
+    'Artist 2/Album 10/track2.mp3',
+    'Artist 2/Album 9/Track 1.mp3',
+    'Artist 2/b.mp3',
+    'Artist 2/a/c.mp3',
+    'Ärtist/Café/naïve song.mp3',
+    'loose 3.mp3',
+    'loose 20.mp3',
+    '.hidden/skipped.mp3',
+    'System Volume Information/skipped.mp3',
+    '$RECYCLE.BIN/skipped.mp3',
+]
+
+EXTRAS = ['Artist 2/Album 10/cover.jpg', 'notes.txt', 'Empty/readme.txt']
+
+
+def make_library(root: Path, names: List[str] = LIBRARY) -> Path:
+    for index, name in enumerate([*names, *EXTRAS]):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(name.encode('utf-8') + bytes(index))
+    return root
+
+
+@pytest.fixture
+def library(tmp_path: Path) -> Path:
+    return make_library(tmp_path / 'library')
+
+
+@pytest.fixture
+def output(tmp_path: Path) -> Path:
+    out = tmp_path / 'out'
+    out.mkdir()
+    return out / 'index.html'
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import random
+from collections import defaultdict
+
+from ..dedupe import PARTIAL_BYTES, collapse, duplicates_path_for, find_duplicates, write_report
+from ..discovery import iter_mp3s
+from ..main import main
+
+
+def brute_force_groups(paths):
+    by_hash = defaultdict(list)
+    for p in paths:
+        by_hash[hashlib.sha256(p.read_bytes()).digest()].append(p)
+    return sorted(sorted(group) for group in by_hash.values() if len(group) > 1)
+
+
+def make_dedupe_library(root):
+    rng = random.Random(3)
+    blobs = {
+        'small': b'small track',
+        'medium': rng.randbytes(PARTIAL_BYTES + 100),
+        'large': rng.randbytes(3 * PARTIAL_BYTES),
+    }
+    # Same size and same head and tail as "large", differing only in the middle.
+    middle = bytearray(blobs['large'])
+    middle[len(middle) // 2] ^= 0xFF
+    layout = {
+        'a/small.mp3': blobs['small'],
+        'b/small copy.mp3': blobs['small'],
+        'c/other small.mp3': b'SMALL TRACK',  # same size, different bytes
+        'a/medium.mp3': blobs['medium'],
+        'b/medium.mp3': blobs['medium'],
+        'c/medium.mp3': blobs['medium'],
+        'a/large.mp3': blobs['large'],
+        'b/large.mp3': blobs['large'],
+        'c/large middle.mp3': bytes(middle),
+        'd/unique.mp3': rng.randbytes(500),
+        'd/empty 1.mp3': b'',
+        'd/empty 2.mp3': b'',
+    }
+    for name, data in layout.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return list(iter_mp3s(root))
+
+
+def test_groups_match_a_brute_force_hash(tmp_path):
+    paths = make_dedupe_library(tmp_path)
+    groups = find_duplicates(paths, workers=4)
+    assert sorted(sorted(group.paths) for group in groups) == brute_force_groups(paths)
+
+
+def test_groups_keep_input_order_and_sort_by_waste(tmp_path):
+    paths = make_dedupe_library(tmp_path)
+    groups = find_duplicates(paths, workers=1)
+    order = {p: i for i, p in enumerate(paths)}
+    for group in groups:
+        assert group.paths == sorted(group.paths, key=order.__getitem__)
+        assert group.size == group.paths[0].stat().st_size
+    assert [group.wasted for group in groups] == sorted((group.wasted for group in groups), reverse=True)
+
+
+def test_unique_sizes_are_never_opened(tmp_path, monkeypatch):
+    paths = make_dedupe_library(tmp_path)
+    opened = []
+    real_open = open
+
+    def tracking_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', tracking_open)
+    find_duplicates(paths, workers=1)
+    assert tmp_path / 'd' / 'unique.mp3' not in opened
+
+
+def test_collapse_keeps_the_first_copy(tmp_path):
+    paths = make_dedupe_library(tmp_path)
+    groups = find_duplicates(paths)
+    kept = collapse(paths, groups)
+    assert len(kept) == len(paths) - sum(len(group.paths) - 1 for group in groups)
+    assert all(group.paths[0] in kept for group in groups)
+    assert [p for p in paths if p in kept] == kept
+
+
+def test_report_lists_relative_paths(tmp_path):
+    root = tmp_path / 'lib'
+    root.mkdir()
+    paths = make_dedupe_library(root)
+    groups = find_duplicates(paths)
+    report = tmp_path / 'dupes.json'
+    copies, wasted = write_report(report, root, groups)
+    data = json.loads(report.read_text(encoding='utf-8'))
+    assert (data['extra_copies'], data['wasted_bytes']) == (copies, wasted)
+    assert copies == 5
+    assert {'a/small.mp3', 'b/small copy.mp3'} in [set(group['paths']) for group in data['groups']]
+
+
+def test_report_is_written_for_an_unchanged_library(tmp_path):
+    root = tmp_path / 'lib'
+    root.mkdir()
+    make_dedupe_library(root)
+    output = tmp_path / 'out' / 'index.html'
+    output.parent.mkdir()
+    assert main([str(root), '-o', str(output)]) == (0, str(output))
+    page = output.stat().st_mtime_ns
+
+    assert main([str(root), '-o', str(output), '--dedupe']) == (0, str(output))
+
+    data = json.loads(duplicates_path_for(output).read_text(encoding='utf-8'))
+    assert data['extra_copies'] == 5
+    assert output.stat().st_mtime_ns == page
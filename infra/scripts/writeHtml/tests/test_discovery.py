@@ -0,0 +1,49 @@
+import pytest
+
+from ..benchmarks.discovery import build_synthetic_library, legacy_find_mp3s
+from ..discovery import iter_mp3s, list_directory
+from ..main import find_mp3s
+
+
+@pytest.mark.parametrize('workers', [1, 2, 8])
+def test_order_matches_legacy_walker(library, workers):
+    assert find_mp3s(library, workers=workers) == legacy_find_mp3s(library)
+
+
+@pytest.mark.parametrize('workers', [1, 8])
+def test_order_matches_legacy_walker_on_synthetic_library(tmp_path, workers):
+    build_synthetic_library(tmp_path, 300, tracks_per_album=11, albums_per_artist=3)
+    assert list(iter_mp3s(tmp_path, workers=workers)) == legacy_find_mp3s(tmp_path)
+
+
+def test_hidden_and_system_folders_are_skipped(library):
+    found = [p.relative_to(library).as_posix() for p in find_mp3s(library)]
+    assert not any('skipped' in name for name in found)
+    assert 'Artist 10/Album 1/02 Song.MP3' in found
+
+
+def test_symlinked_folders_are_not_followed(library):
+    (library / 'link').symlink_to(library / 'Artist 10', target_is_directory=True)
+    assert find_mp3s(library) == legacy_find_mp3s(library)
+    assert not any('link' in p.parts for p in find_mp3s(library))
+
+
+def test_list_directory_returns_mp3s_and_folders(library):
+    files, dirs = list_directory(str(library / 'Artist 2'))
+    assert files == ['b.mp3']
+    assert sorted(dirs) == ['Album 10', 'Album 9', 'a']
+
+
+def test_unreadable_folder_is_empty(tmp_path):
+    assert list_directory(str(tmp_path / 'missing')) == ([], [])
+
+
+def test_custom_lister_is_used(library):
+    seen = []
+
+    def lister(path):
+        seen.append(path)
+        return list_directory(path)
+
+    assert find_mp3s(library, workers=4, lister=lister) == legacy_find_mp3s(library)
+    assert str(library) in seen
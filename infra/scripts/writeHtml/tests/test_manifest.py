@@ -0,0 +1,92 @@
+import os
+import time
+from pathlib import Path
+
+from ..discovery import iter_mp3s
+from ..main import main
+from ..manifest import Manifest, manifest_path_for
+
+
+def age_directories(root: Path, seconds: float = 60) -> None:
+    """Move directory mtimes out of the racy window so their listings are trusted."""
+    past = time.time() - seconds
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (past, past))
+
+
+def snapshot(directory: Path):
+    return {p.name: (p.stat().st_mtime_ns, p.read_bytes()) for p in directory.rglob('*') if p.is_file()}
+
+
+def scan(library: Path, output: Path) -> Manifest:
+    manifest = Manifest.load(manifest_path_for(output), library)
+    list(iter_mp3s(library, workers=4, lister=manifest.lister))
+    return manifest
+
+
+def test_warm_run_is_clean_and_writes_nothing(library, output):
+    age_directories(library)
+    assert main([str(library), '-o', str(output)]) == (0, str(output))
+    before = snapshot(output.parent)
+    assert main([str(library), '-o', str(output)]) == (0, str(output))
+    assert snapshot(output.parent) == before
+
+
+def test_warm_scan_reuses_every_listing(library, output):
+    age_directories(library)
+    scan(library, output).save({})
+    manifest = scan(library, output)
+    assert manifest.misses == 0
+    assert manifest.hits > 0
+    assert manifest.is_clean({})
+
+
+def test_added_file_marks_its_folder_dirty(library, output):
+    age_directories(library)
+    scan(library, output).save({})
+    (library / 'Artist 2' / 'Album 9' / 'Track 2.mp3').write_bytes(b'new')
+    manifest = scan(library, output)
+    assert manifest.dirty == {'Artist 2/Album 9'}
+    assert not manifest.is_clean({})
+
+
+def test_removed_folder_is_not_clean(library, output):
+    age_directories(library)
+    scan(library, output).save({})
+    for p in (library / 'Artist 2' / 'a').iterdir():
+        p.unlink()
+    (library / 'Artist 2' / 'a').rmdir()
+    assert not scan(library, output).is_clean({})
+
+
+def test_changed_settings_are_not_clean(library, output):
+    age_directories(library)
+    scan(library, output).save({'shard': False})
+    assert not scan(library, output).is_clean({'shard': True})
+
+
+def test_racy_listing_is_relisted_but_not_dirty(library, output):
+    scan(library, output).save({})  # directories were just created
+    manifest = scan(library, output)
+    assert manifest.hits == 0
+    assert manifest.dirty == set()
+
+
+def test_new_track_regenerates_the_page(library, output):
+    age_directories(library)
+    main([str(library), '-o', str(output)])
+    (library / 'Artist 2' / 'new one.mp3').write_bytes(b'new')
+    main([str(library), '-o', str(output)])
+    assert 'new one.mp3' in output.read_text(encoding='utf-8')
+
+
+def test_corrupt_manifest_starts_empty(library, output):
+    age_directories(library)
+    manifest_path_for(output).write_text('{not json', encoding='utf-8')
+    assert scan(library, output).hits == 0
+
+
+def test_manifest_for_another_root_is_ignored(library, output, tmp_path):
+    scan(library, output).save({'shard': True})
+    assert Manifest.load(manifest_path_for(output), library).settings == {'shard': True}
+    assert Manifest.load(manifest_path_for(output), tmp_path).settings == {}
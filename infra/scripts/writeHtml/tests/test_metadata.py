@@ -0,0 +1,131 @@
+import random
+import struct
+
+import pytest
+
+from ..metadata import TrackInfo, read_many, read_tags
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, stereo: 1152 samples per frame.
+FRAME_HEADER = b'\xff\xfb\x90\x00'
+SIDE_INFO = 32
+
+
+def syncsafe(n: int) -> bytes:
+    return bytes([(n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F])
+
+
+def text_frame(frame_id: bytes, text: str, major: int) -> bytes:
+    body = b'\x03' + text.encode('utf-8')
+    if major == 2:
+        return frame_id + len(body).to_bytes(3, 'big') + body
+    size = syncsafe(len(body)) if major == 4 else struct.pack('>I', len(body))
+    return frame_id + size + b'\x00\x00' + body
+
+
+def id3v2(major: int, frames: bytes, flags: int = 0, padding: int = 16) -> bytes:
+    body = frames + b'\x00' * padding
+    return b'ID3' + bytes([major, 0, flags]) + syncsafe(len(body)) + body
+
+
+def id3v1(title: str, artist: str, album: str) -> bytes:
+    def field(value: str) -> bytes:
+        return value.encode('latin-1').ljust(30, b'\x00')
+    return b'TAG' + field(title) + field(artist) + field(album) + b'\x00' * 35
+
+
+def mpeg_frame(vbr: bytes = b'') -> bytes:
+    frame = FRAME_HEADER + b'\x00' * SIDE_INFO + vbr
+    return frame.ljust(417, b'\x00')
+
+
+def xing(frames: int) -> bytes:
+    return b'Xing' + struct.pack('>II', 1, frames)
+
+
+def vbri(frames: int) -> bytes:
+    return b'VBRI' + b'\x00' * 6 + struct.pack('>II', 0, frames)
+
+
+def write(tmp_path, name: str, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+V23_FRAMES = b''.join(text_frame(fid, text, 3) for fid, text in [(b'TIT2', 'Song'), (b'TPE1', 'Artist'), (b'TALB', 'Album')])
+
+
+@pytest.mark.parametrize('major, ids', [
+    (2, (b'TT2', b'TP1', b'TAL')),
+    (3, (b'TIT2', b'TPE1', b'TALB')),
+    (4, (b'TIT2', b'TPE1', b'TALB')),
+])
+def test_id3v2_text_frames(tmp_path, major, ids):
+    frames = b''.join(text_frame(fid, text, major) for fid, text in zip(ids, ['Song', 'Artist', 'Album']))
+    info = read_tags(write(tmp_path, 'a.mp3', id3v2(major, frames) + mpeg_frame(xing(100))))
+    assert info[:3] == ('Song', 'Artist', 'Album')
+
+
+def test_tlen_overrides_frame_duration(tmp_path):
+    frames = V23_FRAMES + text_frame(b'TLEN', '215000', 3)
+    assert read_tags(write(tmp_path, 'a.mp3', id3v2(3, frames) + mpeg_frame(xing(100)))).duration == 215.0
+
+
+def test_extended_header_is_skipped(tmp_path):
+    extended = struct.pack('>I', 6) + b'\x00' * 6
+    data = b'ID3' + bytes([3, 0, 0x40]) + syncsafe(len(extended) + len(V23_FRAMES)) + extended + V23_FRAMES
+    assert read_tags(write(tmp_path, 'a.mp3', data)).title == 'Song'
+
+
+def test_id3v1_fallback(tmp_path):
+    info = read_tags(write(tmp_path, 'a.mp3', mpeg_frame() + id3v1('Old', 'Band', 'Record')))
+    assert info[:3] == ('Old', 'Band', 'Record')
+
+
+def test_xing_duration(tmp_path):
+    info = read_tags(write(tmp_path, 'a.mp3', id3v2(3, V23_FRAMES) + mpeg_frame(xing(1000))))
+    assert info.duration == pytest.approx(1000 * 1152 / 44100)
+
+
+def test_vbri_duration(tmp_path):
+    info = read_tags(write(tmp_path, 'a.mp3', mpeg_frame(vbri(500))))
+    assert info.duration == pytest.approx(500 * 1152 / 44100)
+
+
+def test_cbr_duration_from_file_size(tmp_path):
+    tag = id3v2(3, V23_FRAMES)
+    audio = mpeg_frame() * 100
+    info = read_tags(write(tmp_path, 'a.mp3', tag + audio))
+    assert info.duration == pytest.approx(len(audio) * 8 / 128000)
+
+
+@pytest.mark.parametrize('data', [
+    b'ID3' + bytes([3, 0, 0x40]) + syncsafe(100),
+    b'ID3' + bytes([3, 0, 0x40]) + syncsafe(100) + b'\x00\x00',
+    b'ID3' + bytes([4, 0, 0x40]) + syncsafe(100) + b'\x00',
+    id3v2(3, V23_FRAMES)[:25],
+    id3v2(2, text_frame(b'TT2', 'Song', 2))[:14],
+    b'ID3',
+    b'',
+    FRAME_HEADER + b'Xing',
+])
+def test_truncated_files_give_empty_or_partial_info(tmp_path, data):
+    assert isinstance(read_tags(write(tmp_path, 'a.mp3', data)), TrackInfo)
+
+
+def test_random_corruption_never_raises(tmp_path):
+    rng = random.Random(7)
+    seeds = [id3v2(major, V23_FRAMES, flags) + mpeg_frame(xing(10)) for major in (2, 3, 4) for flags in (0, 0x40)]
+    path = tmp_path / 'fuzz.mp3'
+    for _ in range(500):
+        data = bytearray(rng.choice(seeds)[:rng.randrange(4, 200)])
+        for _ in range(rng.randrange(4)):
+            data[rng.randrange(len(data))] = rng.randrange(256)
+        path.write_bytes(bytes(data))
+        assert isinstance(read_tags(str(path)), TrackInfo)
+
+
+def test_read_many_survives_a_corrupt_file(tmp_path):
+    good = write(tmp_path, 'good.mp3', id3v2(3, V23_FRAMES) + mpeg_frame(xing(10)))
+    bad = write(tmp_path, 'bad.mp3', b'ID3' + bytes([3, 0, 0x40]) + syncsafe(100))
+    assert [info.title for info in read_many([good, bad, good], processes=1)] == ['Song', None, 'Song']
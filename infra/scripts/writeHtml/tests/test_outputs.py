@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+
+import pytest
+
+from .. import outputs
+from ..outputs import OutputWriter, outputs_path_for
+
+
+@pytest.fixture
+def writer(output):
+    return OutputWriter.load(outputs_path_for(output))
+
+
+def reload(output, compress=True):
+    return OutputWriter.load(outputs_path_for(output), compress)
+
+
+def test_write_returns_the_hash_of_the_bytes_on_disk(writer, output):
+    sha = writer.write(output, ['<p>', 'ü'], volatile=['<footer>'])
+    assert sha == hashlib.sha256(output.read_bytes()).hexdigest()
+    assert output.read_text(encoding='utf-8') == '<p>ü<footer>'
+    assert gzip.decompress(output.with_name(output.name + '.gz').read_bytes()) == output.read_bytes()
+
+
+def test_unchanged_content_is_skipped(writer, output):
+    sha = writer.write(output, ['same'])
+    writer.save()
+    mtimes = {p.name: p.stat().st_mtime_ns for p in output.parent.glob('index.html*')}
+
+    again = reload(output)
+    assert again.write(output, ['same']) == sha
+    assert (again.written, again.skipped) == (0, 1)
+    assert {p.name: p.stat().st_mtime_ns for p in output.parent.glob('index.html*')} == mtimes
+
+
+def test_volatile_trailer_alone_does_not_rewrite(writer, output):
+    writer.write(output, ['body'], volatile=['12:00'])
+    writer.save()
+    again = reload(output)
+    again.write(output, ['body'], volatile=['12:01'])
+    assert again.skipped == 1
+    assert output.read_text(encoding='utf-8') == 'body12:00'
+
+
+def test_changed_content_is_rewritten(writer, output):
+    writer.write(output, ['one'])
+    writer.save()
+    again = reload(output)
+    again.write(output, ['two'])
+    assert again.written == 1
+    assert gzip.decompress(output.with_name(output.name + '.gz').read_bytes()) == b'two'
+
+
+def test_missing_sibling_forces_a_rewrite(writer, output):
+    writer.write(output, ['x'])
+    writer.save()
+    output.with_name(output.name + '.gz').unlink()
+    again = reload(output)
+    again.write(output, ['x'])
+    assert again.written == 1
+    assert output.with_name(output.name + '.gz').exists()
+
+
+def test_no_compress_removes_stale_siblings(writer, output):
+    writer.write(output, ['x'])
+    writer.save()
+    plain = reload(output, compress=False)
+    plain.write(output, ['y'])
+    assert not output.with_name(output.name + '.gz').exists()
+    assert not output.with_name(output.name + '.br').exists()
+
+
+def test_gzip_output_is_deterministic(writer, output, tmp_path):
+    writer.write(output, ['same bytes'])
+    other = OutputWriter(tmp_path / 'other.json', tmp_path, compress=True)
+    other.write(tmp_path / 'copy.html', ['same bytes'])
+    assert output.with_name(output.name + '.gz').read_bytes() == (tmp_path / 'copy.html.gz').read_bytes()
+
+
+def test_brotli_sibling_when_available(writer, output):
+    if outputs.brotli is None:
+        pytest.skip('brotli is not installed')
+    writer.write(output, ['x' * 1000])
+    assert outputs.brotli.decompress(output.with_name(output.name + '.br').read_bytes()) == b'x' * 1000
+
+
+def test_remove_drops_the_file_siblings_and_record(writer, output):
+    writer.write(output, ['x'])
+    writer.remove(output)
+    assert not list(output.parent.glob('index.html*'))
+    assert writer.sha256(output) is None
+
+
+def test_corrupt_record_starts_empty(output):
+    outputs_path_for(output).write_text('[]', encoding='utf-8')
+    assert reload(output).records == {}
@@ -0,0 +1,62 @@
+import re
+
+import pytest
+
+from ..main import find_mp3s, iter_html, render_html, write_html
+from ..outputs import OutputWriter, outputs_path_for
+from ..tree import build_directory_tree
+
+
+@pytest.fixture
+def tree(library):
+    return build_directory_tree(library, find_mp3s(library))
+
+
+def test_streamed_chunks_join_to_the_rendered_page(library, output, tree):
+    chunks = list(iter_html(tree, library, output, 'Library'))
+    assert len(chunks) > 10
+    page = render_html(tree, library, output, 'Library')
+    # The footer carries a minute-resolution timestamp; compare everything before it.
+    assert ''.join(chunks).split('<footer>')[0] == page.split('<footer>')[0]
+
+
+def test_track_ids_follow_render_order(library, output, tree):
+    page = render_html(tree, library, output, 'Library')
+    ids = [int(n) for n in re.findall(r'id="t(\d+)"', page)]
+    assert ids == list(range(tree.track_count))
+
+
+def test_links_are_relative_to_the_page(library, tree):
+    page = render_html(tree, library, library / 'index.html', 'Library')
+    assert 'href="Artist 2/Album 10/track2.mp3"' in page
+    assert 'href="Ärtist/Café/naïve song.mp3"' in page
+
+
+def test_names_are_escaped(tmp_path):
+    root = tmp_path / 'lib'
+    (root / '<b>').mkdir(parents=True)
+    (root / '<b>' / 'a&b.mp3').write_bytes(b'')
+    page = render_html(build_directory_tree(root, find_mp3s(root)), root, root / 'index.html', 'T')
+    assert '&lt;b&gt;' in page and 'a&amp;b.mp3' in page
+    assert '<b>' not in page.split('<body>')[1]
+
+
+def test_write_leaves_no_temp_files(library, output, tree):
+    write_html(tree, library, output, 'Library')
+    assert output.exists()
+    assert not list(output.parent.glob('.*.tmp'))
+
+
+def test_failed_write_keeps_the_previous_page(library, output, tree):
+    write_html(tree, library, output, 'Library')
+    before = output.read_bytes()
+
+    def broken():
+        yield '<html>'
+        raise RuntimeError('render failed')
+
+    writer = OutputWriter.load(outputs_path_for(output))
+    with pytest.raises(RuntimeError):
+        writer.write(output, broken())
+    assert output.read_bytes() == before
+    assert not list(output.parent.glob('.*.tmp'))
@@ -0,0 +1,91 @@
+import base64
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+from ..main import find_mp3s, write_html
+from ..metadata import TrackInfo
+from ..search import build_search_index, encode_postings, grams, normalize, search_index_path_for, tokenize
+from ..tree import build_directory_tree, iter_postorder
+
+
+def decode_postings(encoded):
+    """Python port of the page script's ``decode``: base64 LEB128 deltas to ids."""
+    ids, previous, value, shift = [], 0, 0, 0
+    for byte in base64.b64decode(encoded):
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        ids.append(previous)
+        value = shift = 0
+    return ids
+
+
+def expected_postings(names):
+    index = defaultdict(set)
+    for item_id, name in names:
+        for token in tokenize(name):
+            for key in grams(token):
+                index[key].add(item_id)
+    return {key: sorted(ids) for key, ids in index.items()}
+
+
+@pytest.mark.parametrize('ids', [[], [0], [0, 1, 2], [5, 127, 128, 300, 16_384, 2_000_000]])
+def test_postings_round_trip(ids):
+    assert decode_postings(encode_postings(ids)) == ids
+
+
+def test_normalize_strips_accents_and_case():
+    assert normalize('Ärtist Café NAÏVE') == 'artist cafe naive'
+    assert tokenize('01_Intro - Live!') == ['01', 'intro', 'live']
+
+
+def test_index_decodes_back_to_its_inputs(library):
+    tree = build_directory_tree(library, find_mp3s(library))
+    index = build_search_index(tree)
+
+    tracks, folders = [], []
+    for node in iter_postorder(tree):
+        tracks.extend((node.first_track + i, f.stem) for i, f in enumerate(node.files))
+        if node is not tree:
+            folders.append((len(folders), node))
+
+    assert index['n'] == tree.track_count
+    assert {key: decode_postings(value) for key, value in index['t'].items()} == expected_postings(tracks)
+    assert {key: decode_postings(value) for key, value in index['f'].items()} == expected_postings(
+        (folder_id, node.name) for folder_id, node in folders)
+    for folder_id, node in folders:
+        start, count = index['folders'][2 * folder_id:2 * folder_id + 2]
+        assert (start, count) == (node.subtree_start, node.track_count)
+    assert [folders[f][1].name for f in index['top']] == list(tree.subdirs)
+
+
+def test_folder_ranges_cover_their_tracks(library):
+    tree = build_directory_tree(library, find_mp3s(library))
+    index = build_search_index(tree)
+    by_name = {node.name: i for i, node in enumerate(n for n in iter_postorder(tree) if n is not tree)}
+    start, count = index['folders'][2 * by_name['Artist 2']:2 * by_name['Artist 2'] + 2]
+    ranged = {f.name for node in iter_postorder(tree) for i, f in enumerate(node.files)
+              if start <= node.first_track + i < start + count}
+    assert ranged == {'track2.mp3', 'track10.mp3', 'Track 1.mp3', 'b.mp3', 'c.mp3'}
+
+
+def test_tags_are_indexed(library):
+    tree = build_directory_tree(library, find_mp3s(library))
+    first = tree.subdirs['Artist 10'].subdirs['Album 1'].files[0]
+    index = build_search_index(tree, {first: TrackInfo(title='Zyxwv')})
+    track_id = tree.subdirs['Artist 10'].subdirs['Album 1'].first_track
+    assert decode_postings(index['t']['zyx']) == [track_id]
+
+
+def test_index_is_written_next_to_the_page(library, output):
+    write_html(build_directory_tree(library, find_mp3s(library)), library, output, 'Library')
+    path = search_index_path_for(output)
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['version'] == 1
+    assert f'{path.name}?v=' in output.read_text(encoding='utf-8')
+    assert Path(str(path) + '.gz').exists()
@@ -0,0 +1,58 @@
+import re
+
+from ..main import find_mp3s, fragment_name, fragments_dir_for, write_html
+from ..tree import build_directory_tree
+
+
+def track_ids(text):
+    return [int(n) for n in re.findall(r'id="t(\d+)"', text)]
+
+
+def build(library):
+    return build_directory_tree(library, find_mp3s(library))
+
+
+def test_shell_references_one_fragment_per_top_level_folder(library, output):
+    tree = build(library)
+    write_html(tree, library, output, 'Library', shard=True)
+    parts = fragments_dir_for(output)
+    shell = output.read_text(encoding='utf-8')
+
+    assert sorted(p.name for p in parts.glob('*.html')) == sorted(fragment_name(node) for node in tree.subdirs.values())
+    urls = re.findall(r'data-fragment="([^"]+)"', shell)
+    assert len(urls) == len(tree.subdirs)
+    assert all(re.fullmatch(rf'{parts.name}/[0-9a-f]{{12}}\.html\?v=[0-9a-f]{{12}}', url) for url in urls)
+
+
+def test_shell_and_fragments_together_hold_every_track_once(library, output):
+    tree = build(library)
+    write_html(tree, library, output, 'Library', shard=True)
+    ids = track_ids(output.read_text(encoding='utf-8'))
+    assert len(ids) == len(tree.files)  # only the loose root tracks are in the shell
+    for fragment in fragments_dir_for(output).glob('*.html'):
+        ids += track_ids(fragment.read_text(encoding='utf-8'))
+    assert sorted(ids) == list(range(tree.track_count))
+
+
+def test_only_rewrites_the_named_fragments(library, output):
+    tree = build(library)
+    write_html(tree, library, output, 'Library', shard=True)
+    parts = fragments_dir_for(output)
+    mtimes = {p.name: p.stat().st_mtime_ns for p in parts.glob('*.html')}
+
+    changed = tree.subdirs['Artist 10']
+    writer = write_html(tree, library, output, 'Library', shard=True, only_fragments={changed.path})
+    assert {p.name: p.stat().st_mtime_ns for p in parts.glob('*.html')} == mtimes
+    assert writer.written == 0
+
+
+def test_fragments_of_removed_folders_are_deleted(library, output):
+    write_html(build(library), library, output, 'Library', shard=True)
+    removed = fragments_dir_for(output) / fragment_name(build(library).subdirs['Ärtist'])
+    assert removed.exists()
+
+    for p in (library / 'Ärtist' / 'Café').iterdir():
+        p.unlink()
+    write_html(build(library), library, output, 'Library', shard=True)
+    assert not removed.exists()
+    assert not removed.with_name(removed.name + '.gz').exists()
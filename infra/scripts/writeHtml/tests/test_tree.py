@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from .. import tree as tree_module
+from ..tree import FolderNode, aggregate, build_directory_tree, iter_postorder, prune_empty
+
+ROOT = Path('/library')
+
+
+def paths(*rels: str):
+    return [ROOT / rel for rel in rels]
+
+
+def test_files_and_folders_sort_naturally():
+    tree = build_directory_tree(ROOT, paths('b/track10.mp3', 'b/track2.mp3', 'a10/x.mp3', 'a2/x.mp3', 'top.mp3'))
+    assert list(tree.subdirs) == ['a2', 'a10', 'b']
+    assert [p.name for p in tree.subdirs['b'].files] == ['track2.mp3', 'track10.mp3']
+
+
+def test_track_counts_and_ids_follow_render_order():
+    tree = build_directory_tree(ROOT, paths('a/1.mp3', 'a/2.mp3', 'a/deep/3.mp3', 'b/4.mp3', '5.mp3'))
+    assert tree.track_count == 5
+    assert tree.subdirs['a'].track_count == 3
+    # Render order is post-order: a/deep, a, b, root.
+    order = [(node.name, node.first_track) for node in iter_postorder(tree) if node.files]
+    assert order == [('deep', 0), ('a', 1), ('b', 3), ('library', 4)]
+    assert tree.subdirs['a'].subtree_start == 0
+    assert tree.subdirs['b'].subtree_start == 3
+
+
+def test_nodes_use_slots():
+    node = FolderNode('x', ROOT)
+    assert not hasattr(node, '__dict__')
+
+
+def test_aggregate_only_rekeys_new_files(monkeypatch):
+    tree = build_directory_tree(ROOT, paths(*(f'a/{n}.mp3' for n in range(50))))
+    calls = []
+    monkeypatch.setattr(tree_module, 'natural_key', lambda s: calls.append(s) or [s])
+    aggregate(tree)
+    assert calls == []
+
+    folder = tree.subdirs['a']
+    folder.add_file(ROOT / 'a' / 'new.mp3')
+    folder.set_files(list(folder.files))
+    aggregate(tree)
+    assert calls == ['new.mp3']
+    assert folder.track_count == 51
+
+
+def test_prune_empty_drops_folders_without_tracks():
+    tree = build_directory_tree(ROOT, paths('a/1.mp3', 'b/2.mp3'))
+    tree.subdirs['b'].set_files([])
+    prune_empty(aggregate(tree))
+    assert list(tree.subdirs) == ['a']
+    assert tree.track_count == 1
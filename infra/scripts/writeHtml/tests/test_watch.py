@@ -0,0 +1,93 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from ..main import find_mp3s, fragments_dir_for, write_html
+from ..tree import build_directory_tree, iter_postorder
+from ..watch import LibraryWatch, PollingWatcher, collect_changes
+
+
+def render_order(tree):
+    return [(p, node.first_track + i) for node in iter_postorder(tree) for i, p in enumerate(node.files)]
+
+
+def assert_matches_fresh_scan(watch, library):
+    fresh = build_directory_tree(library, find_mp3s(library))
+    assert render_order(watch.tree) == render_order(fresh)
+    assert [(n.path, n.track_count) for n in iter_postorder(watch.tree)] == \
+        [(n.path, n.track_count) for n in iter_postorder(fresh)]
+
+
+@pytest.fixture
+def watch(library, output):
+    tree = build_directory_tree(library, find_mp3s(library))
+    write_html(tree, library, output, 'Library', shard=True)
+    return LibraryWatch(tree, library, output, 'Library', shard=True)
+
+
+def test_added_file_is_patched_in(watch, library):
+    album = library / 'Artist 2' / 'Album 9'
+    (album / 'Track 0.mp3').write_bytes(b'new')
+    watch.regenerate({str(album)})
+    assert_matches_fresh_scan(watch, library)
+
+
+def test_new_folder_is_scanned_in_full(watch, library):
+    new = library / 'Artist 3' / 'Album 1'
+    new.mkdir(parents=True)
+    (new / '1.mp3').write_bytes(b'a')
+    (new / '2.mp3').write_bytes(b'b')
+    watch.regenerate({str(library)})
+    assert_matches_fresh_scan(watch, library)
+    assert 'Artist 3' in watch.tree.subdirs
+
+
+def test_removed_folder_and_emptied_folder_are_pruned(watch, library):
+    shutil.rmtree(library / 'Artist 10')
+    (library / 'Artist 2' / 'a' / 'c.mp3').unlink()
+    watch.regenerate({str(library / 'Artist 10'), str(library / 'Artist 2' / 'a')})
+    assert_matches_fresh_scan(watch, library)
+    assert 'a' not in watch.tree.subdirs['Artist 2'].subdirs
+
+
+def test_hidden_folders_are_ignored(watch, library):
+    before = render_order(watch.tree)
+    (library / '.hidden' / 'more.mp3').write_bytes(b'x')
+    watch.regenerate({str(library / '.hidden')})
+    assert render_order(watch.tree) == before
+
+
+def test_only_affected_fragments_are_rewritten(watch, library, output):
+    parts = fragments_dir_for(output)
+    before = {p.name: p.read_bytes() for p in parts.glob('*.html')}
+    # A rename keeps every track count, so no other fragment's ids shift.
+    album = library / 'Artist 2' / 'Album 9'
+    (album / 'Track 1.mp3').rename(album / 'Track 01b.mp3')
+    rewritten = watch.regenerate({str(album)})
+    after = {p.name: p.read_bytes() for p in parts.glob('*.html')}
+    assert rewritten == 1
+    assert sum(before[name] != after[name] for name in before) == 1
+
+
+def test_count_change_rewrites_later_fragments(watch, library):
+    (library / 'Artist 2' / 'Album 9' / 'Track 2.mp3').write_bytes(b'new')
+    # Artist 2 changed; Artist 10 and Ärtist render after it and their ids shift.
+    assert watch.regenerate({str(library / 'Artist 2' / 'Album 9')}) == 3
+
+
+def test_polling_watcher_reports_changed_folders(library):
+    past = time.time() - 60
+    for dirpath, _, _ in os.walk(library):
+        os.utime(dirpath, (past, past))
+    watcher = PollingWatcher(library, interval=0.01)
+    assert watcher.changes(0.02) == set()
+
+    album = library / 'Artist 2' / 'Album 10'
+    (album / 'track3.mp3').write_bytes(b'new')
+    (album / 'cover2.jpg').write_bytes(b'')
+    assert collect_changes(watcher, quiet=0.02) == {str(album)}
+
+    (library / 'Artist 10' / 'notes.txt').write_bytes(b'')  # not an MP3 or a folder
+    assert watcher.changes(0.02) == set()
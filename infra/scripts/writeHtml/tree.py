@@ -0,0 +1,130 @@
+"""Folder tree model with cached sort keys and precomputed aggregates."""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from .discovery import natural_key
+
+
+class FolderNode:
+    """A folder in the library tree.
+
+    ``sort_key`` is computed once when the node is created, and each file's key
+    when the file is added (:meth:`add_file`, :meth:`set_files`); only folders
+    whose files changed are re-sorted. ``track_count`` covers the whole subtree
+    and is filled in by a single post-order pass (:func:`aggregate`), so
+    rendering never recounts subtrees.
+    ``first_track`` is the render-order id of the first file directly in this
+    folder; a subtree's tracks always form one contiguous id range.
+    """
+
+    __slots__ = ('name', 'path', 'sort_key', 'subdirs', 'files', 'file_keys', 'files_sorted', 'track_count', 'first_track')
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        self.sort_key = natural_key(name)
+        self.subdirs: Dict[str, 'FolderNode'] = {}
+        self.files: List[Path] = []
+        self.file_keys: Dict[str, list] = {}
+        self.files_sorted = True
+        self.track_count = 0
+        self.first_track = 0
+
+    def child(self, name: str) -> 'FolderNode':
+        """Return the subfolder called name, creating it when missing."""
+        node = self.subdirs.get(name)
+        if node is None:
+            node = self.subdirs[name] = FolderNode(name, self.path / name)
+        return node
+
+    def add_file(self, path: Path) -> None:
+        """Append a file directly inside this folder."""
+        self.files.append(path)
+        self.file_keys[path.name] = natural_key(path.name)
+        self.files_sorted = False
+
+    def set_files(self, paths: Iterable[Path]) -> None:
+        """Replace the files directly inside this folder, reusing the keys of names seen before."""
+        previous = self.file_keys
+        self.files = list(paths)
+        self.file_keys = {p.name: previous.get(p.name) or natural_key(p.name) for p in self.files}
+        self.files_sorted = False
+
+    @property
+    def subtree_start(self) -> int:
+        """Id of the first track anywhere in this subtree."""
+        return self.first_track + len(self.files) - self.track_count
+
+    def __repr__(self) -> str:
+        return f'FolderNode({self.name!r}, tracks={self.track_count})'
+
+
+def iter_postorder(tree: FolderNode) -> Iterator[FolderNode]:
+    """Yield every node after all of its descendants, without recursion."""
+    stack = [(tree, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+            continue
+        stack.append((node, True))
+        stack.extend((sub, False) for sub in reversed(list(node.subdirs.values())))
+
+
+def sort_node(node: FolderNode) -> None:
+    """Order files and subfolders of a single node naturally using cached keys."""
+    if not node.files_sorted:
+        keys = node.file_keys
+        node.files.sort(key=lambda p: keys[p.name])
+        node.files_sorted = True
+    if len(node.subdirs) > 1:
+        node.subdirs = dict(sorted(node.subdirs.items(), key=lambda kv: kv[1].sort_key))
+
+
+def aggregate(tree: FolderNode) -> FolderNode:
+    """Sort every node and compute subtree track counts in one post-order pass."""
+    for node in iter_postorder(tree):
+        sort_node(node)
+        count = len(node.files)
+        for sub in node.subdirs.values():
+            count += sub.track_count
+        node.track_count = count
+    number_tracks(tree)
+    return tree
+
+
+def number_tracks(tree: FolderNode) -> None:
+    """Assign ``first_track`` so ids follow render order.
+
+    A folder's files are rendered after all of its subfolders, so render order
+    is exactly the post-order of the (already sorted) tree.
+    """
+    next_id = 0
+    for node in iter_postorder(tree):
+        node.first_track = next_id
+        next_id += len(node.files)
+
+
+def prune_empty(tree: FolderNode) -> FolderNode:
+    """Drop subfolders without any tracks, e.g. after files were removed in place.
+
+    Counts must be current (see :func:`aggregate`); removing empty folders does
+    not change any count or track id.
+    """
+    for node in iter_postorder(tree):
+        if any(sub.track_count == 0 for sub in node.subdirs.values()):
+            node.subdirs = {name: sub for name, sub in node.subdirs.items() if sub.track_count}
+    return tree
+
+
+def build_directory_tree(root: Path, mp3s: List[Path]) -> FolderNode:
+    """Build a :class:`FolderNode` tree from a list of mp3 Paths."""
+    tree = FolderNode(root.name, root)
+    for p in mp3s:
+        parts = p.relative_to(root).parts
+        cursor = tree
+        for part in parts[:-1]:
+            cursor = cursor.child(part)
+        cursor.add_file(p)
+    return aggregate(tree)
@@ -0,0 +1,307 @@
+"""``--watch`` mode: keep the tree in memory and regenerate when the library changes.
+
+Changes come from inotify on Linux (through ``ctypes``, so there is no extra
+dependency) or from polling directory mtimes, which also works on network
+mounts where inotify sees nothing. Bursts of events, e.g. during a bulk copy,
+are coalesced until the library has been quiet for the debounce period. Then
+only the changed folders are relisted and patched into the tree, and only the
+outputs they affect are rewritten.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from .discovery import DEFAULT_WORKERS, Listing, is_mp3, is_skipped_dir, iter_mp3s, list_directory
+from .main import DEFAULT_DEBOUNCE, write_html
+from .metadata import DEFAULT_PROCESSES, TagCache, TrackInfo
+from .tree import FolderNode, aggregate, prune_empty
+
+# Interval used when inotify is unavailable and no --poll interval was given.
+DEFAULT_POLL_INTERVAL = 10.0
+
+# Regenerate at least this often while changes keep arriving, so a long copy still shows progress.
+MAX_COALESCE_SECONDS = 60.0
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Report folders whose MP3s or subfolders changed, using Linux inotify."""
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+
+    def __init__(self, root: Path):
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            init = self._libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise OSError(errno.ENOSYS, 'inotify is not available on this platform') from e
+        self._fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: Dict[int, str] = {}
+        try:
+            self._watch_tree(os.fspath(root))
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top: str) -> None:
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, 'inotify watch limit reached (see fs.inotify.max_user_watches)')
+                continue  # vanished or unreadable
+            self._dirs[wd] = path
+            stack.extend(os.path.join(path, name) for name in list_directory(path)[1])
+
+    def changes(self, timeout: Optional[float]) -> Set[str]:
+        """Wait up to timeout seconds (forever when None) and return the folders that changed."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        changed: Set[str] = set()
+        if not ready:
+            return changed
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0'))
+                offset += _EVENT.size + length
+                self._handle(wd, mask, name, changed)
+        return changed
+
+    def _handle(self, wd: int, mask: int, name: str, changed: Set[str]) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # Events were dropped: relist everything that is watched.
+            changed.update(self._dirs.values())
+            return
+        directory = self._dirs.get(wd)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            del self._dirs[wd]
+        elif mask & IN_DELETE_SELF:
+            changed.add(directory)
+        elif mask & IN_ISDIR:
+            if is_skipped_dir(name):
+                return
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(os.path.join(directory, name))
+            changed.add(directory)
+        elif is_mp3(name):
+            changed.add(directory)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Report changed folders by polling directory mtimes and comparing listings."""
+
+    def __init__(self, root: Path, interval: float = DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        self._listings: Dict[str, Tuple[int, Listing]] = {}
+        self._scan(os.fspath(root))
+
+    def _scan(self, top: str) -> None:
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            listing = list_directory(path)
+            self._listings[path] = (mtime, listing)
+            stack.extend(os.path.join(path, name) for name in listing[1])
+
+    def changes(self, timeout: Optional[float]) -> Set[str]:
+        """Poll until something changed or timeout seconds passed (forever when None)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic()))
+            time.sleep(wait)
+            changed = self._check()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def _check(self) -> Set[str]:
+        changed: Set[str] = set()
+        for path, (mtime, (files, dirs)) in list(self._listings.items()):
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                del self._listings[path]
+                changed.add(path)
+                continue
+            if current == mtime:
+                continue
+            new_files, new_dirs = listing = list_directory(path)
+            self._listings[path] = (current, listing)
+            # Our own output files bump the mtime too; only MP3s and folders matter.
+            if set(new_files) != set(files) or set(new_dirs) != set(dirs):
+                changed.add(path)
+                for name in set(new_dirs) - set(dirs):
+                    self._scan(os.path.join(path, name))
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def collect_changes(watcher, quiet: float, max_delay: float = MAX_COALESCE_SECONDS) -> Set[str]:
+    """Block until something changes, then keep collecting until quiet seconds pass without events."""
+    changed: Set[str] = set()
+    while not changed:
+        changed = watcher.changes(None)
+    deadline = time.monotonic() + max_delay
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return changed
+        more = watcher.changes(min(quiet, remaining))
+        if not more:
+            return changed
+        changed |= more
+
+
+class LibraryWatch:
+    """In-memory library tree that is patched and re-emitted as folders change."""
+
+    def __init__(self, tree: FolderNode, root: Path, output_path: Path, title: str, shard: bool = False,
+                 tags: Optional[Dict[Path, TrackInfo]] = None, tag_cache: Optional[TagCache] = None,
+                 persist_tags: bool = False, workers: int = DEFAULT_WORKERS, processes: int = DEFAULT_PROCESSES,
+                 compress: bool = True):
+        self.tree = tree
+        self.root = root
+        self.output_path = output_path
+        self.title = title
+        self.shard = shard
+        self.tags = tags
+        self.tag_cache = tag_cache
+        self.persist_tags = persist_tags
+        self.workers = workers
+        self.processes = processes
+        self.compress = compress
+        self._starts = self._fragment_starts()
+
+    def _fragment_starts(self) -> Mapping[str, int]:
+        return {name: node.subtree_start for name, node in self.tree.subdirs.items()}
+
+    def _node(self, parts: Tuple[str, ...], create: bool) -> Optional[FolderNode]:
+        cursor = self.tree
+        for part in parts:
+            cursor = cursor.child(part) if create else cursor.subdirs.get(part)
+            if cursor is None:
+                return None
+        return cursor
+
+    def patch(self, changed: Set[str]) -> Set[str]:
+        """Relist the changed folders into the tree; return the affected top-level names ('' for the root)."""
+        touched: Set[str] = set()
+        added: List[Path] = []
+        for path in sorted(changed, key=lambda p: p.count(os.sep)):
+            rel = os.path.relpath(path, self.root)
+            parts = () if rel == '.' else Path(rel).parts
+            if parts[:1] == ('..',) or any(is_skipped_dir(part) for part in parts):
+                continue
+            touched.add(parts[0] if parts else '')
+            if not os.path.isdir(path):
+                parent = self._node(parts[:-1], create=False)
+                if parts and parent is not None:
+                    parent.subdirs.pop(parts[-1], None)
+                continue
+
+            node = self._node(parts, create=True)
+            files, dirs = list_directory(path)
+            node.set_files(node.path / name for name in files)
+            added.extend(node.files)
+            for name in [name for name in node.subdirs if name not in dirs]:
+                del node.subdirs[name]
+            for name in dirs:
+                if name in node.subdirs:
+                    continue
+                # A folder that appeared (or was moved in) is scanned in full.
+                child = node.child(name)
+                for p in iter_mp3s(child.path, workers=self.workers):
+                    cursor = child
+                    for part in p.relative_to(child.path).parts[:-1]:
+                        cursor = cursor.child(part)
+                    cursor.add_file(p)
+                    added.append(p)
+
+        if self.tag_cache is not None and self.tags is not None and added:
+            self.tags.update(self.tag_cache.resolve(added, workers=self.workers, processes=self.processes))
+        prune_empty(aggregate(self.tree))
+        return touched
+
+    def regenerate(self, changed: Set[str]) -> int:
+        """Patch the tree for the changed folders and rewrite what they affect; return fragments rewritten."""
+        touched = self.patch(changed)
+        only = None
+        if self.shard:
+            # A fragment is stale when its folder changed or when earlier changes shifted its track ids.
+            only = {node.path for name, node in self.tree.subdirs.items()
+                    if name in touched or self._starts.get(name) != node.subtree_start}
+        write_html(self.tree, self.root, self.output_path, self.title, shard=self.shard, tags=self.tags,
+                   only_fragments=only, compress=self.compress)
+        if self.tag_cache is not None and self.persist_tags:
+            self.tag_cache.save()
+        self._starts = self._fragment_starts()
+        return len(only) if only is not None else 0
+
+    def _watcher(self, poll_interval: Optional[float]):
+        if poll_interval:
+            return PollingWatcher(self.root, poll_interval)
+        try:
+            return InotifyWatcher(self.root)
+        except OSError as e:
+            print(f'inotify unavailable ({e}); polling every {DEFAULT_POLL_INTERVAL:g}s instead.')
+            return PollingWatcher(self.root, DEFAULT_POLL_INTERVAL)
+
+    def run(self, poll_interval: Optional[float] = None, debounce: float = DEFAULT_DEBOUNCE) -> Tuple[int, str]:
+        """Watch until interrupted, regenerating after each quiet period."""
+        watcher = self._watcher(poll_interval)
+        quiet = max(debounce, poll_interval or 0)
+        print(f'Watching {self.root} for changes (Ctrl+C to stop)...')
+        try:
+            while True:
+                changed = collect_changes(watcher, quiet)
+                started = time.perf_counter()
+                fragments = self.regenerate(changed)
+                detail = f', {fragments} fragment(s)' if self.shard else ''
+                print(f'Regenerated {self.output_path} for {len(changed)} changed folder(s){detail} '
+                      f'in {time.perf_counter() - started:.2f}s')
+        except KeyboardInterrupt:
+            return 0, str(self.output_path)
+        except OSError as e:
+            return 2, f"Failed to write HTML: {e}"
+        finally:
+            watcher.close()